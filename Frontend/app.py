@@ -1,87 +1,75 @@
 import streamlit as st
-import requests
 import pandas as pd
 import json
-import re
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# El paquete `motor` vive en la raíz del repositorio, junto a bot.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import analisis
+from motor.analisis import (limpiar_nombre, llamada_metadatos, llamada_stats, llamada_stats_sql,
+                            pregunta_justificacion)
+from motor.cache import obtener_cache
+from motor.catalogo import DESTACADAS, catalogo_disciplinas
+from motor.conectores import obtener_conector
+from motor.enfrentamientos import obtener_grafos
+from motor.indice import obtener_indice
+from motor.internado import conjunto_cargado, obtener_conjunto
+from motor.participantes import obtener_indice_participantes
+from motor.marcas import obtener_marcas
+from motor.perfiles import clasificar, clasificar_marcas, detectar_perfil
+from motor.precalentador import obtener_precalentador
+from motor.ratings import ELO_BASE
+from motor.refresco import obtener_vigilante
+from motor.resiliencia import CircuitoAbierto, Cortacircuitos
+from motor.sdk import obtener_cliente
+from motor.trazas import desglose, obtener_trazador, servir_metricas
 
 # ─────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────
 
-def limpiar_nombre(nombre: str) -> str:
-    """Elimina artefactos de la IA: pipes, asteriscos, guiones, listas, etc."""
-    nombre = nombre.strip()
-    nombre = re.sub(r'[`*_]', '', nombre)
-    nombre = nombre.strip('|').strip()
-    nombre = re.sub(r'^[\d]+[.)]\s*', '', nombre)
-    nombre = re.sub(r'^[-•–]\s*', '', nombre)
-    nombre = nombre.strip('"\'')
-    return nombre.strip()
-
-def extraer_json_de_texto(texto: str) -> dict:
-    """Extrae el primer objeto JSON válido ignorando todo el ruido alrededor."""
-    inicio = texto.find('{')
-    fin    = texto.rfind('}')
-    if inicio != -1 and fin != -1:
-        try:
-            return json.loads(texto[inicio:fin + 1])
-        except json.JSONDecodeError:
-            pass
-    return {}
-
-PALABRAS_RUIDO = {
-    "aquí", "aqui", "los", "las", "a continuación", "continuacion",
-    "disclaimer", "siguiente", "resultado", "resultados", "valores",
-    "columna", "tabla", "here", "the", "following", "distinct",
-    "query", "sql", "select", "from", "limit", "nota", "note",
-    "importante", "son:", "son", "participants", "participant",
-    "names", "name", "países", "paises", "teams", "team",
-    "lista", "list", "estos", "estas", "únicos", "unicos"
-}
-
-@st.cache_data(show_spinner="📡 Cargando participantes desde Denodo…", ttl=300)
 def obtener_participantes(base_url: str, username: str, password: str,
                           nombre_vista: str) -> list[str]:
     """
-    Obtiene los valores únicos de participant_name directamente
-    de la vista indicada (admin.basketball, admin.football, etc.).
+    Lista completa y ordenada de participant_name de la vista, servida por
+    el índice local de valores distintos. Solo si la vista no está en
+    results/ se recurre al LLM del SDK.
     """
-    payload = {
-        "question": (
-            f"Necesito los valores únicos que existen en la columna participant_name "
-            f"de la vista {nombre_vista}. "
-            f"Dame los primeros 50 valores distintos que encuentres. "
-            f"RESPONDE ÚNICAMENTE con los valores, uno por línea, "
-            f"sin numeración, sin guiones, sin markdown, sin explicaciones, "
-            f"sin texto introductorio, sin texto al final."
-        )
-    }
+    cliente = obtener_cliente(base_url, username, password)
+    return analisis.obtener_participantes(
+        cliente, nombre_vista,
+        respaldo=lambda _c, vista: obtener_participantes_sdk(base_url, username, password, vista),
+    )
 
-    try:
-        r = requests.post(
-            f"{base_url.rstrip('/')}/answerDataQuestion",
-            json=payload,
-            auth=(username, password),
-            timeout=45
-        )
-        r.raise_for_status()
-        texto = r.json().get("answer", "")
-
-        nombres = []
-        for linea in texto.split("\n"):
-            limpio = limpiar_nombre(linea)
-            if (len(limpio) > 1
-                    and "|" not in limpio
-                    and limpio.lower() not in PALABRAS_RUIDO
-                    and not any(limpio.lower().startswith(p) for p in PALABRAS_RUIDO)
-                    and "disclaimer" not in limpio.lower()
-                    and not limpio.isdigit()):
-                nombres.append(limpio)
-
-        unicos = sorted(list(dict.fromkeys(n for n in nombres if n)))
-        return unicos if len(unicos) >= 2 else []
-    except Exception:
-        return []
+
+@st.cache_data(show_spinner="📡 Cargando participantes desde Denodo…", ttl=300)
+def obtener_participantes_sdk(base_url: str, username: str, password: str,
+                              nombre_vista: str) -> list[str]:
+    """Valores únicos de participant_name preguntados al SDK (cacheado 5 min)."""
+    return analisis.participantes_sdk(obtener_cliente(base_url, username, password),
+                                      nombre_vista)
+
+
+# Índice de agregados por participante: se carga (o reconstruye si cambió
+# algún CSV) al arrancar, y cada comparación es una búsqueda O(1).
+indice_local = obtener_indice()
+
+# Una vista admin.<disciplina> por CSV de results/; los datos de cada una se
+# cargan al seleccionarla por primera vez
+disciplinas = catalogo_disciplinas()
+
+# Spans de cada análisis; con DENODO_METRICAS_PUERTO se exponen además en /metrics
+trazador = obtener_trazador()
+if os.environ.get("DENODO_METRICAS_PUERTO"):
+    servir_metricas(int(os.environ["DENODO_METRICAS_PUERTO"]))
+
+# Los hilos de fondo son del proceso, no de la sesión: se arrancan con su
+# variable de entorno y solo se paran o arrancan a mano con DENODO_ADMIN=1
+ADMIN = os.environ.get("DENODO_ADMIN") == "1"
 
 
 # ─────────────────────────────────────────
@@ -187,13 +175,97 @@ with st.sidebar:
     username = st.text_input("👤 Usuario", value="admin")
     password = st.text_input("🔑 Contraseña", value="admin", type="password")
 
+    contrastar_sdk = st.checkbox(
+        "🧪 Contrastar estadísticas con el SDK", value=False,
+        help="Las victorias/derrotas se calculan en local sobre results/*.csv. "
+             "Activa esta opción para pedirlas también al LLM y compararlas."
+    )
+    narrativa_sdk = st.checkbox(
+        "🧠 Justificación del SDK en directo", value=False,
+        help="Tras el veredicto, pide al LLM una recomendación razonada y la muestra "
+             "según se genera. Se cancela si sales de la página o relanzas el análisis."
+    )
+
+    with st.expander("🗄️ Canal SQL directo"):
+        canal_sql = st.radio(
+            "Estadísticas que no están en results/",
+            ["LLM del SDK", "Denodo VDP"],
+            help="Con un canal SQL, las victorias/derrotas se calculan con una consulta "
+                 "COUNT … GROUP BY participant_name, result_wlt en vez de un prompt al LLM."
+        )
+        if canal_sql == "Denodo VDP":
+            vdp_host   = st.text_input("Host VDP", value="localhost")
+            vdp_puerto = st.number_input("Puerto (PostgreSQL)", value=9996, step=1)
+    conector_sql = None
+    try:
+        if canal_sql == "Denodo VDP":
+            conector_sql = obtener_conector("vdp", host=vdp_host, puerto=int(vdp_puerto),
+                                            usuario=username, password=password)
+    except Exception as e:
+        st.error(f"❌ Canal SQL no disponible: {e}")
+
     st.markdown("---")
     if st.button("🔌 Probar conexión", use_container_width=True):
         try:
-            r = requests.get(f"{base_url.rstrip('/')}/docs", timeout=4)
-            st.success("✅ SDK conectado") if r.status_code < 500 else st.error("❌ SDK no responde")
+            ok = obtener_cliente(base_url, username, password).probar_conexion()
+            st.success("✅ SDK conectado") if ok else st.error("❌ SDK no responde")
         except Exception:
             st.error("❌ No se puede conectar")
+    estado_circuito = obtener_cliente(base_url, username, password).cortacircuitos.estado
+    if estado_circuito != Cortacircuitos.CERRADO:
+        st.caption(f"⛔ Circuito del SDK {estado_circuito}: se usan solo datos locales")
+
+    with st.expander("🗄️ Caché de respuestas del SDK"):
+        cache_sdk = obtener_cache()
+        st.json(cache_sdk.estadisticas())
+        st.caption("Vistas en memoria (LRU, DENODO_VISTAS_MB)")
+        st.json(obtener_indice_participantes().cache.estadisticas())
+        # Un solo hilo por proceso, compartido por todas las sesiones
+        precalentador = obtener_precalentador()
+        if ADMIN:
+            precalentar = st.toggle(
+                "🔥 Precalentar todas las vistas (todo el proceso)", value=precalentador.activo,
+                help="Refresca en segundo plano el esquema de cada vista y las estadísticas de "
+                     "sus participantes con más partidos antes de que caduquen en la caché."
+            )
+            if precalentar and not precalentador.activo:
+                precalentador.arrancar()
+            elif not precalentar and precalentador.activo:
+                precalentador.parar()
+        else:
+            st.caption("🔥 Precalentador (DENODO_PRECALENTAR)")
+        st.json(precalentador.estadisticas())
+        vigilante = obtener_vigilante()
+        if conector_sql is not None:
+            # Con el canal VDP se vigilan también las vistas de Denodo
+            vigilante.configurar_origen(conector_sql, [d.vista for d in disciplinas])
+        if ADMIN:
+            vigilar = st.toggle(
+                "🔄 Refresco incremental de results/ (todo el proceso)", value=vigilante.activo,
+                help="Detecta los CSV de results/ que cambian y actualiza solo los agregados, "
+                     "ratings y cachés de los participantes afectados."
+            )
+            if vigilar and not vigilante.activo:
+                vigilante.arrancar()
+            elif not vigilar and vigilante.activo:
+                vigilante.parar()
+        else:
+            st.caption("🔄 Refresco incremental (DENODO_REFRESCO)")
+        st.json(vigilante.estadisticas())
+        if st.button("🧹 Vaciar caché", use_container_width=True):
+            cache_sdk.invalidar()
+            st.success("Caché vaciada")
+
+    with st.expander("🧮 Conjunto París 2024 en memoria"):
+        st.caption("results/ y athletes.csv internados y mapeados desde .cache/, "
+                   "compartidos entre todos los workers del host")
+        if conjunto_cargado() or st.button("Cargar conjunto", use_container_width=True):
+            conjunto = obtener_conjunto()
+            st.json(conjunto.memoria())
+            if conjunto.ingesta:
+                st.caption("Ingesta por fichero (construido en este proceso)")
+                st.dataframe(pd.DataFrame(conjunto.ingesta), use_container_width=True,
+                             hide_index=True)
 
     st.markdown("---")
     st.markdown("""<div style='font-size:11px;color:rgba(120,180,140,.35);text-align:center;line-height:1.7;'>
@@ -227,13 +299,12 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Badges de datasets disponibles
-c1, c2, c3, c4 = st.columns(4)
-for col, emoji, label, vista in [
-    (c1, "🏀", "Basketball",   "admin.basketball"),
-    (c2, "⚽", "Football",     "admin.football"),
-    (c3, "🏐", "Volleyball",   "admin.volleyball"),
-]:
+# Badges de datasets disponibles: las destacadas y el resto del catálogo
+destacadas = [d for d in disciplinas if d.nombre in DESTACADAS]
+badges = [(d.emoji, d.nombre, d.vista) for d in destacadas]
+if len(disciplinas) > len(destacadas):
+    badges.append(("🏅", f"+{len(disciplinas) - len(destacadas)} disciplinas", "results/*.csv"))
+for col, (emoji, label, vista) in zip(st.columns(len(badges) or 1), badges):
     col.markdown(f"""
     <div style='text-align:center;background:rgba(29,185,84,.06);
                 border:1px solid rgba(29,185,84,.14);border-radius:10px;padding:12px 6px;'>
@@ -255,14 +326,16 @@ st.markdown("""<div style='font-family:"Bebas Neue",sans-serif;font-size:22px;
             letter-spacing:.12em;color:#1db954;margin-bottom:10px;'>
     ① DISCIPLINA OLÍMPICA</div>""", unsafe_allow_html=True)
 
-deportes = {
-    "🏀  Basketball":   "admin.basketball",
-    "⚽  Football":     "admin.football",
-    "🏐  Volleyball":   "admin.volleyball",
-}
+if not disciplinas:
+    st.error("⚠️ No hay disciplinas: falta la carpeta results/ (o archive.zip).")
+    st.stop()
 
-deporte_label     = st.radio("Deporte", list(deportes.keys()), horizontal=True,
-                               label_visibility="collapsed")
+deportes = {d.etiqueta: d.vista for d in disciplinas}
+inicial  = next((i for i, d in enumerate(disciplinas) if d.nombre == DESTACADAS[0]), 0)
+
+deporte_label     = st.selectbox("Deporte", list(deportes.keys()), index=inicial,
+                                 label_visibility="collapsed",
+                                 placeholder="Escribe para filtrar las disciplinas…")
 nombre_vista_base = deportes[deporte_label]
 
 st.markdown("---")
@@ -289,6 +362,16 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 lista = obtener_participantes(base_url, username, password, nombre_vista_base)
+total_participantes = len(lista)
+
+if len(lista) > 50 and obtener_indice_participantes().tiene_vista(nombre_vista_base):
+    busqueda = st.text_input(
+        "🔎 Buscar participante",
+        placeholder="Prefijo o nombre aproximado (p. ej. «kipch», «ingebrigsten»)…",
+        key=f"busqueda_{nombre_vista_base}"
+    )
+    if busqueda.strip():
+        lista = obtener_indice_participantes().buscar(nombre_vista_base, busqueda) or lista
 
 if not lista:
     st.warning(
@@ -298,7 +381,7 @@ if not lista:
     lista = ["Competidor A", "Competidor B"]
 else:
     st.markdown(f"""<div style='font-size:11px;color:rgba(29,185,84,.55);margin-bottom:10px;'>
-        ✓ {len(lista)} participantes cargados desde <code style='color:#1db954;
+        ✓ {len(lista)} de {total_participantes} participantes cargados desde <code style='color:#1db954;
         background:rgba(29,185,84,.08);padding:1px 5px;border-radius:3px;'>{nombre_vista_base}</code>
     </div>""", unsafe_allow_html=True)
 
@@ -398,216 +481,116 @@ if analizar:
     prog   = st.progress(0)
     status = st.empty()
 
-    # ── DETECTOR DE PERFIL INVERSOR ──────────────────────────────────────
-    def detectar_perfil(texto: str) -> dict:
-        """
-        Analiza el texto del criterio y devuelve el perfil de inversión
-        con su lógica de scoring y terminología específica.
-        """
-        t = texto.lower()
-
-        # Palabras clave por perfil
-        PERFILES = {
-            "riesgo": {
-                "keywords": ["riesgo", "risk", "segur", "conservador", "publicitari",
-                             "brand", "imagen", "reputaci", "asimétric", "protec",
-                             "derrota", "perd", "evit"],
-                "nombre":    "Inversor Conservador — Minimización de Riesgo",
-                "emoji":     "🛡️",
-                "metrica_principal": "tasa_derrota",
-                "descripcion_metrica": "menor tasa de derrotas",
-                "pesos": {"win_rate": 0.3, "loss_rate_inv": 0.5, "volumen": 0.2},
-                "logica": lambda wa, la, ta, wb, lb, tb: (
-                    # Gana quien tiene MENOS derrotas (invertido: más alto = mejor)
-                    (1 - la/ta), (1 - lb/tb)
-                ),
-                "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
-                    f"INVERTIR EN {g.upper()} — PERFIL DE BAJO RIESGO. "
-                    f"Con solo una tasa de derrota del {round((1 - rate_g/100)*100, 1):.1f}% "
-                    f"frente al {round((1 - rate_p/100)*100, 1):.1f}% de {p}, {g} representa "
-                    f"la opción con menor exposición a resultados adversos. "
-                    f"Para una inversión publicitaria o de imagen de marca, "
-                    f"la probabilidad de asociación con derrotas es {dif:.1f}pp inferior. "
-                    f"Riesgo reducido = protección del capital reputacional."
-                ),
-                "analisis_ganador": lambda e, w, l, t, r: (
-                    f"Tasa de derrota del {round(l/t*100, 1):.1f}% — el activo más seguro del mercado. "
-                    f"Solo {l} derrotas en {t} encuentros. Bajo riesgo de exposición negativa de marca. "
-                    f"Perfil ideal para inversores con aversión al riesgo reputacional."
-                ),
-                "analisis_perdedor": lambda e, w, l, t, r: (
-                    f"Tasa de derrota del {round(l/t*100, 1):.1f}% — riesgo elevado para patrocinio. "
-                    f"{l} derrotas en {t} encuentros conllevan mayor probabilidad de exposición negativa. "
-                    f"Requiere prima de riesgo adicional para justificar la inversión."
-                ),
-            },
-            "volumen": {
-                "keywords": ["audiencia", "exposici", "visibilidad", "mercado", "fans",
-                             "seguidor", "volume", "partidos", "presencia", "alcance",
-                             "impacto", "mediatico", "mediatica"],
-                "nombre":    "Inversor de Audiencia — Maximización de Exposición",
-                "emoji":     "📡",
-                "metrica_principal": "partidos_jugados",
-                "descripcion_metrica": "mayor presencia competitiva",
-                "pesos": {"win_rate": 0.3, "volumen": 0.5, "loss_rate_inv": 0.2},
-                "logica": lambda wa, la, ta, wb, lb, tb: (
-                    # Gana quien juega MÁS partidos (más exposición mediática)
-                    max_t := max(ta, tb, 1),
-                    ta / max_t * 0.5 + wa/ta * 0.5,
-                    tb / max_t * 0.5 + wb/tb * 0.5,
-                )[-2:],
-                "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
-                    f"INVERTIR EN {g.upper()} — MÁXIMA EXPOSICIÓN MEDIÁTICA. "
-                    f"Con {total_g} encuentros disputados frente a {total_p} de {p}, "
-                    f"{g} ofrece {total_g - total_p} apariciones adicionales en medios. "
-                    f"Mayor volumen de partidos = mayor retorno en impresiones publicitarias "
-                    f"y cobertura mediática. Retorno por exposición superior en {round(total_g/max(total_p,1)*100-100, 1):.1f}%."
-                ),
-                "analisis_ganador": lambda e, w, l, t, r: (
-                    f"Con {t} partidos disputados, ofrece la mayor cobertura mediática disponible. "
-                    f"{w} victorias ({r}%) garantizan además un contexto ganador para las marcas patrocinadoras. "
-                    f"Activo de alta visibilidad con rendimiento sólido."
-                ),
-                "analisis_perdedor": lambda e, w, l, t, r: (
-                    f"Con {t} partidos, la presencia mediática es más limitada que su rival. "
-                    f"Menor volumen de apariciones reduce el potencial de retorno en exposición. "
-                    f"Válido para presupuestos de menor escala con objetivos locales."
-                ),
-            },
-            "dominancia": {
-                "keywords": ["dominan", "aplast", "superiorid", "top", "mejor",
-                             "elite", "premier", "excelenci", "campe", "champion",
-                             "maximo", "máximo", "potenci"],
-                "nombre":    "Inversor Premium — Activo de Élite",
-                "emoji":     "👑",
-                "metrica_principal": "ratio_wl",
-                "descripcion_metrica": "mayor ratio victorias/derrotas",
-                "pesos": {"win_rate": 0.6, "loss_rate_inv": 0.3, "volumen": 0.1},
-                "logica": lambda wa, la, ta, wb, lb, tb: (
-                    wa / max(la, 0.5),  # ratio W/L, evita div/0
-                    wb / max(lb, 0.5)
-                ),
-                "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
-                    f"INVERTIR EN {g.upper()} — ACTIVO DE ÉLITE VERIFICADO. "
-                    f"Ratio victorias/derrotas de {round(wins_g/max(total_g-wins_g, 0.5), 2):.2f}x "
-                    f"frente a {round(wins_p/max(total_p-wins_p, 0.5), 2):.2f}x de {p}. "
-                    f"{g} representa el activo premium: máximo rendimiento, "
-                    f"máxima asociación con el éxito deportivo. "
-                    f"Para posicionamiento de marca en el segmento élite, es la única opción viable."
-                ),
-                "analisis_ganador": lambda e, w, l, t, r: (
-                    f"Ratio W/L de {round(w/max(l, 0.5), 2):.2f}x — rendimiento de élite certificado. "
-                    f"{w} victorias vs {l} derrotas: el activo dominante de esta comparativa. "
-                    f"Asociación con este competidor proyecta excelencia y liderazgo de marca."
-                ),
-                "analisis_perdedor": lambda e, w, l, t, r: (
-                    f"Ratio W/L de {round(w/max(l, 0.5), 2):.2f}x — por debajo del estándar élite. "
-                    f"No alcanza el umbral de dominancia necesario para un posicionamiento premium. "
-                    f"Apto para estrategias de nicho o mercados secundarios."
-                ),
-            },
-        }
-
-        # Detectar perfil por keywords
-        perfil_detectado = None
-        max_matches = 0
-        for nombre_perfil, cfg in PERFILES.items():
-            matches = sum(1 for kw in cfg["keywords"] if kw in t)
-            if matches > max_matches:
-                max_matches = matches
-                perfil_detectado = nombre_perfil
-
-        # Default: rendimiento general (win rate puro)
-        if perfil_detectado is None or max_matches == 0:
-            return {
-                "nombre":    "Inversor de Rendimiento — Tasa de Victoria",
-                "emoji":     "📊",
-                "metrica_principal": "tasa_victoria",
-                "descripcion_metrica": "mayor tasa de victorias",
-                "logica": lambda wa, la, ta, wb, lb, tb: (wa/ta, wb/tb),
-                "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
-                    f"INVERTIR EN {g.upper()}. "
-                    f"Con {wins_g} victorias en {total_g} partidos ({rate_g}% de efectividad), "
-                    f"supera a {p} ({rate_p}%) en {dif:.1f} puntos porcentuales. "
-                    f"Mayor tasa de victoria = menor riesgo = mayor retorno esperado sobre la inversión."
-                ),
-                "analisis_ganador": lambda e, w, l, t, r: (
-                    f"Tasa de victoria del {r}% sobre {t} encuentros — rendimiento superior al rival. "
-                    f"Perfil consistente con {w} victorias que justifica la inversión. "
-                    f"Activo con retorno esperado positivo según métricas objetivas."
-                ),
-                "analisis_perdedor": lambda e, w, l, t, r: (
-                    f"Tasa de victoria del {r}% sobre {t} encuentros — por debajo del competidor. "
-                    f"Las {l} derrotas representan mayor volatilidad en el retorno esperado. "
-                    f"Se recomienda como activo secundario o complementario en cartera."
-                ),
-            }
-
-        return PERFILES[perfil_detectado]
-
-
-    def llamada_stats(sdk_url, auth, vista, entidad, timeout=90):
-        """Una sola llamada por entidad: wins, losses, total."""
-        q = (
-            f"In the view {vista}, for rows where participant_name = '{entidad}': "
-            f"count rows where result_wlt = 'W', "
-            f"count rows where result_wlt = 'L', "
-            f"and count total rows. "
-            f"Reply with exactly three integers separated by commas: wins,losses,total"
-        )
-        r = requests.post(
-            f"{sdk_url}/answerDataQuestion",
-            json={"question": q},
-            auth=auth,
-            timeout=timeout
-        )
-        r.raise_for_status()
-        texto = r.json().get("answer", "")
-        nums  = [int(n) for n in re.findall(r'\b(\d+)\b', texto)]
-        if len(nums) >= 3:
-            w, l, t = nums[0], nums[1], nums[2]
-        elif len(nums) == 2:
-            w, l, t = nums[0], nums[1], nums[0] + nums[1]
-        elif len(nums) == 1:
-            w, l, t = nums[0], 0, nums[0]
-        else:
-            w, l, t = 0, 0, 1
-        t = t or (w + l) or 1
-        return w, l, t, texto
-
-    auth   = (username, password)
-    sdk    = base_url.rstrip('/')
+    sdk    = obtener_cliente(base_url, username, password)
     perfil = detectar_perfil(criterio_prompt)
 
+    raiz = trazador.abrir("app.analisis", nueva_traza=True, vista=nombre_vista_base, perfil=perfil["nombre"],
+                          contrastar_sdk=contrastar_sdk)
+    span_scoring = span_render = None
     try:
-        # ── FASE 1: METADATOS ─────────────────────────────
-        status.markdown("🔍 **Fase 1/3** — Explorando esquema de la vista…")
+        # ── FASES 1-3 EN PARALELO ─────────────────────────
+        # Las estadísticas salen del índice precalculado de results/*.csv
+        # cuando el participante está en él; el SDK queda para el esquema y, si se pide,
+        # como contraste. Las llamadas al SDK se lanzan a la vez y la barra
+        # avanza según va terminando cada una.
+        status.markdown(
+            f"🚀 **Lanzando consultas en paralelo** — esquema, **{ea}** y **{eb}** "
+            f"[{perfil['emoji']} {perfil['nombre']}]…"
+        )
         prog.progress(10)
-        try:
-            meta_r    = requests.post(
-                f"{sdk}/answerMetadataQuestion",
-                json={"question": f"What columns exist in the view {nombre_vista_base}?"},
-                auth=auth, timeout=30
-            )
-            estrategia = meta_r.json().get("answer", "Schema consultado.")[:200]
-        except Exception:
-            estrategia = "Schema por defecto."
-        prog.progress(20)
 
-        # ── FASE 2: STATS ENTIDAD A ───────────────────────
-        status.markdown(f"📊 **Fase 2/3** — Analizando **{ea}** [{perfil['emoji']} {perfil['nombre']}]…")
-        wins_a, loss_a, total_a, raw_a = llamada_stats(sdk, auth, nombre_vista_base, ea)
+        etiquetas = {
+            "meta":  "🔍 Esquema de la vista",
+            "sdk_a": f"📊 Estadísticas de **{ea}** (SDK)",
+            "sdk_b": f"📊 Estadísticas de **{eb}** (SDK)",
+        }
+        resultados, errores, etapas = {}, {}, {}
+        # Los dos en el mismo género (como el grafo de enfrentamientos): "France"
+        # es la selección masculina o la femenina, nunca la suma de ambas
+        genero = indice_local.genero_comun(nombre_vista_base, ea, eb)
+        for clave, ent in (("a", ea), ("b", eb)):
+            with trazador.span(f"app.stats_{clave}", fuente="indice_local") as span:
+                local = indice_local.por_nombre(nombre_vista_base, ent, genero)
+                span.anotar(encontrado=local is not None)
+            if local is not None:
+                w, l, t = local.como_tupla()
+                etapas[clave] = local.etapa
+                resultados[clave] = (
+                    w, l, t,
+                    f"[índice local] {local.wins}W · {local.losses}L · {local.ties}T · "
+                    f"{local.total} partidos · última fase: {local.etapa}"
+                )
+
+        # Lo que no está en el índice local sale, si hay canal SQL, de una
+        # única consulta agrupada para las dos entidades
+        faltan = [(clave, ent) for clave, ent in (("a", ea), ("b", eb)) if clave not in resultados]
+        if faltan and conector_sql is not None:
+            with trazador.span("app.stats_sql", dialecto=conector_sql.dialecto) as span:
+                try:
+                    por_sql = llamada_stats_sql(conector_sql, nombre_vista_base,
+                                                [ent for _, ent in faltan])
+                except Exception as e:
+                    span.anotar(error=str(e))
+                    errores["sql"], por_sql = e, {}
+            for clave, ent in faltan:
+                if ent in por_sql:
+                    resultados[clave] = por_sql[ent]
+
+        # Con el circuito abierto no se espera al SDK: solo se le pregunta
+        # lo que no está en local (y falla al instante con CircuitoAbierto)
+        sdk_disponible = sdk.cortacircuitos.estado != Cortacircuitos.ABIERTO
+        if not sdk_disponible:
+            st.warning("⛔ El SDK no responde (circuito abierto): se usan solo los datos locales.")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futuros = {}
+            if sdk_disponible:
+                futuros[pool.submit(trazador.en_hilo("app.metadatos", llamada_metadatos),
+                                    sdk, nombre_vista_base)] = "meta"
+            for clave, ent in (("a", ea), ("b", eb)):
+                if clave not in resultados or (contrastar_sdk and sdk_disponible):
+                    llamada = trazador.en_hilo(f"app.stats_{clave}", llamada_stats, fuente="sdk")
+                    futuros[pool.submit(llamada, sdk, nombre_vista_base, ent)] = f"sdk_{clave}"
+            n = len(futuros) or 1
+            for i, fut in enumerate(as_completed(futuros), start=1):
+                clave = futuros[fut]
+                try:
+                    resultados[clave] = fut.result()
+                    status.markdown(f"✅ **{i}/{n}** — {etiquetas[clave]} completado")
+                except Exception as e:
+                    errores[clave] = e
+                    status.markdown(f"⚠️ **{i}/{n}** — {etiquetas[clave]} falló: {e}")
+                prog.progress(10 + i * 69 // n)
+
+        # Sin datos locales, la respuesta del SDK es la fuente principal
+        for clave in ("a", "b"):
+            if clave not in resultados and f"sdk_{clave}" in resultados:
+                resultados[clave] = resultados[f"sdk_{clave}"]
+
+        estrategia = resultados.get("meta", "Schema por defecto.")
+
+        # Un fallo en una entidad no descarta los datos ya obtenidos de la otra
+        if "a" not in resultados or "b" not in resultados:
+            for clave, ent in (("a", ea), ("b", eb)):
+                if clave in resultados:
+                    w, l, t, _ = resultados[clave]
+                    st.info(f"ℹ️ Datos obtenidos de **{ent}**: {w}W · {l}L · {t} partidos")
+            raise errores.get("sdk_a") or errores.get("sdk_b")
+
+        wins_a, loss_a, total_a, raw_a = resultados["a"]
         rate_a = round(wins_a / total_a * 100, 1)
-        prog.progress(55)
-
-        # ── FASE 3: STATS ENTIDAD B ───────────────────────
-        status.markdown(f"📊 **Fase 3/3** — Analizando **{eb}** [{perfil['emoji']} {perfil['nombre']}]…")
-        wins_b, loss_b, total_b, raw_b = llamada_stats(sdk, auth, nombre_vista_base, eb)
+        wins_b, loss_b, total_b, raw_b = resultados["b"]
         rate_b = round(wins_b / total_b * 100, 1)
         prog.progress(80)
 
         # ── SCORING BASADO EN PERFIL ──────────────────────
-        score_a, score_b = perfil["logica"](wins_a, loss_a, total_a, wins_b, loss_b, total_b)
+        span_scoring = trazador.abrir("app.scoring", perfil=perfil["nombre"])
+        # Elo precalculado en el índice; quien no está en results/ parte del inicial
+        elo_a = indice_local.rating(nombre_vista_base, ea, genero=genero)
+        elo_b = indice_local.rating(nombre_vista_base, eb, genero=genero)
+        score_a, score_b = perfil["logica"](wins_a, loss_a, total_a, wins_b, loss_b, total_b,
+                                            ELO_BASE if elo_a is None else elo_a,
+                                            ELO_BASE if elo_b is None else elo_b)
         ganador_calc  = ea if score_a >= score_b else eb
         perdedor_calc = eb if score_a >= score_b else ea
 
@@ -621,6 +604,18 @@ if analizar:
         total_p  = total_b if ganador_calc == ea else total_a
         rate_p   = rate_b  if ganador_calc == ea else rate_a
 
+        # Historial directo, rivales comunes y fuerza transitiva (Colley)
+        # desde el grafo de enfrentamientos de la vista
+        cara = None
+        with trazador.span("app.enfrentamientos") as span:
+            try:
+                grafo = obtener_grafos().grafo(nombre_vista_base)
+            except Exception:
+                grafo = None
+            if grafo is not None and ea in grafo and eb in grafo:
+                cara = grafo.comparar(ea, eb)
+            span.anotar(disponible=cara is not None)
+
         diferencia_rate = abs(rate_a - rate_b)
         diferencia_score = abs(score_a - score_b)
 
@@ -669,7 +664,11 @@ if analizar:
                     "derrotas":      loss_a,
                     "total_partidos": total_a,
                     "tasa_victoria": f"{rate_a}%",
+                    "fase_alcanzada": etapas.get("a"),
                     f"score_{perfil['metrica_principal']}": round(score_a, 3),
+                    "rating_elo": None if elo_a is None else round(elo_a),
+                    "cara_a_cara": str(cara["cara_a_cara"]) if cara else None,
+                    "fuerza_colley": round(cara["fuerza_a"], 3) if cara else None,
                 },
                 "valoracion_inversion": analisis_a_txt,
             },
@@ -681,7 +680,11 @@ if analizar:
                     "derrotas":      loss_b,
                     "total_partidos": total_b,
                     "tasa_victoria": f"{rate_b}%",
+                    "fase_alcanzada": etapas.get("b"),
                     f"score_{perfil['metrica_principal']}": round(score_b, 3),
+                    "rating_elo": None if elo_b is None else round(elo_b),
+                    "cara_a_cara": str(cara["cara_a_cara"].invertido()) if cara else None,
+                    "fuerza_colley": round(cara["fuerza_b"], 3) if cara else None,
                 },
                 "valoracion_inversion": analisis_b_txt,
             },
@@ -692,9 +695,12 @@ if analizar:
         }
 
         resultado_raw = {"raw_a": raw_a, "raw_b": raw_b}
+        trazador.cerrar(span_scoring)
         prog.progress(100)
         status.markdown("✅ **Due diligence completada**")
 
+        span_render = trazador.abrir("app.render")
+
         # Extraer campos
         nombre_a   = limpiar_nombre(datos_ia.get("entidad_a", {}).get("nombre", ea))
         stats_a    = datos_ia.get("entidad_a", {}).get("stats", "—")
@@ -796,6 +802,28 @@ if analizar:
             </div>
             """, unsafe_allow_html=True)
 
+        # ── CARA A CARA ───────────────────────────────────
+        if cara:
+            directo = cara["cara_a_cara"]
+            st.markdown(f"""
+            <div style='background:rgba(255,255,255,.03);border:1px solid rgba(80,200,120,.15);
+                        border-radius:10px;padding:14px 18px;margin-top:16px;font-size:13px;
+                        color:#a0dcb4;line-height:1.7;'>
+                <div style='font-size:10px;letter-spacing:.15em;
+                            color:rgba(29,185,84,.45);margin-bottom:6px;'>🤝 CARA A CARA</div>
+                <b>Directo:</b> {nombre_a} {directo if directo.partidos else "sin enfrentamientos"}
+                &nbsp;·&nbsp; <b>Rivales comunes:</b> {cara["rivales_comunes"]}
+                ({nombre_a} {cara["balance_comunes_a"]:+d}, {nombre_b} {cara["balance_comunes_b"]:+d})
+                &nbsp;·&nbsp; <b>Fuerza (Colley):</b> {cara["fuerza_a"]:.3f} vs {cara["fuerza_b"]:.3f}
+            </div>
+            """, unsafe_allow_html=True)
+            if cara["detalle_comunes"]:
+                with st.expander(f"🤝 Rivales comunes ({cara['rivales_comunes']})"):
+                    st.dataframe(pd.DataFrame([{"rival": c["rival"], nombre_a: str(c["a"]),
+                                                nombre_b: str(c["b"])}
+                                               for c in cara["detalle_comunes"]]),
+                                 use_container_width=True, hide_index=True)
+
         # ── VEREDICTO ─────────────────────────────────────
         st.markdown("---")
 
@@ -841,6 +869,24 @@ if analizar:
             📋 RECOMENDACIÓN DE INVERSIÓN</div>""", unsafe_allow_html=True)
         st.success(recomend)
 
+        if narrativa_sdk and sdk_disponible:
+            st.markdown("""<div style='font-size:11px;letter-spacing:.15em;
+                        color:rgba(29,185,84,.45);margin:4px 0 6px;'>
+                🧠 JUSTIFICACIÓN DEL SDK (EN DIRECTO)</div>""", unsafe_allow_html=True)
+            hueco = st.empty()
+            flujo = sdk.stream_question(pregunta_justificacion(nombre_vista_base, datos_ia,
+                                                               criterio_prompt),
+                                        vista=nombre_vista_base)
+            try:
+                for _ in flujo:
+                    hueco.markdown(flujo.texto + " ▌")
+                hueco.markdown(flujo.texto or "_El SDK no devolvió texto._")
+            except Exception as e:
+                hueco.warning(f"⚠️ Justificación del SDK no disponible: {e}")
+            finally:
+                # Si Streamlit corta el script (rerun, sesión cerrada) se cierra la conexión
+                flujo.cerrar()
+
         # ── EXPANDIBLES ───────────────────────────────────
         with st.expander("🔬 Fase 1 — Esquema consultado"):
             st.markdown(f"**Respuesta del Data Marketplace:** {estrategia}")
@@ -849,11 +895,26 @@ if analizar:
         with st.expander("🤖 Respuestas brutas del SDK (debug)"):
             st.markdown(f"**{ea}:** `{resultado_raw['raw_a'][:300]}`")
             st.markdown(f"**{eb}:** `{resultado_raw['raw_b'][:300]}`")
+            for clave, ent in (("sdk_a", ea), ("sdk_b", eb)):
+                if clave in resultados and resultados[clave] is not resultados[clave[-1]]:
+                    w, l, t, texto = resultados[clave]
+                    st.markdown(f"**{ent} (contraste SDK):** {w}W · {l}L · {t} — `{texto[:300]}`")
+                elif clave in errores:
+                    st.markdown(f"**{ent} (contraste SDK):** ❌ {errores[clave]}")
+
+        trazador.cerrar(span_render)
+        trazador.cerrar(raiz)
 
     except Exception as e:
+        for abierto in (span_render, span_scoring, raiz):
+            if abierto is not None:
+                trazador.cerrar(abierto, error=e)
         prog.progress(0)
         status.empty()
-        st.error(f"❌ Error al conectar con el SDK de Denodo: {e}")
+        if isinstance(e, CircuitoAbierto):
+            st.error(f"⛔ {e}. Los participantes sin datos en results/ no se pueden analizar ahora.")
+        else:
+            st.error(f"❌ Error al conectar con el SDK de Denodo: {e}")
         st.markdown(f"""
         <div style='background:rgba(255,80,60,.07);border:1px solid rgba(255,80,60,.2);
                     border-radius:10px;padding:16px 20px;font-size:13px;
@@ -865,6 +926,81 @@ if analizar:
         </div>
         """, unsafe_allow_html=True)
 
+    st.session_state["ultima_traza"] = trazador.traza(raiz.traza_id)
+
+
+# ─────────────────────────────────────────
+# RENDIMIENTO DE LA ÚLTIMA EJECUCIÓN
+# ─────────────────────────────────────────
+if st.session_state.get("ultima_traza"):
+    spans_ultima = st.session_state["ultima_traza"]
+    with st.expander("⏱️ Rendimiento — desglose de la última ejecución"):
+        raiz_ultima = next(s for s in spans_ultima if s.padre_id is None)
+        llamadas_sdk = [s for s in spans_ultima if s.nombre.startswith("sdk.")]
+        st.markdown(
+            f"**Total:** {raiz_ultima.duracion_s * 1000:.0f} ms · "
+            f"**Llamadas al SDK:** {len(llamadas_sdk)} "
+            f"({sum(s.atributos.get('cache') == 'hit' for s in llamadas_sdk)} desde caché)"
+        )
+        st.dataframe(pd.DataFrame(desglose(spans_ultima)), use_container_width=True, hide_index=True)
+        col_otel, col_prom = st.columns(2)
+        with col_otel:
+            st.download_button("📥 Spans (OTLP/JSON)",
+                               json.dumps(trazador.exportar_otel(spans_ultima), ensure_ascii=False),
+                               file_name="trazas.json", mime="application/json",
+                               use_container_width=True)
+        with col_prom:
+            st.download_button("📥 Métricas (Prometheus)", trazador.prometheus(),
+                               file_name="metricas.prom", mime="text/plain",
+                               use_container_width=True)
+
+
+# ─────────────────────────────────────────
+# MODO CARTERA — RANKING TOP-K
+# ─────────────────────────────────────────
+if obtener_indice_participantes().tiene_vista(nombre_vista_base):
+    st.markdown("---")
+    st.markdown("""<div style='font-family:"Bebas Neue",sans-serif;font-size:22px;
+                letter-spacing:.12em;color:#1db954;margin-bottom:6px;'>
+        🏆 MODO CARTERA — RANKING DE TODA LA DISCIPLINA</div>""", unsafe_allow_html=True)
+    st.markdown("""<div style='font-size:12px;color:rgba(160,220,180,.4);margin-bottom:8px;'>
+        Puntúa a todos los participantes de la vista con cada perfil inversor en una sola
+        pasada y ordena según el perfil detectado en tu criterio.
+    </div>""", unsafe_allow_html=True)
+
+    col_k, col_min, col_rank = st.columns([3, 3, 3])
+    with col_k:
+        top_k = st.slider("Top-K", min_value=3, max_value=50, value=10)
+    with col_min:
+        min_partidos = st.number_input("Mínimo de partidos / pruebas", min_value=1, value=3)
+    with col_rank:
+        st.markdown("<div style='height:28px;'></div>", unsafe_allow_html=True)
+        ranking = st.button("🏆 CALCULAR RANKING", use_container_width=True)
+
+    if ranking:
+        perfil_cartera = detectar_perfil(criterio_prompt)
+        nombres_v, wins_v, loss_v, total_v = indice_local.tabla_vista(nombre_vista_base)
+        descripcion = perfil_cartera["descripcion_metrica"]
+        tabla_marcas = obtener_marcas().tabla(nombre_vista_base)
+        if wins_v.sum() + loss_v.sum() == 0 and tabla_marcas is not None:
+            # Disciplina sin W/L/T: se puntúa por puesto y margen en cada prueba
+            nombres_v = tabla_marcas.nombres
+            top = clasificar_marcas(nombres_v, tabla_marcas.metricas(), perfil_cartera,
+                                    k=top_k, min_pruebas=min_partidos)
+            descripcion = perfil_cartera["descripcion_marcas"] + " (por rank/result)"
+        else:
+            top = clasificar(nombres_v, wins_v, loss_v, total_v, perfil_cartera,
+                             k=top_k, min_partidos=min_partidos,
+                             r=indice_local.ratings_vista(nombre_vista_base))
+        st.markdown(f"""<div style='font-size:12px;color:#1db954;margin:6px 0 10px;'>
+            {perfil_cartera['emoji']} Ordenado por: <b>{perfil_cartera['nombre']}</b>
+            · {descripcion} · {len(nombres_v)} participantes evaluados
+        </div>""", unsafe_allow_html=True)
+        if top:
+            st.dataframe(pd.DataFrame(top), use_container_width=True, hide_index=True)
+        else:
+            st.info("Ningún participante alcanza el mínimo de partidos indicado.")
+
 
 # ─────────────────────────────────────────
 # FOOTER
@@ -0,0 +1,221 @@
+"""
+Benchmark de latencia y throughput contra un stub local del Denodo AI SDK.
+
+Arranca `motor.stub_sdk.ServidorStub` con latencia, jitter y tasa de errores
+configurables y ejecuta cada escenario (flujo de dos fases de bot.py y las
+funciones de análisis del frontend) a varias concurrencias. Informa p50/p95/p99
+y peticiones por segundo y guarda el resultado en JSON; con --comparar se
+contrasta contra una ejecución anterior y sale con código 1 si hay regresión.
+
+    python benchmark.py --latencia 0.05 --jitter 0.02 --tasa-error 0.01 --concurrencias 1 4 16
+    python benchmark.py --comparar benchmarks/base.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from bot import CREDENCIALES, fase1, fase2
+from motor.analisis import (llamada_metadatos, llamada_stats, llamada_stats_sql,
+                            obtener_participantes, participantes_sdk)
+from motor.conectores import obtener_conector
+from motor.indice import obtener_indice
+from motor.participantes import obtener_indice_participantes
+from motor.perfiles import detectar_perfil
+from motor.sdk import ClienteSDK
+from motor.stub_sdk import ServidorStub
+
+RUTA_BENCHMARKS = Path(__file__).resolve().parent / "benchmarks"
+
+VISTA_BENCHMARK = "admin.basketball"
+
+PROBLEMAS = [
+    "Quiero invertir en el equipo con menos riesgo de perder",
+    "Busco el participante con mas partidos jugados para patrocinio",
+    "Necesito al dominador absoluto de la competicion",
+    "Que seleccion tiene mejor rendimiento en fases finales",
+]
+
+
+# ─────────────────────────────────────────
+# ESCENARIOS
+# ─────────────────────────────────────────
+# Cada escenario recibe (cliente, i, nombres) y ejecuta una operación completa.
+
+def _bot_dos_fases(cliente, i, nombres):
+    problema = PROBLEMAS[i % len(PROBLEMAS)]
+    tabla = fase1(cliente, problema)
+    return fase2(cliente, problema, tabla)
+
+def _llamada_stats(cliente, i, nombres):
+    return llamada_stats(cliente, VISTA_BENCHMARK, nombres[i % len(nombres)])
+
+def _stats_sql(cliente, i, nombres):
+    # Las dos entidades de un análisis en una consulta agrupada (sustituto SQLite)
+    pareja = [nombres[i % len(nombres)], nombres[(i + 1) % len(nombres)]]
+    return llamada_stats_sql(obtener_conector("sqlite"), VISTA_BENCHMARK, pareja)
+
+def _llamada_metadatos(cliente, i, nombres):
+    return llamada_metadatos(cliente, VISTA_BENCHMARK)
+
+def _participantes_local(cliente, i, nombres):
+    return obtener_participantes(cliente, VISTA_BENCHMARK)
+
+def _participantes_sdk(cliente, i, nombres):
+    if not participantes_sdk(cliente, VISTA_BENCHMARK):
+        raise RuntimeError("el SDK no devolvió participantes")
+
+def _detectar_perfil(cliente, i, nombres):
+    return detectar_perfil(PROBLEMAS[i % len(PROBLEMAS)])
+
+ESCENARIOS = {
+    "bot_dos_fases":        _bot_dos_fases,
+    "llamada_stats":        _llamada_stats,
+    "stats_sql":            _stats_sql,
+    "llamada_metadatos":    _llamada_metadatos,
+    "participantes_local":  _participantes_local,
+    "participantes_sdk":    _participantes_sdk,
+    "detectar_perfil":      _detectar_perfil,
+}
+
+
+# ─────────────────────────────────────────
+# MEDICIÓN
+# ─────────────────────────────────────────
+
+def _una(funcion, cliente, i, nombres):
+    inicio = time.perf_counter()
+    try:
+        funcion(cliente, i, nombres)
+        return time.perf_counter() - inicio, None
+    except Exception as e:
+        return time.perf_counter() - inicio, f"{type(e).__name__}: {e}"
+
+def medir(escenario: str, base_url: str, concurrencia: int, operaciones: int,
+          nombres: list[str]) -> dict:
+    """Lanza `operaciones` ejecuciones del escenario con `concurrencia` hilos."""
+    funcion = ESCENARIOS[escenario]
+    # Sin caché: se mide el viaje al SDK, no el SQLite local
+    cliente = ClienteSDK(base_url, *CREDENCIALES, tamano_pool=concurrencia, cache=None)
+    try:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            medidas = list(pool.map(lambda i: _una(funcion, cliente, i, nombres), range(operaciones)))
+        duracion = time.perf_counter() - inicio
+    finally:
+        cliente.cerrar()
+
+    latencias = np.array([s for s, error in medidas if error is None]) * 1000
+    errores = [error for _, error in medidas if error is not None]
+    p50, p95, p99 = (np.round(np.percentile(latencias, [50, 95, 99]), 3).tolist()
+                     if len(latencias) else (None,) * 3)
+    return {
+        "escenario": escenario,
+        "concurrencia": concurrencia,
+        "operaciones": operaciones,
+        "errores": len(errores),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "rps": round(operaciones / duracion, 2),
+        "duracion_s": round(duracion, 3),
+        "ejemplo_error": errores[0] if errores else None,
+    }
+
+
+# ─────────────────────────────────────────
+# COMPARACIÓN ENTRE EJECUCIONES
+# ─────────────────────────────────────────
+
+def comparar(actual: dict, base: dict, umbral: float = 0.10) -> list[str]:
+    """
+    Regresiones de `actual` frente a `base` en los mismos (escenario, concurrencia):
+    p95 más de `umbral` por encima o rps más de `umbral` por debajo.
+    """
+    previos = {(r["escenario"], r["concurrencia"]): r for r in base["resultados"]}
+    regresiones = []
+    for r in actual["resultados"]:
+        b = previos.get((r["escenario"], r["concurrencia"]))
+        if b is None:
+            continue
+        etiqueta = f"{r['escenario']} ×{r['concurrencia']}"
+        if b["p95_ms"] and r["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + umbral):
+            regresiones.append(f"{etiqueta}: p95 {b['p95_ms']} -> {r['p95_ms']} ms")
+        if b["rps"] and r["rps"] < b["rps"] * (1 - umbral):
+            regresiones.append(f"{etiqueta}: rps {b['rps']} -> {r['rps']}")
+    return regresiones
+
+def _imprimir(resultados: list[dict]):
+    print(f"\n{'escenario':<22}{'conc':>5}{'ops':>6}{'err':>5}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}")
+    for r in resultados:
+        p50, p95, p99 = (float("nan") if v is None else v for v in (r["p50_ms"], r["p95_ms"], r["p99_ms"]))
+        print(f"{r['escenario']:<22}{r['concurrencia']:>5}{r['operaciones']:>6}{r['errores']:>5}"
+              f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{r['rps']:>10.1f}")
+
+def main(args) -> int:
+    servidor = ServidorStub(latencia=args.latencia, jitter=args.jitter,
+                            tasa_error=args.tasa_error, semilla=args.semilla).arrancar()
+    print(f"Stub del SDK en {servidor.url} (latencia {args.latencia}s ± {args.jitter}s, "
+          f"errores {args.tasa_error:.0%})")
+
+    nombres = obtener_indice().tabla_vista(VISTA_BENCHMARK)[0] or ["Participante"]
+    obtener_indice_participantes()  # se construye fuera de la medición
+    if "stats_sql" in args.escenarios:
+        _stats_sql(None, 0, nombres)
+    resultados = []
+    try:
+        for escenario in args.escenarios:
+            for concurrencia in args.concurrencias:
+                r = medir(escenario, servidor.url, concurrencia, args.operaciones, nombres)
+                resultados.append(r)
+                print(f"  {escenario} ×{concurrencia}: p95 {r['p95_ms']} ms · {r['rps']} rps")
+    finally:
+        servidor.parar()
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "config": {"latencia": args.latencia, "jitter": args.jitter,
+                   "tasa_error": args.tasa_error, "operaciones": args.operaciones,
+                   "semilla": args.semilla},
+        "resultados": resultados,
+    }
+    _imprimir(resultados)
+
+    salida = Path(args.salida or RUTA_BENCHMARKS / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultados -> {salida}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        if base.get("config") != informe["config"]:
+            print("Aviso: la ejecución base usó otra configuración del stub")
+        regresiones = comparar(informe, base, args.umbral)
+        for linea in regresiones:
+            print(f"REGRESIÓN {linea}")
+        if regresiones:
+            return 1
+        print(f"Sin regresiones frente a {args.comparar} (umbral {args.umbral:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark contra un stub local del SDK")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Segundos por respuesta del stub")
+    parser.add_argument("--jitter", type=float, default=0.02, help="± segundos aleatorios")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Fracción de respuestas 500")
+    parser.add_argument("--semilla", type=int, default=2024)
+    parser.add_argument("--operaciones", type=int, default=200, help="Operaciones por escenario y concurrencia")
+    parser.add_argument("--concurrencias", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--salida", help="JSON de resultados (por defecto benchmarks/bench_<fecha>.json)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument("--umbral", type=float, default=0.10, help="Empeoramiento tolerado (0.10 = 10%%)")
+    sys.exit(main(parser.parse_args()))
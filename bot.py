@@ -1,54 +1,257 @@
-import requests
+import argparse
+import csv
+import hashlib
 import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from motor.sdk import obtener_cliente
+from motor.trazas import desglose, obtener_trazador
 
 BASE_URL = "http://localhost:8008"
 CREDENCIALES = ('admin', 'admin')
 
-def motor_decisiones_dinamico():
+def pregunta_fase1(problema_usuario):
+    return f"Actuas como un analista de datos. El usuario tiene este problema de negocio: '{problema_usuario}'. Identifica que tablas en el catalogo contienen la informacion necesaria para resolverlo."
+
+def pregunta_fase2(problema_usuario, tabla_descubierta):
+    return f"El problema de negocio a resolver es este: '{problema_usuario}'. Usando exclusivamente la tabla {tabla_descubierta}, genera una consulta SQL para encontrar el top 3 de canciones que mejor se adapten a los requisitos. Ejecutala y devuelveme una recomendacion final justificada explicando por que ese artista es la mejor opcion."
+
+def fase1(cliente, problema_usuario):
+    """Descubre la tabla del catalogo que resuelve el problema."""
+    with obtener_trazador().span("bot.fase1") as span:
+        datos_meta = cliente.answer_metadata_question(pregunta_fase1(problema_usuario))
+        tablas_usadas = datos_meta.tables_used
+        tabla = tablas_usadas[0] if tablas_usadas else "las tablas musicales del catalogo"
+        span.anotar(tabla=tabla)
+        return tabla
+
+def fase2(cliente, problema_usuario, tabla_descubierta):
+    """Genera y ejecuta la consulta SQL y devuelve la recomendacion."""
+    with obtener_trazador().span("bot.fase2", tabla=tabla_descubierta):
+        return cliente.answer_data_question(pregunta_fase2(problema_usuario, tabla_descubierta))
+
+def fase2_streaming(cliente, problema_usuario, tabla_descubierta, salida=sys.stdout):
+    """
+    Fase 2 escribiendo la recomendacion en `salida` segun llega del SDK.
+    Devuelve la RespuestaSDK completa, o None si se corto con Ctrl+C.
+    """
+    with obtener_trazador().span("bot.fase2", tabla=tabla_descubierta, streaming=True):
+        flujo = cliente.stream_question(pregunta_fase2(problema_usuario, tabla_descubierta))
+        try:
+            for fragmento in flujo:
+                salida.write(fragmento)
+                salida.flush()
+        except KeyboardInterrupt:
+            salida.write("\n[respuesta cancelada]\n")
+        finally:
+            flujo.cerrar()
+        return flujo.respuesta
+
+def imprimir_desglose(spans):
+    """Tabla de tiempos por fase y llamada al SDK de una traza."""
+    print("--- Tiempos ---")
+    for fila in desglose(spans):
+        extra = f"  [{fila['atributos']}]" if fila["atributos"] else ""
+        print(f"{fila['span']:<36}{fila['ms']:>10.1f} ms{extra}")
+
+def motor_decisiones_dinamico(streaming=True):
     print("="*60)
     print(" MOTOR DE DECISIONES AUTONOMO (HackUDC) ")
     print("="*60)
-    
+
+    cliente = obtener_cliente(BASE_URL, *CREDENCIALES)
     problema_usuario = input("\nIntroduce el problema de negocio a resolver:\n> ")
-    
+
+    trazador = obtener_trazador()
+    with trazador.span("bot.decision"):
+        _decidir_interactivo(cliente, problema_usuario, streaming)
+    imprimir_desglose(trazador.ultima_traza("bot.decision"))
+
+def _decidir_interactivo(cliente, problema_usuario, streaming=True):
     print("\nFASE 1: Descubriendo el entorno de datos y metricas...")
-    payload_meta = {
-        "question": f"Actuas como un analista de datos. El usuario tiene este problema de negocio: '{problema_usuario}'. Identifica que tablas en el catalogo contienen la informacion necesaria para resolverlo."
-    }
-    
     try:
-        respuesta_meta = requests.post(f"{BASE_URL}/answerMetadataQuestion", json=payload_meta, auth=CREDENCIALES)
-        respuesta_meta.raise_for_status()
-        datos_meta = respuesta_meta.json()
-        
-        tablas_usadas = datos_meta.get('tables_used', [])
-        tabla_descubierta = tablas_usadas[0] if tablas_usadas else "las tablas musicales del catalogo"
-        
+        tabla_descubierta = fase1(cliente, problema_usuario)
+
         print(f"Entorno analizado. Tabla seleccionada por la IA: {tabla_descubierta}\n")
-        
+
     except Exception as e:
         print(f"Error en Fase 1: {e}")
         return
 
     print("FASE 2: Ejecutando consultas SQL y tomando la decision...")
-    payload_datos = {
-        "question": f"El problema de negocio a resolver es este: '{problema_usuario}'. Usando exclusivamente la tabla {tabla_descubierta}, genera una consulta SQL para encontrar el top 3 de canciones que mejor se adapten a los requisitos. Ejecutala y devuelveme una recomendacion final justificada explicando por que ese artista es la mejor opcion."
-    }
-    
     try:
-        respuesta_datos = requests.post(f"{BASE_URL}/answerDataQuestion", json=payload_datos, auth=CREDENCIALES)
-        respuesta_datos.raise_for_status()
-        datos_finales = respuesta_datos.json()
-        
         print("\n=== CONCLUSION Y RECOMENDACION ===\n")
-        print(datos_finales.get('answer', 'Error al generar la respuesta.'))
-        
+        if streaming:
+            # La recomendacion se imprime segun llega; Ctrl+C la corta
+            datos_finales = fase2_streaming(cliente, problema_usuario, tabla_descubierta)
+            print()
+            if datos_finales is None:
+                return
+        else:
+            datos_finales = fase2(cliente, problema_usuario, tabla_descubierta)
+            print(datos_finales.answer or 'Error al generar la respuesta.')
+
         print("\n(Consulta SQL generada y ejecutada de forma autonoma:)")
-        print(datos_finales.get('sql_query', 'N/A'))
+        print(datos_finales.sql_query or 'N/A')
         print("\n" + "="*60 + "\n")
-        
+
     except Exception as e:
         print(f"Error en Fase 2: {e}")
 
+# ─────────────────────────────────────────
+# MODO LOTE
+# ─────────────────────────────────────────
+
+def id_de_problema(texto):
+    """Id estable de un problema sin 'id': no depende de la linea en que este."""
+    return "h" + hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+def leer_problemas(ruta):
+    """
+    Lee (id, problema) de un JSONL ({"id", "problema"}) o de un CSV con
+    columna 'problema'. Sin 'id', el id sale del texto del problema, asi que
+    reanudar sigue saltando los mismos aunque se anadan o quiten lineas.
+    """
+    ruta = Path(ruta)
+    with open(ruta, newline="", encoding="utf-8") as f:
+        if ruta.suffix.lower() == ".csv":
+            filas = list(csv.DictReader(f))
+        else:
+            filas = [json.loads(linea) for linea in f if linea.strip()]
+    problemas = []
+    for fila in filas:
+        texto = (fila.get("problema") or fila.get("question") or "").strip()
+        if texto:
+            problemas.append((str(fila.get("id") or id_de_problema(texto)), texto))
+    return problemas
+
+def leer_completados(ruta_salida):
+    """Ids ya resueltos sin error en una ejecucion anterior (para reanudar)."""
+    completados = set()
+    if not os.path.exists(ruta_salida):
+        return completados
+    with open(ruta_salida, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                continue  # ultima linea a medio escribir si el proceso murio
+            if not registro.get("error"):
+                completados.add(str(registro.get("id")))
+    return completados
+
+def _medir(funcion, *args):
+    inicio = time.perf_counter()
+    return funcion(*args), round(time.perf_counter() - inicio, 3)
+
+def procesar_lote(ruta_entrada, ruta_salida, concurrencia=4, cliente=None):
+    """
+    Resuelve todos los problemas del fichero encadenando Fase 1 y Fase 2 en
+    dos pools con concurrencia acotada: en cuanto un problema termina la
+    Fase 1 entra en la Fase 2, mientras otros siguen en la Fase 1. Cada
+    resultado se anade a `ruta_salida` (JSONL) al terminar, y los ids ya
+    completados sin error se saltan, asi que relanzar el mismo comando
+    reanuda una ejecucion interrumpida.
+    """
+    cliente = cliente or obtener_cliente(BASE_URL, *CREDENCIALES)
+    problemas = leer_problemas(ruta_entrada)
+    completados = leer_completados(ruta_salida)
+    pendientes = [(i, p) for i, p in problemas if i not in completados]
+    print(f"{len(problemas)} problemas · {len(problemas) - len(pendientes)} ya completados · "
+          f"{len(pendientes)} pendientes (concurrencia {concurrencia})")
+
+    # Si la ejecucion anterior murio a mitad de linea, se empieza en una nueva
+    if os.path.exists(ruta_salida) and os.path.getsize(ruta_salida):
+        with open(ruta_salida, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                with open(ruta_salida, "a", encoding="utf-8") as salida:
+                    salida.write("\n")
+
+    inicio = {}
+    resumen = {"ok": 0, "error": 0}
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool_f1, \
+         ThreadPoolExecutor(max_workers=concurrencia) as pool_f2, \
+         open(ruta_salida, "a", encoding="utf-8") as salida:
+
+        en_vuelo = {}
+        for id_problema, problema in pendientes:
+            inicio[id_problema] = time.perf_counter()
+            en_vuelo[pool_f1.submit(_medir, fase1, cliente, problema)] = ("fase1", id_problema, problema, None)
+
+        try:
+            _consumir(en_vuelo, pool_f2, cliente, inicio, resumen, len(pendientes), salida)
+        except KeyboardInterrupt:
+            # Sin esto, al salir del with se ejecutaria toda la cola de la Fase 1
+            # contra el SDK con la salida ya cerrada: solo terminan las que estan en curso
+            pool_f1.shutdown(wait=False, cancel_futures=True)
+            pool_f2.shutdown(wait=False, cancel_futures=True)
+            print(f"\nLote interrumpido: {resumen['ok']} OK · {resumen['error']} con error; "
+                  f"relanza el mismo comando para reanudar")
+            raise
+
+    print(f"Lote terminado: {resumen['ok']} OK · {resumen['error']} con error -> {ruta_salida}")
+    return resumen
+
+def _consumir(en_vuelo, pool_f2, cliente, inicio, resumen, total, salida):
+    """Recoge los futuros segun terminan: Fase 1 -> Fase 2 -> registro en `salida`."""
+    while en_vuelo:
+        terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+        for fut in terminados:
+            fase, id_problema, problema, datos = en_vuelo.pop(fut)
+            registro = None
+            try:
+                resultado, segundos = fut.result()
+                if fase == "fase1":
+                    datos = {"tabla": resultado, "fase1_s": segundos}
+                    en_vuelo[pool_f2.submit(_medir, fase2, cliente, problema, resultado)] = \
+                        ("fase2", id_problema, problema, datos)
+                else:
+                    registro = {
+                        "id": id_problema, "problema": problema, "tabla": datos["tabla"],
+                        "answer": resultado.answer, "sql_query": resultado.sql_query,
+                        "tables_used": resultado.tables_used, "error": None,
+                        "tiempos": {"fase1_s": datos["fase1_s"], "fase2_s": segundos},
+                    }
+            except Exception as e:
+                registro = {
+                    "id": id_problema, "problema": problema,
+                    "tabla": (datos or {}).get("tabla"), "answer": None, "sql_query": None,
+                    "tables_used": [], "error": f"Error en {fase.replace('fase', 'Fase ')}: {e}",
+                    "tiempos": {"fase1_s": (datos or {}).get("fase1_s")},
+                }
+
+            if registro is not None:
+                registro["tiempos"]["total_s"] = round(time.perf_counter() - inicio[id_problema], 3)
+                salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                salida.flush()
+                resumen["error" if registro["error"] else "ok"] += 1
+                print(f"[{sum(resumen.values())}/{total}] {id_problema}: "
+                      f"{registro['error'] or 'OK'} ({registro['tiempos']['total_s']}s)")
+
 if __name__ == "__main__":
-    motor_decisiones_dinamico()
+    parser = argparse.ArgumentParser(description="Motor de decisiones autonomo (HackUDC)")
+    parser.add_argument("--lote", help="Fichero JSONL/CSV con un problema de negocio por registro")
+    parser.add_argument("--salida", default="resultados.jsonl", help="JSONL de resultados (modo lote)")
+    parser.add_argument("--concurrencia", type=int, default=4, help="Peticiones simultaneas por fase")
+    parser.add_argument("--sin-streaming", action="store_true",
+                        help="Esperar a la respuesta completa de la Fase 2 en vez de mostrarla segun llega")
+    parser.add_argument("--trazas", help="Guardar los spans en este fichero (OTLP/JSON) al terminar")
+    parser.add_argument("--metricas", help="Guardar las metricas en este fichero (texto Prometheus)")
+    args = parser.parse_args()
+
+    if args.lote:
+        procesar_lote(args.lote, args.salida, args.concurrencia)
+    else:
+        motor_decisiones_dinamico(streaming=not args.sin_streaming)
+
+    if args.trazas:
+        with open(args.trazas, "w", encoding="utf-8") as f:
+            json.dump(obtener_trazador().exportar_otel(), f, ensure_ascii=False)
+    if args.metricas:
+        with open(args.metricas, "w", encoding="utf-8") as f:
+            f.write(obtener_trazador().prometheus())
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import time
+
+from bot import BASE_URL, CREDENCIALES, leer_problemas, pregunta_fase1, pregunta_fase2
+from motor.cache import obtener_cache
+from motor.sdk_async import ClienteSDKAsync
+
+# Plazos por defecto de cada fase (segundos)
+PLAZO_FASE1 = 30
+PLAZO_FASE2 = 90
+
+async def fase1(cliente, problema_usuario):
+    """Descubre la tabla del catalogo que resuelve el problema."""
+    datos_meta = await cliente.answer_metadata_question(pregunta_fase1(problema_usuario))
+    tablas_usadas = datos_meta.tables_used
+    return tablas_usadas[0] if tablas_usadas else "las tablas musicales del catalogo"
+
+async def fase2(cliente, problema_usuario, tabla_descubierta):
+    """Genera y ejecuta la consulta SQL y devuelve la recomendacion."""
+    return await cliente.answer_data_question(pregunta_fase2(problema_usuario, tabla_descubierta))
+
+async def decidir(cliente, problema_usuario, id_problema=None,
+                  plazo_fase1=PLAZO_FASE1, plazo_fase2=PLAZO_FASE2):
+    """
+    Fase 1 -> Fase 2 para un problema, cada fase con su propio plazo.
+    Devuelve el mismo registro que el modo lote de bot.py; los errores
+    (incluido agotar un plazo) quedan en "error" en lugar de propagarse.
+    La cancelacion (CancelledError) si se propaga.
+    """
+    registro = {"id": id_problema, "problema": problema_usuario, "tabla": None,
+                "answer": None, "sql_query": None, "tables_used": [], "error": None,
+                "tiempos": {}}
+    inicio = time.perf_counter()
+    fase = "Fase 1"
+    try:
+        t = time.perf_counter()
+        registro["tabla"] = await asyncio.wait_for(fase1(cliente, problema_usuario), plazo_fase1)
+        registro["tiempos"]["fase1_s"] = round(time.perf_counter() - t, 3)
+
+        fase = "Fase 2"
+        t = time.perf_counter()
+        datos_finales = await asyncio.wait_for(
+            fase2(cliente, problema_usuario, registro["tabla"]), plazo_fase2)
+        registro["tiempos"]["fase2_s"] = round(time.perf_counter() - t, 3)
+
+        registro["answer"] = datos_finales.answer
+        registro["sql_query"] = datos_finales.sql_query
+        registro["tables_used"] = datos_finales.tables_used
+    except asyncio.TimeoutError:
+        plazo = plazo_fase1 if fase == "Fase 1" else plazo_fase2
+        registro["error"] = f"Error en {fase}: plazo de {plazo}s agotado"
+    except Exception as e:
+        registro["error"] = f"Error en {fase}: {e}"
+    registro["tiempos"]["total_s"] = round(time.perf_counter() - inicio, 3)
+    return registro
+
+async def decidir_muchos(cliente, problemas, concurrencia=10,
+                         plazo_fase1=PLAZO_FASE1, plazo_fase2=PLAZO_FASE2, al_terminar=None):
+    """
+    Lanza una sesion de decision por cada (id, problema), con como mucho
+    `concurrencia` sesiones en vuelo a la vez. `al_terminar(registro)` se
+    llama segun va acabando cada una. Si se cancela esta corrutina, se
+    cancelan todas las sesiones pendientes.
+    """
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def una(id_problema, problema):
+        async with semaforo:
+            registro = await decidir(cliente, problema, id_problema, plazo_fase1, plazo_fase2)
+        if al_terminar:
+            al_terminar(registro)
+        return registro
+
+    tareas = [asyncio.create_task(una(i, p)) for i, p in problemas]
+    try:
+        return await asyncio.gather(*tareas)
+    except BaseException:
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        raise
+
+async def main(args):
+    servidor = None
+    base_url = BASE_URL
+    if args.stub is not None:
+        from motor.stub_sdk import ServidorStub
+        servidor = ServidorStub(latencia=args.stub).arrancar()
+        base_url = servidor.url
+        print(f"Usando stub local del SDK en {base_url} (latencia {args.stub}s)")
+
+    try:
+        problemas = leer_problemas(args.lote)
+        cache = None if (args.sin_cache or args.stub is not None) else obtener_cache()
+        inicio = time.perf_counter()
+        # En modo append, como bot.py: nunca se pisa un fichero de resultados anterior
+        with open(args.salida, "a", encoding="utf-8") as salida:
+            def escribir(registro):
+                salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                salida.flush()
+                print(f"{registro['id']}: {registro['error'] or 'OK'} ({registro['tiempos']['total_s']}s)")
+
+            async with ClienteSDKAsync(base_url, *CREDENCIALES, tamano_pool=args.concurrencia,
+                                       cache=cache) as cliente:
+                registros = await decidir_muchos(cliente, problemas, args.concurrencia,
+                                                 args.plazo_fase1, args.plazo_fase2, escribir)
+        ok = sum(1 for r in registros if not r["error"])
+        print(f"{ok}/{len(registros)} decisiones en {time.perf_counter() - inicio:.2f}s -> {args.salida}")
+    finally:
+        if servidor:
+            servidor.parar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Motor de decisiones asincrono (HackUDC)")
+    parser.add_argument("lote", help="Fichero JSONL/CSV con un problema de negocio por registro")
+    # Distinto del de bot.py --lote, que es además su estado para reanudar
+    parser.add_argument("--salida", default="resultados_async.jsonl")
+    parser.add_argument("--concurrencia", type=int, default=20, help="Sesiones simultaneas")
+    parser.add_argument("--plazo-fase1", type=float, default=PLAZO_FASE1)
+    parser.add_argument("--plazo-fase2", type=float, default=PLAZO_FASE2)
+    parser.add_argument("--sin-cache", action="store_true", help="No usar la cache en disco")
+    parser.add_argument("--stub", type=float, metavar="LATENCIA", default=None,
+                        help="Arrancar un stub local del SDK con esa latencia en vez del real")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,3 @@
+"""
+Núcleo compartido entre el CLI (bot.py) y el frontend Streamlit (Frontend/app.py).
+"""
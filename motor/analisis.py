@@ -0,0 +1,158 @@
+"""
+Funciones de análisis del frontend, sin dependencia de Streamlit.
+
+`Frontend/app.py` las envuelve con su caché y su interfaz; aquí quedan como
+funciones puras sobre un `ClienteSDK` para poder llamarlas desde el CLI o
+desde el benchmark (`benchmark.py`).
+"""
+import json
+import re
+
+from motor.consultas import consulta_wlt, estadisticas_vista
+from motor.participantes import obtener_indice_participantes
+
+
+def limpiar_nombre(nombre: str) -> str:
+    """Elimina artefactos de la IA: pipes, asteriscos, guiones, listas, etc."""
+    nombre = nombre.strip()
+    nombre = re.sub(r'[`*_]', '', nombre)
+    nombre = nombre.strip('|').strip()
+    nombre = re.sub(r'^[\d]+[.)]\s*', '', nombre)
+    nombre = re.sub(r'^[-•–]\s*', '', nombre)
+    nombre = nombre.strip('"\'')
+    return nombre.strip()
+
+def extraer_json_de_texto(texto: str) -> dict:
+    """Extrae el primer objeto JSON válido ignorando todo el ruido alrededor."""
+    inicio = texto.find('{')
+    fin    = texto.rfind('}')
+    if inicio != -1 and fin != -1:
+        try:
+            return json.loads(texto[inicio:fin + 1])
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+PALABRAS_RUIDO = {
+    "aquí", "aqui", "los", "las", "a continuación", "continuacion",
+    "disclaimer", "siguiente", "resultado", "resultados", "valores",
+    "columna", "tabla", "here", "the", "following", "distinct",
+    "query", "sql", "select", "from", "limit", "nota", "note",
+    "importante", "son:", "son", "participants", "participant",
+    "names", "name", "países", "paises", "teams", "team",
+    "lista", "list", "estos", "estas", "únicos", "unicos"
+}
+
+
+# ─────────────────────────────────────────
+# PARTICIPANTES
+# ─────────────────────────────────────────
+
+def pregunta_participantes(nombre_vista: str) -> str:
+    return (
+        f"Necesito los valores únicos que existen en la columna participant_name "
+        f"de la vista {nombre_vista}. "
+        f"Dame los primeros 50 valores distintos que encuentres. "
+        f"RESPONDE ÚNICAMENTE con los valores, uno por línea, "
+        f"sin numeración, sin guiones, sin markdown, sin explicaciones, "
+        f"sin texto introductorio, sin texto al final."
+    )
+
+def participantes_sdk(cliente, nombre_vista: str, timeout: float = 45) -> list[str]:
+    """
+    Obtiene los valores únicos de participant_name directamente
+    de la vista indicada (admin.basketball, admin.football, etc.).
+    """
+    try:
+        texto = cliente.answer_data_question(pregunta_participantes(nombre_vista),
+                                             timeout=timeout, vista=nombre_vista).answer
+
+        nombres = []
+        for linea in texto.split("\n"):
+            limpio = limpiar_nombre(linea)
+            if (len(limpio) > 1
+                    and "|" not in limpio
+                    and limpio.lower() not in PALABRAS_RUIDO
+                    and not any(limpio.lower().startswith(p) for p in PALABRAS_RUIDO)
+                    and "disclaimer" not in limpio.lower()
+                    and not limpio.isdigit()):
+                nombres.append(limpio)
+
+        unicos = sorted(list(dict.fromkeys(n for n in nombres if n)))
+        return unicos if len(unicos) >= 2 else []
+    except Exception:
+        return []
+
+def obtener_participantes(cliente, nombre_vista: str, respaldo=participantes_sdk) -> list[str]:
+    """
+    Lista completa y ordenada de participant_name de la vista, servida por
+    el índice local de valores distintos. Solo si la vista no está en
+    results/ se recurre a `respaldo(cliente, vista)` (el LLM del SDK).
+    """
+    locales = obtener_indice_participantes().nombres(nombre_vista)
+    if locales:
+        return locales
+    return respaldo(cliente, nombre_vista)
+
+
+# ─────────────────────────────────────────
+# LLAMADAS DEL ANÁLISIS
+# ─────────────────────────────────────────
+
+def pregunta_stats(vista: str, entidad: str) -> str:
+    return (
+        f"In the view {vista}, for rows where participant_name = '{entidad}': "
+        f"count rows where result_wlt = 'W', "
+        f"count rows where result_wlt = 'L', "
+        f"and count total rows. "
+        f"Reply with exactly three integers separated by commas: wins,losses,total"
+    )
+
+def pregunta_metadatos(vista: str) -> str:
+    return f"What columns exist in the view {vista}?"
+
+def llamada_stats(cliente, vista, entidad, timeout=90):
+    """Una sola llamada por entidad: wins, losses, total."""
+    texto = cliente.answer_data_question(pregunta_stats(vista, entidad),
+                                         timeout=timeout, vista=vista).answer
+    nums  = [int(n) for n in re.findall(r'\b(\d+)\b', texto)]
+    if len(nums) >= 3:
+        w, l, t = nums[0], nums[1], nums[2]
+    elif len(nums) == 2:
+        w, l, t = nums[0], nums[1], nums[0] + nums[1]
+    elif len(nums) == 1:
+        w, l, t = nums[0], 0, nums[0]
+    else:
+        w, l, t = 0, 0, 1
+    t = t or (w + l) or 1
+    return w, l, t, texto
+
+def llamada_stats_sql(conector, vista, entidades) -> dict:
+    """
+    Estadísticas de varias entidades con una sola consulta agrupada por el
+    canal SQL directo. Devuelve {entidad: (w, l, t, texto)} con el mismo
+    contrato que `llamada_stats`; las entidades sin filas no aparecen.
+    """
+    sql = consulta_wlt(vista, conector.dialecto, list(entidades)).sql
+    resultado = {}
+    for entidad, stats in estadisticas_vista(conector, vista, list(entidades)).items():
+        w, l, t = stats.como_tupla()
+        resultado[entidad] = (w, l, t, f"[SQL {conector.dialecto}] {stats.wins}W · "
+                                       f"{stats.losses}L · {stats.ties}T · {stats.total} filas — {sql}")
+    return resultado
+
+def pregunta_justificacion(vista: str, datos: dict, criterio: str) -> str:
+    """Recomendación razonada sobre el resultado ya calculado del análisis."""
+    a, b = datos["entidad_a"], datos["entidad_b"]
+    return (
+        f"In the view {vista}, an investor compares {a['nombre']} ({a['stats']}) "
+        f"with {b['nombre']} ({b['stats']}) under this criterion: '{criterio}'. "
+        f"The scoring model chose {datos['decision_inversion']}. "
+        f"Check those figures against the data and write, in Spanish, a justified "
+        f"investment recommendation of one or two paragraphs."
+    )
+
+def llamada_metadatos(cliente, vista, timeout=30):
+    """Consulta el esquema de la vista (no bloquea el análisis si falla)."""
+    meta = cliente.answer_metadata_question(pregunta_metadatos(vista), timeout=timeout, vista=vista)
+    return (meta.answer or "Schema consultado.")[:200]
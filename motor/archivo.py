@@ -0,0 +1,154 @@
+"""
+Acceso a los CSV de París 2024 directamente desde archive.zip o desde disco.
+
+Los miembros del zip se leen como flujo (sin extraerlos), fila a fila, y
+solo se materializan las columnas pedidas. `fuente_resultados()` elige
+results/ si está extraído y, si no, el propio archive.zip, de modo que el
+resto del motor funciona igual desplegando solo el archivo.
+"""
+import csv
+import hashlib
+import io
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+RUTA_RESULTADOS = Path(__file__).resolve().parent.parent / "results"
+RUTA_ARCHIVO    = Path(__file__).resolve().parent.parent / "archive.zip"
+PREFIJO_RESULTADOS = "results/"
+
+
+def _filas_csv(flujo_texto, columnas: list[str] | None) -> Iterator[tuple]:
+    """Tuplas de cada fila con solo `columnas` (en ese orden); None si falta la columna."""
+    lector = csv.reader(flujo_texto)
+    cabecera = next(lector, None)
+    if cabecera is None:
+        return
+    if columnas is None:
+        yield from (tuple(fila) for fila in lector)
+        return
+    posiciones = {c: i for i, c in enumerate(cabecera)}
+    indices = [posiciones.get(c) for c in columnas]
+    for fila in lector:
+        yield tuple(fila[i] if i is not None and i < len(fila) else None for i in indices)
+
+
+def miembros(ruta: Path = RUTA_ARCHIVO) -> list[str]:
+    with zipfile.ZipFile(ruta) as zf:
+        return [i.filename for i in zf.infolist() if not i.is_dir()]
+
+
+def columnas_de(miembro: str, ruta: Path = RUTA_ARCHIVO) -> list[str]:
+    """Cabecera de un CSV del zip (solo lee la primera línea)."""
+    with zipfile.ZipFile(ruta) as zf, zf.open(miembro) as bruto:
+        texto = io.TextIOWrapper(bruto, encoding="utf-8", newline="")
+        return next(csv.reader(texto), [])
+
+
+def iterar_filas(miembro: str, columnas: list[str] | None = None,
+                 ruta: Path = RUTA_ARCHIVO) -> Iterator[tuple]:
+    """
+    Recorre un CSV del zip fila a fila sin descomprimirlo entero.
+    Con `columnas`, cada fila es una tupla con solo esos campos.
+    """
+    with zipfile.ZipFile(ruta) as zf, zf.open(miembro) as bruto:
+        texto = io.TextIOWrapper(bruto, encoding="utf-8", newline="")
+        yield from _filas_csv(texto, columnas)
+
+
+def iterar_fichero(ruta: Path, columnas: list[str] | None = None) -> Iterator[tuple]:
+    """Como `iterar_filas`, para un CSV en disco."""
+    with open(ruta, newline="", encoding="utf-8") as f:
+        yield from _filas_csv(f, columnas)
+
+
+def iterar_dicts(miembro: str, columnas: list[str],
+                 ruta: Path = RUTA_ARCHIVO) -> Iterator[dict]:
+    for fila in iterar_filas(miembro, columnas, ruta):
+        yield dict(zip(columnas, fila))
+
+
+def leer_columnas(miembro: str, columnas: list[str],
+                  ruta: Path = RUTA_ARCHIVO) -> dict[str, list[str]]:
+    """Forma columnar: {columna: [valores]} leyendo solo las columnas pedidas."""
+    datos = {c: [] for c in columnas}
+    listas = [datos[c] for c in columnas]
+    for fila in iterar_filas(miembro, columnas, ruta):
+        for lista, valor in zip(listas, fila):
+            lista.append(valor)
+    return datos
+
+
+# ─────────────────────────────────────────
+# FUENTES DE RESULTADOS (directorio o zip)
+# ─────────────────────────────────────────
+
+class FuenteDirectorio:
+    """results/<Disciplina>.csv extraídos en disco."""
+
+    def __init__(self, directorio: Path = RUTA_RESULTADOS):
+        self.directorio = Path(directorio)
+
+    def __repr__(self) -> str:
+        return f"FuenteDirectorio({self.directorio})"
+
+    def _ruta(self, disciplina: str) -> Path:
+        return self.directorio / f"{disciplina}.csv"
+
+    def disciplinas(self) -> list[str]:
+        return sorted(r.stem for r in self.directorio.glob("*.csv"))
+
+    def huella_rapida(self, disciplina: str) -> list:
+        st = self._ruta(disciplina).stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    def huella_contenido(self, disciplina: str) -> str:
+        h = hashlib.sha1()
+        with open(self._ruta(disciplina), "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        return h.hexdigest()
+
+    def filas(self, disciplina: str, columnas: list[str] | None = None) -> Iterator[tuple]:
+        yield from iterar_fichero(self._ruta(disciplina), columnas)
+
+
+class FuenteZip:
+    """results/<Disciplina>.csv leídos en streaming desde archive.zip."""
+
+    def __init__(self, ruta: Path = RUTA_ARCHIVO):
+        self.ruta = Path(ruta)
+        with zipfile.ZipFile(self.ruta) as zf:
+            self._info = {
+                i.filename[len(PREFIJO_RESULTADOS):-len(".csv")]: i
+                for i in zf.infolist()
+                if i.filename.startswith(PREFIJO_RESULTADOS) and i.filename.endswith(".csv")
+            }
+
+    def __repr__(self) -> str:
+        return f"FuenteZip({self.ruta})"
+
+    def disciplinas(self) -> list[str]:
+        return sorted(self._info)
+
+    def huella_rapida(self, disciplina: str) -> list:
+        info = self._info[disciplina]
+        return [info.CRC, info.file_size]
+
+    def huella_contenido(self, disciplina: str) -> str:
+        # El CRC del zip ya identifica el contenido sin descomprimir
+        info = self._info[disciplina]
+        return f"crc32:{info.CRC:08x}:{info.file_size}"
+
+    def filas(self, disciplina: str, columnas: list[str] | None = None) -> Iterator[tuple]:
+        yield from iterar_filas(PREFIJO_RESULTADOS + f"{disciplina}.csv", columnas, self.ruta)
+
+
+def fuente_resultados(directorio: Path = RUTA_RESULTADOS,
+                      archivo: Path = RUTA_ARCHIVO) -> FuenteDirectorio | FuenteZip:
+    """results/ si está extraído; si no, archive.zip."""
+    if any(Path(directorio).glob("*.csv")):
+        return FuenteDirectorio(directorio)
+    if Path(archivo).exists():
+        return FuenteZip(archivo)
+    raise FileNotFoundError(f"No hay resultados ni en {directorio} ni en {archivo}")
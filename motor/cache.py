@@ -0,0 +1,197 @@
+"""
+Caché persistente en disco (SQLite) para las respuestas del Denodo AI SDK.
+
+La clave es (ámbito, endpoint, pregunta normalizada, vista), donde el ámbito
+identifica la instancia del SDK y el usuario (`ambito_de`): dos SDK o dos
+usuarios que comparten el fichero no se sirven respuestas entre sí, porque
+cada usuario puede ver vistas y filas distintas. Cada entrada caduca a
+los `ttl` segundos y, cuando la caché supera su tamaño máximo, se expulsan
+primero las entradas usadas hace más tiempo (LRU). El fichero es compartido
+por bot.py y por todas las sesiones/procesos de Streamlit.
+
+Una entrada caducada se conserva aún `ventana_obsoleta` segundos para
+stale-while-revalidate: `obtener_entrada` la devuelve marcada como obsoleta
+y el cliente la sirve mientras la refresca en segundo plano.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+RUTA_CACHE_SDK = Path(__file__).resolve().parent.parent / ".cache" / "respuestas_sdk.sqlite3"
+
+TTL_POR_DEFECTO         = float(os.environ.get("DENODO_CACHE_TTL", "3600"))
+MAX_BYTES_POR_DEFECTO   = int(float(os.environ.get("DENODO_CACHE_MAX_MB", "64")) * 1024 * 1024)
+MAX_ENTRADAS_POR_DEFECTO = int(os.environ.get("DENODO_CACHE_MAX_ENTRADAS", "10000"))
+VENTANA_OBSOLETA_POR_DEFECTO = float(os.environ.get("DENODO_CACHE_STALE", "86400"))
+
+
+def normalizar_pregunta(pregunta: str) -> str:
+    """Colapsa espacios y mayúsculas para que preguntas equivalentes compartan clave."""
+    return re.sub(r"\s+", " ", pregunta).strip().casefold()
+
+
+def ambito_de(base_url: str, usuario: str) -> str:
+    """Ámbito de caché de un cliente: la URL del SDK y el usuario que pregunta."""
+    return f"{base_url.rstrip('/')}|{usuario}"
+
+
+def clave_cache(endpoint: str, pregunta: str, vista: str | None = None, ambito: str = "") -> str:
+    bruto = json.dumps([ambito, endpoint, normalizar_pregunta(pregunta), (vista or "").lower()])
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+class CacheRespuestas:
+    """Caché SQLite con TTL, expulsión LRU acotada por tamaño y contadores."""
+
+    def __init__(self, ruta: Path = RUTA_CACHE_SDK, ttl: float = TTL_POR_DEFECTO,
+                 max_bytes: int = MAX_BYTES_POR_DEFECTO,
+                 max_entradas: int = MAX_ENTRADAS_POR_DEFECTO,
+                 ventana_obsoleta: float = VENTANA_OBSOLETA_POR_DEFECTO):
+        self.ruta = Path(ruta)
+        self.ttl = ttl
+        self.ventana_obsoleta = ventana_obsoleta
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self.obsoletas = 0
+        self.expulsiones = 0
+
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.ruta, check_same_thread=False,
+                                     timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS respuestas (
+                clave          TEXT PRIMARY KEY,
+                endpoint       TEXT NOT NULL,
+                vista          TEXT,
+                pregunta       TEXT NOT NULL,
+                valor          TEXT NOT NULL,
+                tamano         INTEGER NOT NULL,
+                creada         REAL NOT NULL,
+                expira         REAL NOT NULL,
+                ultimo_acceso  REAL NOT NULL,
+                aciertos       INTEGER NOT NULL DEFAULT 0
+            )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_respuestas_acceso ON respuestas (ultimo_acceso)")
+
+    def obtener(self, endpoint: str, pregunta: str, vista: str | None = None,
+                ambito: str = "") -> dict | None:
+        """Respuesta guardada, o None si no existe o ha caducado."""
+        entrada = self.obtener_entrada(endpoint, pregunta, vista, permitir_obsoleta=False,
+                                       ambito=ambito)
+        return entrada[0] if entrada else None
+
+    def obtener_entrada(self, endpoint: str, pregunta: str, vista: str | None = None,
+                        permitir_obsoleta: bool = True,
+                        ambito: str = "") -> tuple[dict, bool] | None:
+        """
+        (respuesta, obsoleta) o None. Con `permitir_obsoleta`, una entrada
+        caducada hace menos de `ventana_obsoleta` segundos se devuelve con
+        obsoleta=True en lugar de contarse como fallo.
+        """
+        clave = clave_cache(endpoint, pregunta, vista, ambito)
+        ahora = time.time()
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT valor, expira FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+            obsoleta = fila is not None and fila[1] <= ahora
+            if fila is None or (obsoleta and not (
+                    permitir_obsoleta and ahora < fila[1] + self.ventana_obsoleta)):
+                self.fallos += 1
+                return None
+            self._conn.execute(
+                "UPDATE respuestas SET ultimo_acceso = ?, aciertos = aciertos + 1 WHERE clave = ?",
+                (ahora, clave))
+            if obsoleta:
+                self.obsoletas += 1
+            else:
+                self.aciertos += 1
+        return json.loads(fila[0]), obsoleta
+
+    def restante(self, endpoint: str, pregunta: str, vista: str | None = None,
+                 ambito: str = "") -> float | None:
+        """Segundos hasta que caduque la entrada (negativo si ya caducó); None si no existe."""
+        clave = clave_cache(endpoint, pregunta, vista, ambito)
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT expira FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+        return None if fila is None else fila[0] - time.time()
+
+    def guardar(self, endpoint: str, pregunta: str, valor: dict,
+                vista: str | None = None, ttl: float | None = None, ambito: str = ""):
+        clave = clave_cache(endpoint, pregunta, vista, ambito)
+        texto = json.dumps(valor, ensure_ascii=False)
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respuestas "
+                "(clave, endpoint, vista, pregunta, valor, tamano, creada, expira, ultimo_acceso) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (clave, endpoint, vista.lower() if vista else None,
+                 normalizar_pregunta(pregunta), texto,
+                 len(texto.encode("utf-8")), ahora, ahora + (self.ttl if ttl is None else ttl), ahora))
+            self._expulsar()
+
+    def _expulsar(self):
+        """Borra las caducadas fuera de la ventana obsoleta y, si sigue sobrando, las LRU."""
+        self._conn.execute("DELETE FROM respuestas WHERE expira <= ?",
+                           (time.time() - self.ventana_obsoleta,))
+        entradas, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()
+        if entradas <= self.max_entradas and total <= self.max_bytes:
+            return
+        sobrantes = []
+        for clave, tamano in self._conn.execute(
+                "SELECT clave, tamano FROM respuestas ORDER BY ultimo_acceso ASC"):
+            if entradas <= self.max_entradas and total <= self.max_bytes:
+                break
+            sobrantes.append((clave,))
+            entradas -= 1
+            total -= tamano
+        self._conn.executemany("DELETE FROM respuestas WHERE clave = ?", sobrantes)
+        self.expulsiones += len(sobrantes)
+
+    def invalidar(self, vista: str | None = None):
+        """Vacía la caché entera o solo las entradas de una vista."""
+        with self._lock:
+            if vista is None:
+                self._conn.execute("DELETE FROM respuestas")
+            else:
+                self._conn.execute("DELETE FROM respuestas WHERE vista = ?", (vista.lower(),))
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            entradas, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()
+        consultas = self.aciertos + self.obsoletas + self.fallos
+        return {
+            "aciertos":    self.aciertos,
+            "obsoletas":   self.obsoletas,
+            "fallos":      self.fallos,
+            "tasa_acierto": round((self.aciertos + self.obsoletas) / consultas, 3) if consultas else 0.0,
+            "expulsiones": self.expulsiones,
+            "entradas":    entradas,
+            "bytes":       total,
+        }
+
+
+_cache: CacheRespuestas | None = None
+_lock_cache = threading.Lock()
+
+
+def obtener_cache() -> CacheRespuestas:
+    """Caché compartida del proceso (el fichero lo comparten todos los procesos)."""
+    global _cache
+    with _lock_cache:
+        if _cache is None:
+            _cache = CacheRespuestas()
+        return _cache
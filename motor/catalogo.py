@@ -0,0 +1,160 @@
+"""
+Catálogo de disciplinas y caché LRU de datos por vista.
+
+Las disciplinas se descubren de results/ (o archive.zip): una vista
+admin.<disciplina> por CSV, sin lista fija en la interfaz. Los datos
+derivados de cada vista (lista de participantes con su índice de búsqueda,
+marcas, grafo de enfrentamientos) se construyen la primera vez que se piden
+y se quedan en memoria mientras quepan en el presupuesto (DENODO_VISTAS_MB);
+al pasarse, se expulsan las vistas usadas hace más tiempo.
+
+Lo que no pasa por aquí es la base de la que salen: el índice de agregados
+(`motor.indice`, unos 260 KB para las 45 disciplinas) se carga entero al
+arrancar, porque el Elo y el refresco incremental trabajan sobre sus filas
+globales, y el conjunto internado (`motor.internado`) se mapea desde disco y
+el sistema operativo pagina solo lo que se lee.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from motor.archivo import fuente_resultados
+from motor.coalescencia import VueloUnico
+from motor.estadisticas import vista_de_disciplina
+
+PRESUPUESTO_POR_DEFECTO = int(float(os.environ.get("DENODO_VISTAS_MB", "64")) * 1024 * 1024)
+
+EMOJIS = {
+    "3x3 Basketball": "🏀", "Archery": "🏹", "Artistic Gymnastics": "🤸",
+    "Artistic Swimming": "🏊", "Athletics": "🏃", "Badminton": "🏸", "Basketball": "🏀",
+    "Beach Volleyball": "🏐", "Boxing": "🥊", "Breaking": "🕺", "Canoe Slalom": "🛶",
+    "Canoe Sprint": "🛶", "Cycling BMX Freestyle": "🚲", "Cycling BMX Racing": "🚲",
+    "Cycling Mountain Bike": "🚵", "Cycling Road": "🚴", "Cycling Track": "🚴",
+    "Diving": "🤿", "Equestrian": "🏇", "Fencing": "🤺", "Football": "⚽", "Golf": "⛳",
+    "Handball": "🤾", "Hockey": "🏑", "Judo": "🥋", "Marathon Swimming": "🏊",
+    "Modern Pentathlon": "🏅", "Rhythmic Gymnastics": "🤸", "Rowing": "🚣", "Rugby Sevens": "🏉",
+    "Sailing": "⛵", "Shooting": "🎯", "Skateboarding": "🛹", "Sport Climbing": "🧗",
+    "Surfing": "🏄", "Swimming": "🏊", "Table Tennis": "🏓", "Taekwondo": "🥋", "Tennis": "🎾",
+    "Trampoline Gymnastics": "🤸", "Triathlon": "🏊", "Volleyball": "🏐", "Water Polo": "🤽",
+    "Weightlifting": "🏋", "Wrestling": "🤼",
+}
+
+# Las tres vistas con las que nació la app, destacadas en la portada
+DESTACADAS = ("Basketball", "Football", "Volleyball")
+
+
+@dataclass(frozen=True)
+class Disciplina:
+    nombre: str
+    vista: str
+    emoji: str
+
+    @property
+    def etiqueta(self) -> str:
+        return f"{self.emoji}  {self.nombre}"
+
+
+def catalogo_disciplinas(fuente=None) -> list[Disciplina]:
+    """Una `Disciplina` por CSV de results/, en orden alfabético."""
+    fuente = fuente or fuente_resultados()
+    return [Disciplina(d, vista_de_disciplina(d), EMOJIS.get(d, "🏅"))
+            for d in sorted(fuente.disciplinas())]
+
+
+class CacheVistas:
+    """
+    LRU por vista con presupuesto en bytes. `cargar(vista)` construye el
+    objeto y `peso(objeto)` estima lo que ocupa; la vista recién cargada se
+    queda siempre, aunque ella sola supere el presupuesto.
+
+    La carga corre fuera del lock, con un solo vuelo por vista: una vista en
+    frío no bloquea las demás, y dos sesiones que piden la misma la
+    construyen una vez. Una carga que termina después de `invalidar` se
+    entrega a quien la esperaba pero no se guarda.
+    """
+
+    def __init__(self, cargar, peso, presupuesto_bytes: int = PRESUPUESTO_POR_DEFECTO):
+        self.cargar = cargar
+        self.peso = peso
+        self.presupuesto_bytes = presupuesto_bytes
+        self._vistas: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._bytes = 0
+        self.cargas = 0
+        self.aciertos = 0
+        self.expulsiones = 0
+        self._lock = threading.Lock()
+        self._vuelos = VueloUnico()
+        # Cambian al invalidar o vaciar: una carga empezada antes no se guarda
+        self._generaciones: dict[str, int] = {}
+        self._vaciados = 0
+
+    def _residente(self, vista: str):
+        """El objeto de la vista si está en memoria (cuenta como acierto), o None."""
+        with self._lock:
+            entrada = self._vistas.get(vista)
+            if entrada is None:
+                return None
+            self._vistas.move_to_end(vista)
+            self.aciertos += 1
+            return entrada[0]
+
+    def _cargar(self, vista: str):
+        # Otro vuelo pudo terminar entre el fallo y este
+        objeto = self._residente(vista)
+        if objeto is not None:
+            return objeto
+        with self._lock:
+            generacion = (self._vaciados, self._generaciones.get(vista, 0))
+        objeto = self.cargar(vista)
+        bytes_vista = self.peso(objeto)
+        with self._lock:
+            self.cargas += 1
+            if (self._vaciados, self._generaciones.get(vista, 0)) != generacion:
+                return objeto
+            self._vistas[vista] = (objeto, bytes_vista)
+            self._bytes += bytes_vista
+            while self._bytes > self.presupuesto_bytes and len(self._vistas) > 1:
+                _, (_, expulsados) = self._vistas.popitem(last=False)
+                self._bytes -= expulsados
+                self.expulsiones += 1
+        return objeto
+
+    def obtener(self, vista: str):
+        vista = vista.lower()
+        objeto = self._residente(vista)
+        if objeto is None:
+            objeto, _ = self._vuelos.ejecutar(vista, lambda: self._cargar(vista))
+        return objeto
+
+    def invalidar(self, vista: str) -> bool:
+        """Descarta una vista (sus datos cambiaron); la próxima petición la recarga."""
+        vista = vista.lower()
+        with self._lock:
+            self._generaciones[vista] = self._generaciones.get(vista, 0) + 1
+            entrada = self._vistas.pop(vista, None)
+            if entrada is not None:
+                self._bytes -= entrada[1]
+            return entrada is not None
+
+    def residentes(self) -> list[str]:
+        """Vistas en memoria, de la menos a la más recientemente usada."""
+        with self._lock:
+            return list(self._vistas)
+
+    def vaciar(self):
+        with self._lock:
+            self._vaciados += 1
+            self._vistas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "residentes": len(self._vistas),
+                "mb": round(self._bytes / 1024 / 1024, 2),
+                "presupuesto_mb": round(self.presupuesto_bytes / 1024 / 1024, 2),
+                "cargas": self.cargas,
+                "aciertos": self.aciertos,
+                "expulsiones": self.expulsiones,
+            }
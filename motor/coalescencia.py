@@ -0,0 +1,95 @@
+"""
+Coalescencia de peticiones idénticas en vuelo ("single-flight").
+
+Si varias sesiones de Streamlit (o varios hilos del CLI) hacen a la vez la
+misma pregunta al SDK, solo la primera sale a la red; las demás esperan a
+esa llamada y reciben su mismo resultado o su misma excepción. La clave es
+la de la caché (`motor.cache.clave_cache`), así que dos preguntas que solo
+difieren en espacios o mayúsculas comparten vuelo.
+
+`st.cache_data` no cubre este caso: solo guarda resultados ya terminados.
+"""
+import asyncio
+import threading
+
+
+class _Vuelo:
+    __slots__ = ("evento", "resultado", "error", "seguidores")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error: BaseException | None = None
+        self.seguidores = 0
+
+
+class VueloUnico:
+    """Una sola ejecución en curso por clave; el resto de llamadas la comparten."""
+
+    def __init__(self):
+        self._vuelos: dict[str, _Vuelo] = {}
+        self._lock = threading.Lock()
+
+    def en_vuelo(self) -> int:
+        with self._lock:
+            return len(self._vuelos)
+
+    def ejecutar(self, clave: str, funcion, timeout: float | None = None):
+        """
+        Devuelve (resultado, compartido). `compartido` es True si el resultado
+        viene de la llamada de otro hilo. Un seguidor que espera más de
+        `timeout` segundos recibe `TimeoutError` (la llamada original sigue).
+        """
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+            else:
+                vuelo.seguidores += 1
+
+        if not lider:
+            if not vuelo.evento.wait(timeout):
+                raise TimeoutError(f"Sin respuesta de la petición compartida en {timeout}s")
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado, True
+
+        try:
+            vuelo.resultado = funcion()
+            return vuelo.resultado, False
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.evento.set()
+
+
+class VueloUnicoAsync:
+    """Versión asyncio: la llamada corre en su propia tarea y todos la esperan."""
+
+    def __init__(self):
+        self._tareas: dict[str, asyncio.Task] = {}
+
+    def en_vuelo(self) -> int:
+        return len(self._tareas)
+
+    def _terminada(self, clave: str, tarea: asyncio.Task):
+        self._tareas.pop(clave, None)
+        # Si todos los que esperaban se cancelaron, nadie más recoge el error
+        if not tarea.cancelled():
+            tarea.exception()
+
+    async def ejecutar(self, clave: str, fabrica):
+        """
+        `fabrica()` crea la corrutina solo si no hay otra igual en vuelo.
+        Cancelar a quien espera no cancela la llamada compartida.
+        """
+        tarea = self._tareas.get(clave)
+        compartido = tarea is not None
+        if not compartido:
+            tarea = self._tareas[clave] = asyncio.ensure_future(fabrica())
+            tarea.add_done_callback(lambda t: self._terminada(clave, t))
+        return await asyncio.shield(tarea), compartido
@@ -0,0 +1,193 @@
+"""
+Canal SQL directo a las vistas, sin pasar por el LLM.
+
+- `ConectorVDP`: Denodo Virtual DataPort por su interfaz compatible con
+  PostgreSQL (puerto 9996 por defecto), con psycopg2 como dependencia
+  opcional.
+- `ConectorSQLite`: sustituto local que carga cada vista admin.<disciplina>
+  desde results/*.csv (o archive.zip) la primera vez que se consulta. Es el
+  sustituto de pruebas y del benchmark para ejercitar el SQL sin Denodo; la
+  app no lo ofrece como canal, porque sale de los mismos CSV que el índice
+  local y nunca tendría una entidad que este no tenga.
+
+Ambos exponen `dialecto` y `ejecutar(sql, parametros) -> ResultadoConsulta`.
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import psycopg2
+except ImportError:  # opcional: solo hace falta para hablar con VDP
+    psycopg2 = None
+
+from motor.archivo import fuente_resultados
+from motor.coalescencia import VueloUnico
+from motor.estadisticas import vista_de_disciplina
+
+# Columnas de results/*.csv que se cargan en el sustituto SQLite
+COLUMNAS_VISTA = ["date", "stage_code", "event_code", "event_name", "stage", "gender",
+                  "participant_code", "participant_name", "participant_type",
+                  "participant_country_code", "result", "result_type", "result_WLT"]
+
+# Tras un fallo al abrir un conector, segundos durante los que se relanza el
+# error sin volver a intentarlo; se doblan con cada fallo seguido
+ESPERA_FALLO_S     = float(os.environ.get("DENODO_CONECTOR_ESPERA", "15"))
+ESPERA_FALLO_MAX_S = 300.0
+
+
+@dataclass
+class ResultadoConsulta:
+    columnas: list[str]
+    filas: list[tuple]
+
+    def dicts(self) -> list[dict]:
+        return [dict(zip(self.columnas, fila)) for fila in self.filas]
+
+
+class ConectorVDP:
+    """Conexión a Denodo VDP (protocolo PostgreSQL) compartida y serializada."""
+
+    dialecto = "vdp"
+
+    def __init__(self, host: str = "localhost", puerto: int = 9996, base: str = "admin",
+                 usuario: str = "admin", password: str = "admin", timeout: float = 30):
+        if psycopg2 is None:
+            raise RuntimeError("El canal VDP necesita psycopg2: pip install psycopg2-binary")
+        self._parametros = dict(host=host, port=puerto, dbname=base, user=usuario,
+                                password=password, connect_timeout=int(timeout))
+        self._conexion = self._conectar()
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        conexion = psycopg2.connect(**self._parametros)
+        conexion.autocommit = True
+        return conexion
+
+    def _consultar(self, sql: str, parametros: tuple) -> ResultadoConsulta:
+        with self._conexion.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            columnas = [c[0] for c in cursor.description or ()]
+            return ResultadoConsulta(columnas, [tuple(f) for f in cursor.fetchall()])
+
+    def ejecutar(self, sql: str, parametros: tuple = (), vista: str | None = None) -> ResultadoConsulta:
+        with self._lock:
+            try:
+                return self._consultar(sql, parametros)
+            except (psycopg2.InterfaceError, psycopg2.OperationalError):
+                # VDP se reinició o cortó la conexión: se reabre una vez y se repite
+                try:
+                    self._conexion.close()
+                except psycopg2.Error:
+                    pass
+                self._conexion = self._conectar()
+                return self._consultar(sql, parametros)
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+class ConectorSQLite:
+    """Vistas admin.<disciplina> en SQLite, cargadas bajo demanda desde los CSV."""
+
+    dialecto = "sqlite"
+
+    def __init__(self, ruta: str = ":memory:", fuente=None):
+        self.fuente = fuente or fuente_resultados()
+        self._disciplinas = {vista_de_disciplina(d): d for d in self.fuente.disciplinas()}
+        self._cargadas: set[str] = set()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def vistas(self) -> list[str]:
+        return sorted(self._disciplinas)
+
+    def _cargar(self, vista: str):
+        if vista in self._cargadas or vista not in self._disciplinas:
+            return
+        tabla = '"' + vista.replace('"', '""') + '"'
+        columnas = ", ".join(f"{c} TEXT" for c in COLUMNAS_VISTA)
+        huecos = ", ".join("?" * len(COLUMNAS_VISTA))
+        self._conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+        self._conexion.execute(f"CREATE TABLE {tabla} ({columnas})")
+        self._conexion.executemany(f"INSERT INTO {tabla} VALUES ({huecos})",
+                                   self.fuente.filas(self._disciplinas[vista], COLUMNAS_VISTA))
+        self._conexion.execute(f"CREATE INDEX {tabla[:-1]}_nombre\" ON {tabla} (participant_name)")
+        self._cargadas.add(vista)
+
+    def invalidar(self, vista: str):
+        """El CSV de la vista cambió: se vuelve a cargar en la próxima consulta."""
+        with self._lock:
+            self._disciplinas = {vista_de_disciplina(d): d for d in self.fuente.disciplinas()}
+            self._cargadas.discard(vista.lower())
+
+    def ejecutar(self, sql: str, parametros: tuple = (), vista: str | None = None) -> ResultadoConsulta:
+        """`vista` (si se indica) se carga antes de ejecutar la consulta."""
+        with self._lock:
+            if vista:
+                self._cargar(vista.lower())
+            cursor = self._conexion.execute(sql, parametros)
+            columnas = [c[0] for c in cursor.description or ()]
+            return ResultadoConsulta(columnas, cursor.fetchall())
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+_conectores: dict[tuple, object] = {}
+# clave -> (relanzar hasta, espera aplicada, último error)
+_fallos: dict[tuple, tuple[float, float, Exception]] = {}
+_lock_conectores = threading.Lock()
+_vuelos_conectores = VueloUnico()
+
+
+def invalidar_vista(vista: str):
+    """Los datos de `vista` cambiaron: los conectores que la copian la recargan."""
+    with _lock_conectores:
+        conectores = list(_conectores.values())
+    for conector in conectores:
+        if hasattr(conector, "invalidar"):
+            conector.invalidar(vista)
+
+
+def _crear_conector(clave: tuple, tipo: str, kwargs: dict):
+    with _lock_conectores:
+        conector = _conectores.get(clave)
+    if conector is not None:
+        return conector
+    clase = ConectorVDP if tipo == "vdp" else ConectorSQLite
+    try:
+        conector = clase(**kwargs)
+    except Exception as e:
+        with _lock_conectores:
+            anterior = _fallos.get(clave)
+            espera = min(anterior[1] * 2, ESPERA_FALLO_MAX_S) if anterior else ESPERA_FALLO_S
+            _fallos[clave] = (time.monotonic() + espera, espera, e)
+        raise
+    with _lock_conectores:
+        _fallos.pop(clave, None)
+        _conectores[clave] = conector
+    return conector
+
+
+def obtener_conector(tipo: str = "sqlite", **kwargs):
+    """
+    Conector compartido del proceso: tipo "vdp" (con host, puerto...) o "sqlite".
+
+    La conexión se abre fuera del lock global y una sola vez por clave: las
+    demás sesiones y `invalidar_vista` no esperan detrás de un VDP caído.
+    Si falla, el error se relanza al instante durante la espera de fallo.
+    """
+    clave = (tipo, tuple(sorted(kwargs.items())))
+    with _lock_conectores:
+        conector = _conectores.get(clave)
+        fallo = _fallos.get(clave)
+    if conector is not None:
+        return conector
+    if fallo is not None and time.monotonic() < fallo[0]:
+        restante = fallo[0] - time.monotonic()
+        raise RuntimeError(f"{fallo[2]} (próximo intento en {restante:.0f}s)") from fallo[2]
+    conector, _ = _vuelos_conectores.ejecutar(clave, lambda: _crear_conector(clave, tipo, kwargs))
+    return conector
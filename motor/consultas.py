@@ -0,0 +1,83 @@
+"""
+Plantillas VQL/SQL parametrizadas para las estadísticas W/L/T.
+
+En lugar de pedir al LLM "tres enteros separados por comas" y adivinar los
+números de su respuesta, se genera una agregación
+
+    SELECT participant_name, result_wlt, COUNT(*) FROM <vista>
+    [WHERE participant_name IN (...)] GROUP BY participant_name, result_wlt
+
+que se ejecuta por un canal directo (`motor.conectores`) y se lee como result
+set tipado. Una sola consulta devuelve las estadísticas de todos los
+participantes de la vista, o de los indicados.
+"""
+import re
+from dataclasses import dataclass
+
+from motor.estadisticas import CODIGOS_WLT, Estadisticas
+
+# database.vista: solo caracteres de palabra (los nombres no se parametrizan)
+_IDENTIFICADOR = re.compile(r"^\w+(\.\w+)?$")
+
+# Marcador de parámetro de cada dialecto (paramstyle de su driver)
+MARCADORES = {"vdp": "%s", "sqlite": "?"}
+
+
+def citar_vista(vista: str, dialecto: str) -> str:
+    """
+    'admin.3x3_basketball' -> admin."3x3_basketball" en VQL (el nombre puede
+    empezar por dígito) o "admin.3x3_basketball" como tabla en SQLite.
+    """
+    if not _IDENTIFICADOR.match(vista):
+        raise ValueError(f"Nombre de vista no válido: {vista!r}")
+    vista = vista.lower()
+    if dialecto == "sqlite":
+        return f'"{vista}"'
+    base, _, nombre = vista.rpartition(".")
+    return (f"{base}." if base else "") + f'"{nombre}"'
+
+
+@dataclass(frozen=True)
+class ConsultaSQL:
+    sql: str
+    parametros: tuple
+    vista: str
+
+
+def consulta_wlt(vista: str, dialecto: str, participantes: list[str] | None = None) -> ConsultaSQL:
+    """Conteo de filas por (participant_name, result_wlt), opcionalmente filtrado."""
+    filtro = ""
+    if participantes:
+        huecos = ", ".join([MARCADORES[dialecto]] * len(participantes))
+        filtro = f" WHERE participant_name IN ({huecos})"
+    sql = (f"SELECT participant_name, result_wlt, COUNT(*) AS filas "
+           f"FROM {citar_vista(vista, dialecto)}{filtro} "
+           f"GROUP BY participant_name, result_wlt")
+    return ConsultaSQL(sql, tuple(participantes or ()), vista)
+
+
+def consulta_firma(vista: str, dialecto: str) -> ConsultaSQL:
+    """Número de filas y fecha más reciente: cambia cuando la vista recibe filas nuevas."""
+    sql = f"SELECT COUNT(*) AS filas, MAX(date) AS ultima FROM {citar_vista(vista, dialecto)}"
+    return ConsultaSQL(sql, (), vista)
+
+
+def leer_wlt(resultado) -> dict[str, Estadisticas]:
+    """Result set de `consulta_wlt` -> {participante: Estadisticas}."""
+    conteos: dict[str, list[int]] = {}
+    for nombre, wlt, filas in resultado.filas:
+        # [filas, W, L, T], indexado por CODIGOS_WLT
+        c = conteos.setdefault(nombre or "", [0, 0, 0, 0])
+        c[0] += int(filas)
+        codigo = CODIGOS_WLT.get((wlt or "").strip().upper())
+        if codigo:
+            c[codigo] += int(filas)
+    return {nombre: Estadisticas(wins=c[1], losses=c[2], ties=c[3], total=c[0])
+            for nombre, c in conteos.items()}
+
+
+def estadisticas_vista(conector, vista: str,
+                       participantes: list[str] | None = None) -> dict[str, Estadisticas]:
+    """Estadísticas de todos (o de `participantes`) en una sola consulta."""
+    consulta = consulta_wlt(vista, conector.dialecto, participantes)
+    return leer_wlt(conector.ejecutar(consulta.sql, consulta.parametros, vista=vista))
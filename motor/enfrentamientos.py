@@ -0,0 +1,271 @@
+"""
+Grafo de enfrentamientos directos por vista.
+
+En las disciplinas con W/L/T cada partido son dos filas con el mismo
+stage_code y event_code (AUS W / ESP L). Uniéndolas se construye, una vez
+por vista, un grafo en formato CSR: para cada participante, sus rivales
+ordenados con victorias, derrotas, empates y puntos a favor / en contra
+(columna `result`). Los nodos son (gender, participant_code): el nombre no
+distingue la selección masculina de la femenina ("France"). Las consultas
+reciben nombres y los resuelven a nodos del mismo género. Sobre él:
+
+- `cara_a_cara(a, b)`: historial directo, una búsqueda binaria en la fila de a.
+- `rivales_comunes(a, b)`: intersección de dos filas ordenadas.
+- `fuerza(nombre)`: rating de Colley de toda la vista, que propaga quién ganó
+  a quién de forma transitiva aunque a y b no se hayan enfrentado nunca.
+
+Los datos salen del conjunto internado (`motor.internado`), así que no hay
+consultas adicionales; cada grafo vive en una `CacheVistas`.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from motor.catalogo import CacheVistas
+from motor.estadisticas import vista_de_disciplina
+from motor.internado import obtener_conjunto
+from motor.marcas import a_numero
+
+
+@dataclass(frozen=True)
+class CaraACara:
+    victorias: int
+    derrotas: int
+    empates: int
+    a_favor: float
+    en_contra: float
+
+    @property
+    def partidos(self) -> int:
+        return self.victorias + self.derrotas + self.empates
+
+    def invertido(self) -> "CaraACara":
+        """El mismo historial visto desde el rival."""
+        return CaraACara(self.derrotas, self.victorias, self.empates, self.en_contra, self.a_favor)
+
+    def __str__(self) -> str:
+        marcador = f" · {self.a_favor:g}-{self.en_contra:g}" if self.partidos else ""
+        return f"{self.victorias}V-{self.derrotas}D-{self.empates}E{marcador}"
+
+
+SIN_ENFRENTAMIENTOS = CaraACara(0, 0, 0, 0.0, 0.0)
+
+
+class GrafoEnfrentamientos:
+    """Adyacencia CSR de quién ganó a quién en una vista, con rating de Colley."""
+
+    def __init__(self, vista: str, nombres: list[str], generos: list[str], inicio: np.ndarray,
+                 rivales: np.ndarray, resultados: np.ndarray, puntos: np.ndarray):
+        self.vista = vista
+        # Por nodo (gender, participant_code): nombre y género
+        self.nombres = nombres
+        self.generos = generos
+        self.nodos_nombre: dict[str, list[int]] = {}
+        for i, n in enumerate(nombres):
+            self.nodos_nombre.setdefault(n, []).append(i)
+        # Rivales de i: rivales[inicio[i]:inicio[i+1]], ordenados
+        self.inicio = inicio
+        self.rivales = rivales
+        # resultados[arista] = [victorias, derrotas, empates]; puntos = [a favor, en contra]
+        self.resultados = resultados
+        self.puntos = puntos
+        self.partidos = np.bincount(np.repeat(np.arange(len(nombres)), np.diff(inicio)),
+                                    weights=resultados.sum(axis=1), minlength=len(nombres))
+        self.ratings = self._colley()
+
+    @classmethod
+    def desde_conjunto(cls, conjunto, disciplina: str) -> "GrafoEnfrentamientos":
+        tabla = conjunto.resultados
+        vista = vista_de_disciplina(disciplina)
+        wlt_ids = {v: conjunto.internador.diccionario("result_WLT").id_de(v) for v in ("W", "L", "T")}
+        filas = tabla.filas_con("discipline_name", disciplina)
+        filas = filas[np.isin(tabla.ids("result_WLT")[filas],
+                              [i for i in wlt_ids.values() if i is not None])]
+
+        # Un partido = las filas con el mismo (stage_code, event_code); solo parejas
+        clave = (tabla.ids("stage_code")[filas].astype(np.int64) << 32) | tabla.ids("event_code")[filas]
+        orden = np.argsort(clave, kind="stable")
+        filas, clave = filas[orden], clave[orden]
+        _, primera, tam = np.unique(clave, return_index=True, return_counts=True)
+        primera = primera[tam == 2]
+        i, j = filas[primera], filas[primera + 1]
+
+        # Nodo = (gender, participant_code); el nombre es solo la etiqueta
+        nodo = (tabla.ids("gender").astype(np.int64) << 32) | tabla.ids("participant_code")
+        extremos = np.r_[i, j]
+        _, primera, locales = np.unique(nodo[extremos], return_index=True, return_inverse=True)
+        a, b = locales[:len(i)], locales[len(i):]
+        distintos = a != b
+        i, j, a, b = i[distintos], j[distintos], a[distintos], b[distintos]
+
+        marcador = a_numero(tabla.decodificar("result", np.r_[i, j]))
+        pi, pj = np.nan_to_num(marcador[:len(i)]), np.nan_to_num(marcador[len(i):])
+        wlt = tabla.ids("result_WLT")
+        codigo = np.select([wlt[i] == wlt_ids["W"], wlt[i] == wlt_ids["L"]], [0, 1], 2)
+
+        # Cada partido es una arista en cada sentido
+        origen, destino = np.r_[a, b], np.r_[b, a]
+        res = np.r_[codigo, np.choose(codigo, [1, 0, 2])]
+        favor, contra = np.r_[pi, pj], np.r_[pj, pi]
+
+        n = len(primera)
+        aristas, arista = np.unique(origen.astype(np.int64) * n + destino, return_inverse=True)
+        resultados = np.zeros((len(aristas), 3), dtype=np.int32)
+        np.add.at(resultados, (arista, res), 1)
+        puntos = np.stack([np.bincount(arista, weights=favor, minlength=len(aristas)),
+                           np.bincount(arista, weights=contra, minlength=len(aristas))], axis=1)
+        desde, rivales = np.divmod(aristas, n)
+        inicio = np.searchsorted(desde, np.arange(n + 1)).astype(np.int64)
+        filas_nodo = extremos[primera]
+        nombres = conjunto.internador.diccionario("participant_name")
+        generos = conjunto.internador.diccionario("gender")
+        return cls(vista, [nombres[k] for k in tabla.ids("participant_name")[filas_nodo].tolist()],
+                   [generos[k] for k in tabla.ids("gender")[filas_nodo].tolist()], inicio,
+                   rivales.astype(np.int32), resultados, puntos)
+
+    def _colley(self) -> np.ndarray:
+        """r = C⁻¹ b, C = 2I + partidos - adyacencia, b = 1 + (V - D) / 2."""
+        n = len(self.nombres)
+        if not n:
+            return np.empty(0)
+        partidos = self.resultados.sum(axis=1)
+        desde = np.repeat(np.arange(n), np.diff(self.inicio))
+        c = 2 * np.eye(n)
+        np.add.at(c, (desde, self.rivales), -partidos)
+        c[np.diag_indices(n)] += np.bincount(desde, weights=partidos, minlength=n)
+        b = 1 + (np.bincount(desde, weights=self.resultados[:, 0], minlength=n)
+                 - np.bincount(desde, weights=self.resultados[:, 1], minlength=n)) / 2
+        return np.linalg.solve(c, b)
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self.nodos_nombre
+
+    def _arista(self, a: int, b: int) -> int | None:
+        ini, fin = self.inicio[a], self.inicio[a + 1]
+        pos = ini + int(np.searchsorted(self.rivales[ini:fin], b))
+        return pos if pos < fin and self.rivales[pos] == b else None
+
+    def _nodo(self, nombre: str) -> int | None:
+        """El nodo con más partidos de ese nombre (si hay uno por género)."""
+        nodos = self.nodos_nombre.get(nombre)
+        return None if not nodos else max(nodos, key=lambda i: self.partidos[i])
+
+    def _pareja(self, a: str, b: str) -> tuple[int | None, int | None]:
+        """
+        Nodos de a y b del mismo género: primero los que se enfrentaron entre
+        sí y, si no, los que más partidos suman.
+        """
+        nodos_a, nodos_b = self.nodos_nombre.get(a), self.nodos_nombre.get(b)
+        if not nodos_a or not nodos_b:
+            return None, None
+        parejas = [(ia, ib) for ia in nodos_a for ib in nodos_b
+                   if self.generos[ia] == self.generos[ib]]
+        if not parejas:
+            return self._nodo(a), self._nodo(b)
+
+        def peso(pareja):
+            arista = self._arista(*pareja)
+            directos = 0 if arista is None else int(self.resultados[arista].sum())
+            return directos, self.partidos[pareja[0]] + self.partidos[pareja[1]]
+        return max(parejas, key=peso)
+
+    def _cara_a_cara(self, ia: int | None, ib: int | None) -> CaraACara:
+        arista = None if ia is None or ib is None else self._arista(ia, ib)
+        if arista is None:
+            return SIN_ENFRENTAMIENTOS
+        v, d, e = self.resultados[arista].tolist()
+        favor, contra = self.puntos[arista].tolist()
+        return CaraACara(v, d, e, favor, contra)
+
+    def _rivales_comunes(self, ia: int | None, ib: int | None) -> list[dict]:
+        if ia is None or ib is None:
+            return []
+        fila_a = self.rivales[self.inicio[ia]:self.inicio[ia + 1]]
+        fila_b = self.rivales[self.inicio[ib]:self.inicio[ib + 1]]
+        comunes = np.intersect1d(fila_a, fila_b, assume_unique=True)
+        comunes = comunes[(comunes != ia) & (comunes != ib)]
+        return [{"rival": self.nombres[c],
+                 "a": self._cara_a_cara(ia, c),
+                 "b": self._cara_a_cara(ib, c)} for c in comunes.tolist()]
+
+    def cara_a_cara(self, a: str, b: str) -> CaraACara:
+        """Historial de a frente a b (victorias de a, derrotas de a...)."""
+        return self._cara_a_cara(*self._pareja(a, b))
+
+    def rivales_comunes(self, a: str, b: str) -> list[dict]:
+        """Rivales que se enfrentaron a los dos, con el balance de cada uno."""
+        return self._rivales_comunes(*self._pareja(a, b))
+
+    def fuerza(self, nombre: str) -> float | None:
+        i = self._nodo(nombre)
+        return None if i is None else float(self.ratings[i])
+
+    def comparar(self, a: str, b: str) -> dict:
+        """Señal por parejas para el análisis: directo, rivales comunes y rating."""
+        ia, ib = self._pareja(a, b)
+        comunes = self._rivales_comunes(ia, ib)
+        balance = lambda lado: sum(c[lado].victorias - c[lado].derrotas for c in comunes)
+        return {
+            "cara_a_cara": self._cara_a_cara(ia, ib),
+            "rivales_comunes": len(comunes),
+            "balance_comunes_a": balance("a"),
+            "balance_comunes_b": balance("b"),
+            "fuerza_a": None if ia is None else float(self.ratings[ia]),
+            "fuerza_b": None if ib is None else float(self.ratings[ib]),
+            "detalle_comunes": comunes,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.inicio, self.rivales, self.resultados, self.puntos, self.partidos, self.ratings)
+        return sum(x.nbytes for x in arrays) + 100 * len(self.nombres)
+
+
+class GrafosVistas:
+    """`GrafoEnfrentamientos` por vista, construidos bajo demanda."""
+
+    def __init__(self, conjunto=None, presupuesto_bytes: int | None = None):
+        self._conjunto = conjunto
+        kwargs = {} if presupuesto_bytes is None else {"presupuesto_bytes": presupuesto_bytes}
+        self.cache = CacheVistas(self._construir, lambda grafo: grafo.nbytes, **kwargs)
+
+    @property
+    def conjunto(self):
+        if self._conjunto is None:
+            self._conjunto = obtener_conjunto()
+        return self._conjunto
+
+    def _disciplinas(self) -> dict[str, str]:
+        d = self.conjunto.internador.diccionario("discipline_name")
+        return {vista_de_disciplina(n): n for n in d.valores if n}
+
+    def _construir(self, vista: str) -> GrafoEnfrentamientos:
+        return GrafoEnfrentamientos.desde_conjunto(self.conjunto, self._disciplinas()[vista])
+
+    def grafo(self, vista: str) -> GrafoEnfrentamientos | None:
+        """None si la vista no está en results/ o no tiene partidos W/L/T."""
+        if vista.lower() not in self._disciplinas():
+            return None
+        grafo = self.cache.obtener(vista)
+        return grafo if len(grafo) else None
+
+    def invalidar(self, vista: str):
+        """Los resultados de la vista cambiaron en el conjunto: se reconstruye al pedirla."""
+        self.cache.invalidar(vista)
+
+
+_grafos: GrafosVistas | None = None
+_lock_grafos = threading.Lock()
+
+
+def obtener_grafos() -> GrafosVistas:
+    """Instancia compartida del proceso."""
+    global _grafos
+    with _lock_grafos:
+        if _grafos is None:
+            _grafos = GrafosVistas()
+        return _grafos
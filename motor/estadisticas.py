@@ -0,0 +1,29 @@
+"""
+Tipos y utilidades comunes de las estadísticas locales sobre results/.
+
+Los agregados W/L/T por participante los sirve el índice precalculado
+(`motor.indice`); aquí quedan el contrato `Estadisticas`, los códigos de
+result_WLT y el nombre de vista de cada disciplina.
+"""
+import re
+from dataclasses import dataclass
+
+# Códigos de result_WLT (0 = sin resultado W/L/T en esa fila)
+CODIGOS_WLT = {"W": 1, "L": 2, "T": 3}
+
+
+def vista_de_disciplina(disciplina: str) -> str:
+    """'Basketball' -> 'admin.basketball', '3x3 Basketball' -> 'admin.3x3_basketball'."""
+    return "admin." + re.sub(r"\W+", "_", disciplina.strip().lower()).strip("_")
+
+
+@dataclass(frozen=True)
+class Estadisticas:
+    wins: int
+    losses: int
+    ties: int
+    total: int
+
+    def como_tupla(self) -> tuple[int, int, int]:
+        """(wins, losses, total) con el mismo contrato que `llamada_stats`."""
+        return self.wins, self.losses, self.total or 1
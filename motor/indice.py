@@ -0,0 +1,437 @@
+"""
+Índice precalculado de agregados por participante.
+
+Recorre results/*.csv (o archive.zip) una sola vez y guarda en disco (.npz)
+una tabla por (disciplina, género, participant_code) con W/L/T, partidos
+disputados y la última fase alcanzada. Al arrancar se carga ese fichero; solo
+se reconstruye si cambia el mtime (y el hash) de algún CSV de origen.
+
+Con los agregados se guardan los ratings Elo de cada fila y su historial
+(`motor.ratings`), reproducidos partido a partido en orden de fecha.
+
+El vigilante (`motor.refresco`) actualiza el índice desde su hilo mientras
+las sesiones lo consultan: consultas y actualizaciones toman el mismo lock,
+así que una consulta nunca ve una actualización a medias.
+"""
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from motor.archivo import fuente_resultados
+from motor.estadisticas import CODIGOS_WLT, vista_de_disciplina
+from motor.internado import Diccionario
+from motor.ratings import Elo, emparejar
+
+RUTA_CACHE  = Path(__file__).resolve().parent.parent / ".cache"
+RUTA_INDICE = RUTA_CACHE / "indice_agregados.npz"
+
+# Columnas numéricas de la tabla de agregados, en orden
+COLUMNAS = ("wins", "losses", "ties", "partidos", "fecha")
+
+# Columnas de los CSV que necesita el índice
+COLUMNAS_ORIGEN = ["gender", "participant_code", "participant_name",
+                   "result_WLT", "date", "stage", "stage_code", "event_code"]
+
+
+@dataclass(frozen=True)
+class Agregado:
+    disciplina: str
+    genero: str
+    codigo: str
+    nombre: str
+    wins: int
+    losses: int
+    ties: int
+    total: int
+    etapa: str
+
+    def como_tupla(self) -> tuple[int, int, int]:
+        """(wins, losses, total) con el mismo contrato que `llamada_stats`."""
+        return self.wins, self.losses, self.total or 1
+
+
+def _huella(fuente, disciplina: str) -> dict:
+    return {"rapida": fuente.huella_rapida(disciplina),
+            "contenido": fuente.huella_contenido(disciplina)}
+
+
+def epoch(fecha: str) -> int:
+    """Fecha ISO del CSV en segundos epoch (0 si no se puede leer)."""
+    try:
+        return int(datetime.fromisoformat(fecha).timestamp())
+    except ValueError:
+        return 0
+
+
+def _acumulador(nombre: int) -> list:
+    """[nombre, etapa, wins, losses, ties, partidos, fecha] de una fila del índice."""
+    return [nombre, 0, 0, 0, 0, 0, -1]
+
+
+def _acumular(acc: list, resultado: str | None, fecha: int, etapa: str | None,
+              etapas: Diccionario) -> int:
+    """Suma una fila del CSV al acumulador; devuelve su código W/L/T (0 si no tiene)."""
+    wlt = CODIGOS_WLT.get(resultado or "", 0)
+    if wlt:
+        acc[1 + wlt] += 1
+    acc[5] += 1
+    if fecha >= acc[6]:
+        acc[6] = fecha
+        acc[1] = etapas.codificar(etapa or "")
+    return wlt
+
+
+class IndiceAgregados:
+    """Tabla de agregados con búsqueda O(1) por clave o por nombre."""
+
+    def __init__(self, disciplinas: list[str], generos: list[str], codigos: list[str],
+                 nombres: list[str], etapas: list[str], claves: np.ndarray,
+                 valores: np.ndarray, manifiesto: dict, elo: Elo | None = None):
+        self.disciplinas = disciplinas
+        self.generos     = generos
+        self.codigos     = codigos
+        self.nombres     = nombres
+        self.etapas      = etapas
+        # claves[fila]  = [disciplina, genero, codigo, nombre, etapa] (ids)
+        # valores[fila] = [wins, losses, ties, partidos, fecha_ultima]
+        self.claves      = claves
+        self.valores     = valores
+        self.manifiesto  = manifiesto
+        self.elo         = elo or Elo(len(claves))
+        self._lock       = threading.RLock()
+
+        self._por_clave: dict[tuple[str, str, str], int] = {}
+        self._por_nombre: dict[tuple[str, str], list[int]] = {}
+        self._por_vista: dict[str, list[int]] = {}
+        for fila, (d, g, c, n, _) in enumerate(self.claves.tolist()):
+            vista = vista_de_disciplina(disciplinas[d])
+            self._por_clave[(vista, generos[g], codigos[c])] = fila
+            self._por_nombre.setdefault((vista, nombres[n]), []).append(fila)
+            self._por_vista.setdefault(vista, []).append(fila)
+
+    # ── construcción ──────────────────────────────────────
+    @classmethod
+    def construir(cls, fuente=None) -> "IndiceAgregados":
+        fuente = fuente or fuente_resultados()
+        disciplinas, generos, codigos, nombres, etapas = (Diccionario() for _ in range(5))
+        filas: dict[tuple[int, int, int], list] = {}
+        manifiesto = {}
+        # (partido, clave de fila, result_WLT, fecha) para emparejar después
+        jugadas = []
+
+        for disciplina in fuente.disciplinas():
+            manifiesto[disciplina] = _huella(fuente, disciplina)
+            d = disciplinas.codificar(disciplina)
+            for genero, codigo, nombre, resultado, fecha, etapa, fase, evento in fuente.filas(
+                    disciplina, COLUMNAS_ORIGEN):
+                clave = (d, generos.codificar(genero or ""), codigos.codificar(codigo or ""))
+                acc = filas.get(clave)
+                if acc is None:
+                    acc = filas[clave] = _acumulador(nombres.codificar(nombre or ""))
+                fecha = epoch(fecha or "")
+                if _acumular(acc, resultado, fecha, etapa, etapas):
+                    jugadas.append(((d, fase, evento), clave, resultado, fecha))
+
+        claves = np.array([[d, g, c, acc[0], acc[1]] for (d, g, c), acc in filas.items()],
+                          dtype=np.int32).reshape(-1, 5)
+        valores = np.array([acc[2:] for acc in filas.values()],
+                           dtype=np.int64).reshape(-1, len(COLUMNAS))
+        fila_de = {clave: i for i, clave in enumerate(filas)}
+        partidos = [(fila_de[a], fila_de[b], puntos, fecha)
+                    for _, a, b, puntos, fecha in emparejar(jugadas)]
+        elo = Elo(len(filas))
+        if partidos:
+            elo.aplicar(*zip(*partidos))
+        return cls(disciplinas.valores, generos.valores, codigos.valores,
+                   nombres.valores, etapas.valores, claves, valores, manifiesto, elo)
+
+    # ── persistencia ──────────────────────────────────────
+    def guardar(self, ruta: Path = RUTA_INDICE):
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_suffix(".tmp.npz")
+        # Copia consistente bajo el lock; la compresión y la escritura, fuera
+        with self._lock:
+            arrays = dict(
+                disciplinas=np.array(self.disciplinas, dtype=str),
+                generos=np.array(self.generos, dtype=str),
+                codigos=np.array(self.codigos, dtype=str),
+                nombres=np.array(self.nombres, dtype=str),
+                etapas=np.array(self.etapas, dtype=str),
+                claves=self.claves.copy(),
+                valores=self.valores.copy(),
+                manifiesto=np.array(json.dumps(self.manifiesto)),
+                elo=self.elo.ratings,
+                elo_filas=self.elo.filas,
+                elo_fechas=self.elo.fechas,
+                elo_valores=self.elo.valores,
+            )
+        np.savez_compressed(tmp, **arrays)
+        tmp.replace(ruta)
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_INDICE) -> "IndiceAgregados":
+        with np.load(ruta) as z:
+            return cls(z["disciplinas"].tolist(), z["generos"].tolist(),
+                       z["codigos"].tolist(), z["nombres"].tolist(),
+                       z["etapas"].tolist(), z["claves"], z["valores"],
+                       json.loads(str(z["manifiesto"])),
+                       Elo(len(z["claves"]), z["elo"], z["elo_filas"],
+                           z["elo_fechas"], z["elo_valores"]))
+
+    def vigente(self, fuente=None) -> bool:
+        """True si ningún CSV de origen ha cambiado desde que se construyó."""
+        fuente = fuente or fuente_resultados()
+        actuales = fuente.disciplinas()
+        if set(actuales) != set(self.manifiesto):
+            return False
+        for disciplina in actuales:
+            guardada = self.manifiesto[disciplina]
+            if fuente.huella_rapida(disciplina) == guardada["rapida"]:
+                continue
+            # mtime distinto (p. ej. tras un checkout): solo cuenta si cambia el contenido
+            if fuente.huella_contenido(disciplina) != guardada["contenido"]:
+                return False
+        return True
+
+    # ── consultas ─────────────────────────────────────────
+    def _agregado(self, fila: int) -> Agregado:
+        d, g, c, n, e = self.claves[fila].tolist()
+        w, l, t, partidos, _ = self.valores[fila].tolist()
+        return Agregado(self.disciplinas[d], self.generos[g], self.codigos[c],
+                        self.nombres[n], w, l, t, partidos, self.etapas[e])
+
+    def agregado(self, vista: str, genero: str, codigo: str) -> Agregado | None:
+        with self._lock:
+            fila = self._por_clave.get((vista.lower(), genero, codigo))
+            return None if fila is None else self._agregado(fila)
+
+    def _filas_elegidas(self, filas) -> np.ndarray:
+        """
+        De `filas`, las del género con más partidos de cada participant_name:
+        "Australia" en baloncesto son dos equipos (M y W) y no se mezclan.
+        """
+        filas = np.asarray(filas, dtype=np.int64)
+        if not len(filas):
+            return filas
+        n_generos = max(len(self.generos), 1)
+        nombre = self.claves[filas, 3].astype(np.int64)
+        grupos, grupo = np.unique(nombre * n_generos + self.claves[filas, 1], return_inverse=True)
+        partidos = np.bincount(grupo, weights=self.valores[filas, 3], minlength=len(grupos))
+        nombre_grupo = grupos // n_generos
+        orden = np.lexsort((-partidos, nombre_grupo))
+        ng = nombre_grupo[orden]
+        elegido = np.zeros(len(grupos), dtype=bool)
+        elegido[orden[np.r_[True, ng[1:] != ng[:-1]]]] = True
+        return filas[elegido[grupo]]
+
+    def _filas_nombre(self, vista: str, nombre: str, genero: str | None) -> np.ndarray:
+        filas = self._por_nombre.get((vista.lower(), nombre)) or []
+        if genero is None:
+            return self._filas_elegidas(filas)
+        return np.asarray([f for f in filas if self.generos[self.claves[f, 1]] == genero],
+                          dtype=np.int64)
+
+    def genero_comun(self, vista: str, a: str, b: str) -> str | None:
+        """El género en el que están los dos nombres con más partidos entre ambos (None si no hay)."""
+        with self._lock:
+            partidos: dict[str, list[float]] = {}
+            for lado, nombre in enumerate((a, b)):
+                for f in self._por_nombre.get((vista.lower(), nombre)) or []:
+                    suma = partidos.setdefault(self.generos[self.claves[f, 1]], [0.0, 0.0])
+                    suma[lado] += self.valores[f, 3]
+            comunes = [(sum(p), g) for g, p in partidos.items() if p[0] and p[1]]
+            return max(comunes)[1] if comunes else None
+
+    def por_nombre(self, vista: str, nombre: str, genero: str | None = None) -> Agregado | None:
+        """
+        Suma las entradas con ese participant_name en la vista dentro de un
+        género: `genero` o, si no se indica, el de más partidos.
+        """
+        with self._lock:
+            filas = self._filas_nombre(vista, nombre, genero).tolist()
+            if not filas:
+                return None
+            if len(filas) == 1:
+                return self._agregado(filas[0])
+            w, l, t, partidos, _ = self.valores[filas].sum(axis=0).tolist()
+            ultima = self._agregado(filas[int(self.valores[filas, 4].argmax())])
+            return Agregado(ultima.disciplina, ultima.genero, ultima.codigo, nombre,
+                            w, l, t, partidos, ultima.etapa)
+
+    def tabla_vista(self, vista: str) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (nombres, wins, losses, partidos) de todos los participantes de la
+        vista, agregados por participant_name como `por_nombre`.
+        """
+        with self._lock:
+            filas = self._filas_elegidas(self._por_vista.get(vista.lower(), []))
+            ids, grupo = np.unique(self.claves[filas, 3], return_inverse=True)
+            n = len(ids)
+            w, l, partidos = (np.bincount(grupo, weights=self.valores[filas, col], minlength=n)
+                              for col in (0, 1, 3))
+            return [self.nombres[i] for i in ids.tolist()], w, l, partidos
+
+    def codigos_por_nombre(self, vista: str) -> dict[str, set[str]]:
+        """{participant_name: participant_codes} de la vista (sin nombres vacíos)."""
+        with self._lock:
+            filas = self._por_vista.get(vista.lower(), [])
+            nombres: dict[str, set[str]] = {}
+            for c, n in self.claves[filas][:, [2, 3]].tolist():
+                if self.nombres[n]:
+                    nombres.setdefault(self.nombres[n], set()).add(self.codigos[c])
+            return nombres
+
+    # ── actualización incremental ─────────────────────────
+    def actualizar(self, disciplina: str, filas, afectados: set[tuple[str, str]],
+                   huella: dict | None = None) -> int:
+        """
+        Recalcula solo los agregados de `afectados` ((genero, codigo)) a partir
+        de `filas`, las filas actuales del CSV de `disciplina` en el orden de
+        COLUMNAS_ORIGEN; el resto de filas del índice no se toca. Los
+        participantes nuevos se añaden al final. `huella` pasa a ser la del
+        manifiesto, así que el índice sigue vigente sin reconstruirlo.
+        Devuelve cuántas filas del índice cambiaron.
+        """
+        with self._lock:
+            disciplinas, generos, codigos, nombres, etapas = (
+                Diccionario(v) for v in (self.disciplinas, self.generos, self.codigos,
+                                         self.nombres, self.etapas))
+            d = disciplinas.codificar(disciplina)
+            vista = vista_de_disciplina(disciplina)
+            acumulados: dict[tuple[str, str], list] = {
+                clave: _acumulador(int(self.claves[self._por_clave[(vista, *clave)], 3]))
+                for clave in afectados if (vista, *clave) in self._por_clave}
+            for genero, codigo, nombre, resultado, fecha, etapa, *_ in filas:
+                clave = (genero or "", codigo or "")
+                if clave not in afectados:
+                    continue
+                acc = acumulados.get(clave)
+                if acc is None:
+                    acc = acumulados[clave] = _acumulador(nombres.codificar(nombre or ""))
+                else:
+                    acc[0] = nombres.codificar(nombre or "")
+                _acumular(acc, resultado, epoch(fecha or ""), etapa, etapas)
+
+            nuevas_claves, nuevos_valores = [], []
+            for (genero, codigo), acc in acumulados.items():
+                if not acc[5]:
+                    # Ya no le queda ninguna fila: agregados a cero y sin fase
+                    acc[1] = etapas.codificar("")
+                clave = [d, generos.codificar(genero), codigos.codificar(codigo), acc[0], acc[1]]
+                fila = self._por_clave.get((vista, genero, codigo))
+                if fila is None:
+                    nuevas_claves.append(clave)
+                    nuevos_valores.append(acc[2:])
+                    continue
+                anterior = self.nombres[self.claves[fila, 3]]
+                self.claves[fila] = clave
+                self.valores[fila] = acc[2:]
+                if nombres[acc[0]] != anterior:
+                    self._por_nombre[(vista, anterior)].remove(fila)
+                    self._por_nombre.setdefault((vista, nombres[acc[0]]), []).append(fila)
+
+            if nuevas_claves:
+                primera = len(self.claves)
+                self.claves = np.r_[self.claves, np.asarray(nuevas_claves, dtype=self.claves.dtype)]
+                self.valores = np.r_[self.valores, np.asarray(nuevos_valores, dtype=self.valores.dtype)]
+                for fila, (_, g, c, n, _) in enumerate(nuevas_claves, start=primera):
+                    self._por_clave[(vista, generos[g], codigos[c])] = fila
+                    self._por_nombre.setdefault((vista, nombres[n]), []).append(fila)
+                    self._por_vista.setdefault(vista, []).append(fila)
+                self.elo.ampliar(len(self.claves))
+
+            self.disciplinas, self.generos, self.codigos, self.nombres, self.etapas = (
+                disciplinas.valores, generos.valores, codigos.valores, nombres.valores, etapas.valores)
+            if huella is not None:
+                self.manifiesto[disciplina] = huella
+            return len(acumulados)
+
+    def rating(self, vista: str, nombre: str, fecha: int | None = None,
+               genero: str | None = None) -> float | None:
+        """
+        Elo de ese participant_name en la vista (tras los partidos hasta
+        `fecha`, epoch, si se indica), en el género de `por_nombre`; con
+        varias entradas, la mejor.
+        """
+        with self._lock:
+            filas = self._filas_nombre(vista, nombre, genero)
+            if not len(filas):
+                return None
+            return float(self.elo.en_fecha(fecha, filas).max())
+
+    def ratings_vista(self, vista: str, fecha: int | None = None) -> np.ndarray:
+        """Elo de cada participante de `tabla_vista(vista)`, en el mismo orden."""
+        with self._lock:
+            filas = self._filas_elegidas(self._por_vista.get(vista.lower(), []))
+            ids, grupo = np.unique(self.claves[filas, 3], return_inverse=True)
+            mejor = np.full(len(ids), -np.inf)
+            np.maximum.at(mejor, grupo, self.elo.en_fecha(fecha, filas))
+            return mejor
+
+    def registrar_partidos(self, partidos) -> int:
+        """
+        Aplica al Elo partidos nuevos ((vista, genero, codigo) de a, ídem de b,
+        puntos de a, fecha epoch) sin reproducir los anteriores. Los de filas
+        que no están en el índice se ignoran; devuelve cuántos se aplicaron.
+        """
+        with self._lock:
+            conocidos = [(self._por_clave[a], self._por_clave[b], puntos, fecha)
+                         for a, b, puntos, fecha in partidos
+                         if a in self._por_clave and b in self._por_clave]
+            return self.elo.aplicar(*zip(*conocidos)) if conocidos else 0
+
+    def rehacer_elo(self, vista: str, partidos) -> int:
+        """
+        Reproduce el Elo de la vista con todos sus partidos actuales (mismo
+        formato que `registrar_partidos`): un partido ya aplicado que se
+        corrigió o se eliminó deja de contar. Devuelve cuántos se aplicaron.
+        """
+        with self._lock:
+            conocidos = [(self._por_clave[a], self._por_clave[b], puntos, fecha)
+                         for a, b, puntos, fecha in partidos
+                         if a in self._por_clave and b in self._por_clave]
+            a, b, puntos, fechas = zip(*conocidos) if conocidos else ((), (), (), ())
+            return self.elo.rehacer(self._por_vista.get(vista.lower(), []), a, b, puntos, fechas)
+
+    def __len__(self) -> int:
+        return len(self.claves)
+
+
+def cargar_o_construir(fuente=None, ruta: Path = RUTA_INDICE) -> IndiceAgregados:
+    """Carga el índice de disco y solo lo reconstruye si está desfasado."""
+    fuente = fuente or fuente_resultados()
+    ruta = Path(ruta)
+    if ruta.exists():
+        try:
+            indice = IndiceAgregados.cargar(ruta)
+            if indice.vigente(fuente):
+                return indice
+        except (OSError, ValueError, KeyError):
+            pass
+    indice = IndiceAgregados.construir(fuente)
+    indice.guardar(ruta)
+    return indice
+
+
+_indice: IndiceAgregados | None = None
+_lock_indice = threading.Lock()
+
+
+def obtener_indice() -> IndiceAgregados:
+    """Instancia compartida del proceso."""
+    global _indice
+    with _lock_indice:
+        if _indice is None:
+            _indice = cargar_o_construir()
+        return _indice
+
+
+if __name__ == "__main__":
+    indice = IndiceAgregados.construir()
+    indice.guardar()
+    print(f"Índice construido: {len(indice)} participantes -> {RUTA_INDICE}")
@@ -0,0 +1,228 @@
+"""
+Ingesta en paralelo de los CSV de París 2024.
+
+Cada fichero (results/<Disciplina>.csv, athletes.csv, medallists.csv...) es
+una `Tarea` que un proceso del pool convierte en un `Trozo` columnar: las
+columnas de texto como códigos int32 sobre un diccionario local del fichero
+y las numéricas como float64. El proceso principal reserva una vez los
+arrays finales de cada tabla y escribe cada trozo directamente en su tramo,
+traduciendo los códigos locales a los IDs del `Internador` con una sola
+tabla de consulta por columna: no hay listas intermedias ni concatenaciones.
+
+Los trozos se fusionan en el orden de las tareas, no en el de llegada, así
+que los IDs resultantes son los mismos que leyendo los ficheros en serie.
+Cada trozo trae su medida (filas, bytes, segundos de parseo) para ver qué
+ficheros dominan el tiempo de carga:
+
+    python -m motor.ingesta --procesos 4
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from motor.archivo import iterar_fichero, iterar_filas
+
+# Un proceso del pool (spawn + importar NumPy) tarda ~0.25 s en arrancar y
+# aquí se parsean ~30 MB/s: cada proceso debe tener trabajo para amortizarlo
+# varias veces. Con este reparto, por debajo de 2 × BYTES_POR_PROCESO (64 MB)
+# la ingesta es en este proceso; el conjunto de París (~12 MB) tarda 0.42 s
+# en serie frente a 0.9 s con 2 procesos y 1.4 s con 4.
+BYTES_POR_PROCESO = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Tarea:
+    """Un CSV (en disco o miembro de un zip) y las columnas que van a `tabla`."""
+    tabla: str
+    ruta: str
+    miembro: str | None
+    textos: tuple[str, ...]
+    numericas: tuple[str, ...] = ()
+
+    @property
+    def etiqueta(self) -> str:
+        return self.miembro or Path(self.ruta).name
+
+
+@dataclass(frozen=True)
+class Medida:
+    archivo: str
+    tabla: str
+    filas: int
+    bytes: int
+    segundos: float
+
+    @property
+    def filas_s(self) -> float:
+        return self.filas / self.segundos if self.segundos else math.inf
+
+    @property
+    def mb_s(self) -> float:
+        return self.bytes / 1024 / 1024 / self.segundos if self.segundos else math.inf
+
+    def como_dict(self) -> dict:
+        return {"archivo": self.archivo, "tabla": self.tabla, "filas": self.filas,
+                "mb": round(self.bytes / 1024 / 1024, 2), "ms": round(self.segundos * 1000, 1),
+                "filas/s": round(self.filas_s), "MB/s": round(self.mb_s, 1)}
+
+
+@dataclass
+class Trozo:
+    """Columnas de un fichero: códigos sobre `valores` locales y números."""
+    medida: Medida
+    valores: dict[str, list[str]]
+    codigos: dict[str, np.ndarray]
+    numericas: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return self.medida.filas
+
+
+def numero_o_nan(texto: str | None) -> float:
+    try:
+        return float(texto) if texto else math.nan
+    except ValueError:
+        return math.nan
+
+
+def tamano(tarea: Tarea) -> int:
+    """Bytes del CSV sin comprimir (0 si no se puede leer)."""
+    try:
+        if tarea.miembro is None:
+            return Path(tarea.ruta).stat().st_size
+        with zipfile.ZipFile(tarea.ruta) as zf:
+            return zf.getinfo(tarea.miembro).file_size
+    except (OSError, KeyError):
+        return 0
+
+
+def parsear(tarea: Tarea) -> Trozo:
+    """Lee un CSV entero a forma columnar (se ejecuta en los procesos del pool)."""
+    inicio = time.perf_counter()
+    n = len(tarea.textos)
+    columnas = [*tarea.textos, *tarea.numericas]
+    if tarea.miembro is None:
+        filas = list(iterar_fichero(Path(tarea.ruta), columnas))
+    else:
+        filas = list(iterar_filas(tarea.miembro, columnas, Path(tarea.ruta)))
+    columnas = list(zip(*filas)) or [()] * len(columnas)
+
+    valores, codigos = {}, {}
+    for columna, datos in zip(tarea.textos, columnas[:n]):
+        locales: dict[str, int] = {}
+        codigos[columna] = np.fromiter((locales.setdefault(v or "", len(locales)) for v in datos),
+                                       dtype=np.int32, count=len(datos))
+        valores[columna] = list(locales)
+    numericas = {c: np.fromiter((numero_o_nan(v) for v in datos), dtype=np.float64, count=len(datos))
+                 for c, datos in zip(tarea.numericas, columnas[n:])}
+    medida = Medida(tarea.etiqueta, tarea.tabla, len(filas), tamano(tarea),
+                    time.perf_counter() - inicio)
+    return Trozo(medida, valores, codigos, numericas)
+
+
+@dataclass
+class Ingesta:
+    """Columnas fusionadas por tabla y la medida de cada fichero."""
+    datos: dict[str, dict[str, np.ndarray]]
+    medidas: list[Medida]
+    segundos: float
+    procesos: int
+    fusion_s: float = 0.0
+    columnas: dict[str, tuple] = field(default_factory=dict)
+
+    def informe(self) -> list[dict]:
+        """Una fila por fichero, de más lento a más rápido."""
+        return [m.como_dict() for m in sorted(self.medidas, key=lambda m: -m.segundos)]
+
+    def resumen(self) -> dict:
+        filas = sum(m.filas for m in self.medidas)
+        mb = sum(m.bytes for m in self.medidas) / 1024 / 1024
+        return {"ficheros": len(self.medidas), "procesos": self.procesos, "filas": filas,
+                "mb": round(mb, 2), "segundos": round(self.segundos, 3),
+                "parseo_s": round(sum(m.segundos for m in self.medidas), 3),
+                "fusion_s": round(self.fusion_s, 3),
+                "filas/s": round(filas / self.segundos) if self.segundos else None,
+                "MB/s": round(mb / self.segundos, 1) if self.segundos else None}
+
+
+def _procesos_por_defecto(tareas: list[Tarea]) -> int:
+    """
+    DENODO_INGESTA_PROCESOS si está definida; si no, un proceso por núcleo
+    pero no más de uno por BYTES_POR_PROCESO, y ninguno (en este proceso)
+    por debajo de dos: arrancar un proceso cuesta más que parsear sus MB.
+    """
+    if os.environ.get("DENODO_INGESTA_PROCESOS"):
+        return max(1, int(os.environ["DENODO_INGESTA_PROCESOS"]))
+    por_tamano = sum(tamano(t) for t in tareas) // BYTES_POR_PROCESO
+    return int(max(1, min(os.cpu_count() or 1, len(tareas), por_tamano)))
+
+
+def ingerir(tareas: list[Tarea], internador, procesos: int | None = None) -> Ingesta:
+    """
+    Parsea `tareas` en un pool de `procesos` (por defecto, según núcleos y
+    tamaño; con uno solo se parsea en este proceso) y fusiona los trozos de
+    cada tabla sobre los diccionarios de `internador`.
+    """
+    inicio = time.perf_counter()
+    procesos = procesos or _procesos_por_defecto(tareas)
+    if procesos > 1:
+        # spawn: el pool no hereda los hilos de Streamlit ni locks tomados
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            # Los ficheros grandes primero, para no quedarse esperando al final por uno
+            orden = sorted(range(len(tareas)), key=lambda i: -tamano(tareas[i]))
+            futuros = {i: pool.submit(parsear, tareas[i]) for i in orden}
+            trozos = [futuros[i].result() for i in range(len(tareas))]
+    else:
+        trozos = [parsear(t) for t in tareas]
+
+    inicio_fusion = time.perf_counter()
+    datos, columnas = {}, {}
+    for tabla in dict.fromkeys(t.tabla for t in tareas):
+        suyas = [(t, trozo) for t, trozo in zip(tareas, trozos) if t.tabla == tabla]
+        textos, numericas = suyas[0][0].textos, suyas[0][0].numericas
+        total = sum(len(trozo) for _, trozo in suyas)
+        destino = {c: np.empty(total, dtype=np.int32) for c in textos}
+        destino.update({c: np.empty(total, dtype=np.float64) for c in numericas})
+        posicion = 0
+        for _, trozo in suyas:
+            tramo = slice(posicion, posicion + len(trozo))
+            for c in textos:
+                consulta = internador.diccionario(c).codificar_todos(trozo.valores[c])
+                # mode="clip": con "raise" NumPy escribe en un búfer y luego copia
+                np.take(consulta, trozo.codigos[c], out=destino[c][tramo], mode="clip")
+            for c in numericas:
+                destino[c][tramo] = trozo.numericas[c]
+            posicion = tramo.stop
+        datos[tabla] = destino
+        columnas[tabla] = (list(textos), list(numericas))
+    fin = time.perf_counter()
+    return Ingesta(datos, [t.medida for t in trozos], fin - inicio, procesos,
+                   fin - inicio_fusion, columnas)
+
+
+if __name__ == "__main__":
+    import json
+
+    from motor.internado import Internador, tareas_paris
+
+    parser = argparse.ArgumentParser(description="Ingesta en paralelo de results/ y archive.zip")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos del pool (por defecto, según núcleos y tamaño)")
+    parser.add_argument("--top", type=int, default=15, help="Ficheros más lentos a mostrar")
+    args = parser.parse_args()
+
+    ingesta = ingerir(tareas_paris(), Internador(), args.procesos)
+    print(f"{'archivo':<42} {'filas':>8} {'MB':>6} {'ms':>8} {'filas/s':>10} {'MB/s':>7}")
+    for fila in ingesta.informe()[:args.top]:
+        print(f"{fila['archivo']:<42} {fila['filas']:>8} {fila['mb']:>6} {fila['ms']:>8} "
+              f"{fila['filas/s']:>10} {fila['MB/s']:>7}")
+    print(json.dumps(ingesta.resumen(), ensure_ascii=False))
@@ -0,0 +1,554 @@
+"""
+Representación compacta en memoria del conjunto de París 2024.
+
+Los textos que se repiten fila a fila (participant_code, participant_name,
+event_code, stage_code con su relleno de guiones, sede, país...) se guardan
+una sola vez por proceso en un `Diccionario` y las tablas solo contienen
+sus IDs en arrays int32. Las columnas que comparten valores comparten
+diccionario (participant_code de results/ y code de athletes.csv, los
+códigos de país...), así que un mismo texto no se duplica entre tablas. Las
+filas se leen con `Registro`, una vista con `__slots__` que decodifica
+bajo demanda.
+
+El conjunto (`obtener_conjunto()`) es uno por proceso: todas las sesiones de
+un worker de Streamlit lo comparten en lugar de tener cada una sus columnas
+de objetos de pandas. Entre procesos se comparte también: el primer worker lo
+publica en .cache/conjunto_paris.bin (arrays de IDs, y los diccionarios como
+bloque UTF-8 más offsets) y el resto lo mapea con `np.memmap`, sin copiar ni
+volver a leer los CSV; las páginas del fichero están una sola vez en la caché
+del sistema operativo para todos los workers. DENODO_CONJUNTO_COMPARTIDO=0
+vuelve a la copia privada por proceso.
+
+La construcción lee todos los CSV en paralelo con `motor.ingesta`.
+
+    python -m motor.internado     # publica el fichero y muestra la huella
+"""
+import json
+import math
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from motor.archivo import RUTA_ARCHIVO, FuenteDirectorio, PREFIJO_RESULTADOS, fuente_resultados
+from motor.ingesta import Tarea, ingerir, numero_o_nan
+
+RUTA_CONJUNTO = Path(__file__).resolve().parent.parent / ".cache" / "conjunto_paris.bin"
+COMPARTIR = os.environ.get("DENODO_CONJUNTO_COMPARTIDO", "1") != "0"
+
+# Cabecera del fichero: firma, longitud del JSON de descripción y el JSON;
+# cada array empieza alineado a ALINEACION bytes
+FIRMA = b"DCONJ2\0\0"
+ALINEACION = 64
+
+# Columna -> dominio del diccionario que la codifica
+DOMINIOS = {
+    "participant_code": "participante", "code": "participante",
+    "participant_name": "nombre", "name": "nombre",
+    "participant_country_code": "pais", "country_code": "pais", "nationality_code": "pais",
+    "participant_country": "pais_nombre", "country": "pais_nombre",
+    "discipline_name": "disciplina", "disciplines": "disciplinas",
+    "event_code": "evento", "event_name": "evento_nombre", "events": "eventos",
+    "stage_code": "fase", "stage": "etapa", "event_stage": "etapa_evento",
+    "date": "fecha", "birth_date": "fecha",
+    "result_WLT": "wlt", "result_type": "tipo_resultado", "result": "resultado",
+    "participant_type": "tipo_participante",
+    "code_athlete": "participante", "code_team": "participante",
+    "discipline": "disciplina", "event": "evento_nombre", "medal_date": "fecha",
+}
+
+COLUMNAS_RESULTADOS = ["date", "discipline_name", "stage_code", "event_code", "event_name",
+                       "stage", "gender", "venue", "participant_code", "participant_name",
+                       "participant_type", "participant_country_code", "result",
+                       "result_type", "result_WLT"]
+NUMERICAS_RESULTADOS = ["rank"]
+
+# De athletes.csv solo las columnas de identidad; las biografías en texto
+# libre (hobbies, filosofía, familia...) son la mayor parte de sus 7 MB
+COLUMNAS_ATLETAS = ["code", "name", "gender", "function", "country_code", "country",
+                    "nationality_code", "disciplines", "events", "birth_date"]
+NUMERICAS_ATLETAS = ["height", "weight"]
+
+# Resto de CSV de archive.zip que se cargan con el conjunto:
+# tabla -> (miembro, columnas de texto, columnas numéricas)
+COMPLEMENTARIAS = {
+    "medallistas": ("medallists.csv",
+                    ["medal_date", "medal_type", "name", "gender", "country_code", "discipline",
+                     "event", "event_type", "code_athlete", "code_team"], ["medal_code"]),
+    "medallas": ("medals.csv",
+                 ["medal_date", "medal_type", "name", "gender", "discipline", "event",
+                  "event_type", "code", "country_code"], ["medal_code"]),
+    "eventos": ("events.csv", ["event", "tag", "sport", "sport_code"], []),
+    "nocs": ("nocs.csv", ["code", "country", "country_long", "tag"], []),
+}
+
+
+class Diccionario:
+    """Codificación string -> int con decodificación por posición."""
+
+    __slots__ = ("valores", "ids")
+
+    def __init__(self, valores=()):
+        self.valores = list(valores)
+        self.ids = {v: i for i, v in enumerate(self.valores)}
+
+    def codificar(self, valor: str) -> int:
+        i = self.ids.get(valor)
+        if i is None:
+            # Primero el valor y luego el ID: quien lea el ID ya puede decodificarlo
+            self.valores.append(valor)
+            i = self.ids[valor] = len(self.valores) - 1
+        return i
+
+    def codificar_todos(self, valores) -> np.ndarray:
+        return np.fromiter((self.codificar(v) for v in valores), dtype=np.int32)
+
+    def id_de(self, valor: str) -> int | None:
+        return self.ids.get(valor)
+
+    def __getitem__(self, i: int) -> str:
+        return self.valores[i]
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    @property
+    def nbytes(self) -> int:
+        """Textos más la lista y el dict que los indexan."""
+        textos = sum(sys.getsizeof(v) for v in self.valores)
+        return textos + sys.getsizeof(self.valores) + sys.getsizeof(self.ids)
+
+
+class DiccionarioMapeado:
+    """
+    `Diccionario` de solo lectura sobre un bloque UTF-8 y sus offsets mapeados
+    de disco: decodificar es un slice; la tabla inversa (`id_de`) se construye
+    en el proceso la primera vez que se necesita.
+    """
+
+    __slots__ = ("bloque", "offsets", "_ids")
+
+    def __init__(self, bloque: np.ndarray, offsets: np.ndarray):
+        self.bloque = bloque
+        self.offsets = offsets
+        self._ids: dict[str, int] | None = None
+
+    @staticmethod
+    def serializar(valores: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        codificados = [v.encode("utf-8") for v in valores]
+        offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in codificados], out=offsets[1:])
+        return np.frombuffer(b"".join(codificados), dtype=np.uint8), offsets
+
+    def __getitem__(self, i: int) -> str:
+        return self.bloque[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def valores(self) -> list[str]:
+        return [self[i] for i in range(len(self))]
+
+    def id_de(self, valor: str) -> int | None:
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self.valores)}
+        return self._ids.get(valor)
+
+    def codificar(self, valor: str) -> int:
+        i = self.id_de(valor)
+        if i is None:
+            raise KeyError(f"{valor!r} no está en el diccionario publicado (solo lectura)")
+        return i
+
+    def codificar_todos(self, valores) -> np.ndarray:
+        return np.fromiter((self.codificar(v) for v in valores), dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """Solo lo privado del proceso; el bloque y los offsets son páginas compartidas."""
+        return sys.getsizeof(self._ids) if self._ids is not None else 0
+
+
+class Internador:
+    """Un `Diccionario` por dominio, compartido por todas las tablas del proceso."""
+
+    def __init__(self, dominios: dict | None = None):
+        self._dominios: dict[str, Diccionario | DiccionarioMapeado] = dict(dominios or {})
+        self._lock = threading.Lock()
+
+    def dominios(self) -> dict:
+        with self._lock:
+            return dict(self._dominios)
+
+    def diccionario(self, columna: str) -> Diccionario | DiccionarioMapeado:
+        dominio = DOMINIOS.get(columna, columna)
+        with self._lock:
+            d = self._dominios.get(dominio)
+            if d is None:
+                d = self._dominios[dominio] = Diccionario()
+            return d
+
+    def escribible(self, columna: str) -> Diccionario:
+        """
+        El diccionario de `columna` admitiendo valores nuevos: si está mapeado
+        se copia a memoria privada la primera vez, con los mismos IDs.
+        """
+        dominio = DOMINIOS.get(columna, columna)
+        with self._lock:
+            d = self._dominios.get(dominio)
+            if not isinstance(d, Diccionario):
+                d = self._dominios[dominio] = Diccionario(d.valores if d is not None else ())
+            return d
+
+    def estadisticas(self) -> dict[str, dict]:
+        with self._lock:
+            return {dominio: {"valores": len(d), "bytes": d.nbytes}
+                    for dominio, d in sorted(self._dominios.items())}
+
+
+class Registro:
+    """Una fila de una `TablaCompacta`; los campos se decodifican al leerlos."""
+
+    __slots__ = ("_tabla", "_fila")
+
+    def __init__(self, tabla: "TablaCompacta", fila: int):
+        self._tabla = tabla
+        self._fila = fila
+
+    def __getattr__(self, columna: str):
+        return self._tabla.valor(columna, self._fila)
+
+    def como_dict(self) -> dict:
+        return {c: self._tabla.valor(c, self._fila) for c in self._tabla.columnas}
+
+    def __repr__(self) -> str:
+        return f"Registro({self.como_dict()!r})"
+
+
+class TablaCompacta:
+    """
+    Columnas de texto como IDs int32 sobre el `Internador` y columnas
+    numéricas como float64; cada fila ocupa 4 u 8 bytes por columna.
+    """
+
+    def __init__(self, internador: Internador, datos: dict[str, np.ndarray],
+                 textos: list[str], numericas: list[str]):
+        self.internador = internador
+        self.datos = datos
+        self.textos = textos
+        self.numericas = numericas
+        self._diccionarios = {c: internador.diccionario(c) for c in textos}
+
+    @classmethod
+    def desde_filas(cls, filas, textos: list[str], numericas: list[str] = (),
+                    internador: "Internador | None" = None) -> "TablaCompacta":
+        """`filas`: tuplas con los valores de `textos` y luego los de `numericas`."""
+        internador = internador or Internador()
+        diccionarios = [internador.diccionario(c) for c in textos]
+        ids = [[] for _ in textos]
+        nums = [[] for _ in numericas]
+        n = len(textos)
+        for fila in filas:
+            for lista, d, valor in zip(ids, diccionarios, fila):
+                lista.append(d.codificar(valor or ""))
+            for lista, valor in zip(nums, fila[n:]):
+                lista.append(numero_o_nan(valor))
+        datos = {c: np.asarray(v, dtype=np.int32) for c, v in zip(textos, ids)}
+        datos.update({c: np.asarray(v, dtype=np.float64) for c, v in zip(numericas, nums)})
+        return cls(internador, datos, list(textos), list(numericas))
+
+    @property
+    def columnas(self) -> list[str]:
+        return self.textos + self.numericas
+
+    def __len__(self) -> int:
+        return len(next(iter(self.datos.values()), ()))
+
+    def __getitem__(self, fila: int) -> Registro:
+        return Registro(self, fila)
+
+    def __iter__(self):
+        return (Registro(self, i) for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.datos.values())
+
+    def valor(self, columna: str, fila: int):
+        if columna in self._diccionarios:
+            return self._diccionarios[columna][int(self.datos[columna][fila])]
+        if columna in self.datos:
+            return float(self.datos[columna][fila])
+        raise AttributeError(columna)
+
+    def ids(self, columna: str) -> np.ndarray:
+        return self.datos[columna]
+
+    def filas_con(self, columna: str, valor: str) -> np.ndarray:
+        """Posiciones de las filas con `columna == valor` (comparación de enteros)."""
+        i = self._diccionarios[columna].id_de(valor)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.datos[columna] == i)
+
+    def decodificar(self, columna: str, filas=None) -> list[str]:
+        d = self._diccionarios[columna]
+        ids = self.datos[columna] if filas is None else self.datos[columna][filas]
+        return [d[i] for i in ids.tolist()]
+
+
+def tareas_paris(fuente=None, archivo: Path = RUTA_ARCHIVO) -> list[Tarea]:
+    """Una `Tarea` de ingesta por CSV de results/ y por CSV de archive.zip del conjunto."""
+    fuente = fuente or fuente_resultados()
+    textos, numericas = tuple(COLUMNAS_RESULTADOS), tuple(NUMERICAS_RESULTADOS)
+    if isinstance(fuente, FuenteDirectorio):
+        tareas = [Tarea("resultados", str(fuente.directorio / f"{d}.csv"), None, textos, numericas)
+                  for d in fuente.disciplinas()]
+    else:
+        tareas = [Tarea("resultados", str(fuente.ruta), f"{PREFIJO_RESULTADOS}{d}.csv",
+                        textos, numericas) for d in fuente.disciplinas()]
+    if Path(archivo).exists():
+        tareas.append(Tarea("atletas", str(archivo), "athletes.csv",
+                            tuple(COLUMNAS_ATLETAS), tuple(NUMERICAS_ATLETAS)))
+        for tabla, (miembro, textos, numericas) in COMPLEMENTARIAS.items():
+            tareas.append(Tarea(tabla, str(archivo), miembro, tuple(textos), tuple(numericas)))
+    return tareas
+
+
+def _huellas(fuente, archivo: Path) -> dict:
+    """Lo que invalida el conjunto publicado: los CSV de results/ y athletes.csv."""
+    huellas = {d: {"rapida": fuente.huella_rapida(d), "contenido": fuente.huella_contenido(d)}
+               for d in fuente.disciplinas()}
+    if Path(archivo).exists():
+        st = Path(archivo).stat()
+        huellas["archive.zip"] = {"rapida": [st.st_mtime_ns, st.st_size], "contenido": None}
+    return huellas
+
+
+class ConjuntoParis:
+    """
+    results/ completo, la parte de identidad de athletes.csv y las tablas
+    `COMPLEMENTARIAS` (medallistas, medallas, eventos, CON), internados juntos.
+    """
+
+    def __init__(self, internador: Internador, resultados: TablaCompacta,
+                 atletas: TablaCompacta | None, manifiesto: dict, ruta: Path | None = None,
+                 complementarias: dict[str, TablaCompacta] | None = None,
+                 ingesta: list[dict] | None = None):
+        self.internador = internador
+        self.resultados = resultados
+        self.atletas = atletas
+        self.complementarias = complementarias or {}
+        self.manifiesto = manifiesto
+        # Fichero mapeado del que salen los arrays (None: copia privada)
+        self.ruta = ruta
+        # Medidas por fichero de la ingesta (None si se mapeó uno ya publicado)
+        self.ingesta = ingesta
+        # Serializa las sustituciones; los lectores no lo toman (ver reemplazar_disciplina)
+        self._lock = threading.Lock()
+
+    def tablas(self) -> dict[str, TablaCompacta]:
+        tablas = {"resultados": self.resultados, "atletas": self.atletas, **self.complementarias}
+        return {nombre: tabla for nombre, tabla in tablas.items() if tabla is not None}
+
+    # ── construcción ──────────────────────────────────────
+    @classmethod
+    def construir(cls, fuente=None, archivo: Path = RUTA_ARCHIVO,
+                  procesos: int | None = None) -> "ConjuntoParis":
+        """Ingesta en paralelo (`motor.ingesta`) de todos los CSV del conjunto."""
+        internador = Internador()
+        fuente = fuente or fuente_resultados()
+        ingesta = ingerir(tareas_paris(fuente, archivo), internador, procesos)
+        tablas = {nombre: TablaCompacta(internador, datos, *ingesta.columnas[nombre])
+                  for nombre, datos in ingesta.datos.items()}
+        resultados = tablas.pop("resultados", None) or TablaCompacta.desde_filas(
+            [], COLUMNAS_RESULTADOS, NUMERICAS_RESULTADOS, internador)
+        return cls(internador, resultados, tablas.pop("atletas", None), _huellas(fuente, archivo),
+                   complementarias=tablas, ingesta=ingesta.informe())
+
+    # ── publicación en disco y mapeo ──────────────────────
+    def guardar(self, ruta: Path = RUTA_CONJUNTO):
+        """Escribe el fichero compartido (atómico: los workers que ya lo tienen mapeado no se ven afectados)."""
+        arrays = {}
+        tablas = {}
+        for nombre, tabla in self.tablas().items():
+            tablas[nombre] = {"textos": tabla.textos, "numericas": tabla.numericas}
+            arrays.update({f"{nombre}/{c}": a for c, a in tabla.datos.items()})
+        for dominio, d in self.internador.dominios().items():
+            arrays[f"dic/{dominio}/bloque"], arrays[f"dic/{dominio}/offsets"] = \
+                DiccionarioMapeado.serializar(d.valores)
+
+        descripcion, posicion = {}, 0
+        for nombre, a in arrays.items():
+            descripcion[nombre] = {"dtype": a.dtype.str, "forma": list(a.shape), "offset": posicion}
+            posicion += -(-a.nbytes // ALINEACION) * ALINEACION
+        cabecera = json.dumps({"tablas": tablas, "arrays": descripcion,
+                               "manifiesto": self.manifiesto}).encode("utf-8")
+        inicio = -(-(len(FIRMA) + 8 + len(cabecera)) // ALINEACION) * ALINEACION
+
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            f.write(FIRMA + struct.pack("<Q", len(cabecera)) + cabecera)
+            for nombre, a in arrays.items():
+                f.seek(inicio + descripcion[nombre]["offset"])
+                f.write(np.ascontiguousarray(a).tobytes())
+            f.truncate(inicio + posicion)
+        tmp.replace(ruta)
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_CONJUNTO) -> "ConjuntoParis":
+        """Mapea el fichero publicado: ningún array se copia a memoria privada."""
+        ruta = Path(ruta)
+        with open(ruta, "rb") as f:
+            if f.read(len(FIRMA)) != FIRMA:
+                raise ValueError(f"{ruta} no es un conjunto publicado")
+            (longitud,) = struct.unpack("<Q", f.read(8))
+            cabecera = json.loads(f.read(longitud))
+        inicio = -(-(len(FIRMA) + 8 + longitud) // ALINEACION) * ALINEACION
+
+        def mapear(nombre):
+            d = cabecera["arrays"][nombre]
+            forma = tuple(d["forma"])
+            if not math.prod(forma):
+                return np.empty(forma, dtype=d["dtype"])
+            return np.memmap(ruta, dtype=d["dtype"], mode="r", offset=inicio + d["offset"],
+                             shape=forma)
+
+        dominios = {n.split("/")[1] for n in cabecera["arrays"] if n.startswith("dic/")}
+        internador = Internador({dominio: DiccionarioMapeado(mapear(f"dic/{dominio}/bloque"),
+                                                             mapear(f"dic/{dominio}/offsets"))
+                                 for dominio in dominios})
+        tablas = {}
+        for nombre, meta in cabecera["tablas"].items():
+            datos = {c: mapear(f"{nombre}/{c}") for c in meta["textos"] + meta["numericas"]}
+            tablas[nombre] = TablaCompacta(internador, datos, meta["textos"], meta["numericas"])
+        return cls(internador, tablas.pop("resultados"), tablas.pop("atletas", None),
+                   cabecera["manifiesto"], ruta, complementarias=tablas)
+
+    def reemplazar_disciplina(self, disciplina: str, filas, huella: dict | None = None) -> int:
+        """
+        Sustituye las filas de results/ de `disciplina` por `filas` (columnas
+        COLUMNAS_RESULTADOS + NUMERICAS_RESULTADOS) sin tocar las demás. Las
+        columnas de resultados pasan a memoria privada; el fichero publicado
+        no cambia.
+
+        La tabla nueva se construye aparte y se publica con una sola
+        asignación: quien ya tomó `resultados` sigue con la anterior, entera.
+        Los diccionarios solo crecen, así que los IDs viejos siguen valiendo.
+        """
+        with self._lock:
+            for columna in COLUMNAS_RESULTADOS:
+                self.internador.escribible(columna)
+            nuevas = TablaCompacta.desde_filas(filas, COLUMNAS_RESULTADOS, NUMERICAS_RESULTADOS,
+                                               self.internador)
+            actual = self.resultados
+            conservar = actual.ids("discipline_name") != \
+                self.internador.diccionario("discipline_name").codificar(disciplina)
+            datos = {c: np.concatenate([a[conservar], nuevas.datos[c]])
+                     for c, a in actual.datos.items()}
+            self.resultados = TablaCompacta(self.internador, datos, actual.textos, actual.numericas)
+            if huella is not None:
+                self.manifiesto = {**self.manifiesto, disciplina: huella}
+            return len(nuevas)
+
+    def vigente(self, fuente=None, archivo: Path = RUTA_ARCHIVO) -> bool:
+        """True si ni results/ ni archive.zip han cambiado desde que se construyó."""
+        fuente = fuente or fuente_resultados()
+        guardadas = self.manifiesto
+        actuales = set(fuente.disciplinas()) | ({"archive.zip"} if Path(archivo).exists() else set())
+        if actuales != set(guardadas):
+            return False
+        for disciplina in fuente.disciplinas():
+            if fuente.huella_rapida(disciplina) == guardadas[disciplina]["rapida"]:
+                continue
+            if fuente.huella_contenido(disciplina) != guardadas[disciplina]["contenido"]:
+                return False
+        if "archive.zip" in guardadas:
+            st = Path(archivo).stat()
+            return [st.st_mtime_ns, st.st_size] == guardadas["archive.zip"]["rapida"]
+        return True
+
+    def memoria(self) -> dict:
+        """Bytes de las tablas y de los diccionarios (privados o mapeados)."""
+        diccionarios = self.internador.estadisticas()
+        tablas = {nombre: tabla.nbytes for nombre, tabla in self.tablas().items()}
+        privado = sum(d["bytes"] for d in diccionarios.values())
+        if self.ruta is None:
+            privado += sum(tablas.values())
+        return {
+            "filas_resultados": len(self.resultados),
+            "filas_atletas": len(self.atletas) if self.atletas is not None else 0,
+            **{f"filas_{nombre}": len(t) for nombre, t in self.complementarias.items()},
+            "compartido": str(self.ruta) if self.ruta else None,
+            "mapeado_mb": round(self.ruta.stat().st_size / 1024 / 1024, 2) if self.ruta else 0,
+            "tablas_mb": {t: round(b / 1024 / 1024, 2) for t, b in tablas.items()},
+            "privado_mb": round(privado / 1024 / 1024, 2),
+            "valores_por_dominio": {k: d["valores"] for k, d in diccionarios.items()},
+        }
+
+
+def cargar_o_construir(fuente=None, ruta: Path = RUTA_CONJUNTO,
+                       compartir: bool = COMPARTIR, procesos: int | None = None) -> ConjuntoParis:
+    """
+    Mapea el conjunto publicado si sigue vigente; si no, lo construye desde
+    los CSV (`procesos` como en `ingerir`) y lo publica para los demás
+    workers (y este también lo mapea).
+    """
+    fuente = fuente or fuente_resultados()
+    ruta = Path(ruta)
+    if not compartir:
+        return ConjuntoParis.construir(fuente, procesos=procesos)
+    if ruta.exists():
+        try:
+            conjunto = ConjuntoParis.cargar(ruta)
+            if conjunto.vigente(fuente):
+                return conjunto
+        except (OSError, ValueError, KeyError):
+            pass
+    construido = ConjuntoParis.construir(fuente, procesos=procesos)
+    construido.guardar(ruta)
+    conjunto = ConjuntoParis.cargar(ruta)
+    conjunto.ingesta = construido.ingesta
+    return conjunto
+
+
+_conjunto: ConjuntoParis | None = None
+_lock_conjunto = threading.Lock()
+
+
+def conjunto_cargado() -> bool:
+    return _conjunto is not None
+
+
+def obtener_conjunto() -> ConjuntoParis:
+    """Instancia compartida del proceso (todas las sesiones del worker)."""
+    global _conjunto
+    with _lock_conjunto:
+        if _conjunto is None:
+            # Se construye dentro de una petición (botón de Streamlit, grafo de
+            # enfrentamientos): sin pool de procesos. El pool queda para
+            # `python -m motor.internado` y `python -m motor.ingesta`.
+            _conjunto = cargar_o_construir(procesos=1)
+        return _conjunto
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    conjunto = ConjuntoParis.construir()
+    conjunto.guardar()
+    print(f"Construido y publicado en {time.perf_counter() - inicio:.2f}s -> {RUTA_CONJUNTO}")
+    for medida in conjunto.ingesta[:5]:
+        print(f"  {medida['archivo']}: {medida['filas']} filas, {medida['ms']} ms, "
+              f"{medida['MB/s']} MB/s")
+    inicio = time.perf_counter()
+    conjunto = ConjuntoParis.cargar()
+    print(f"Mapeado en {(time.perf_counter() - inicio) * 1000:.1f}ms")
+    print(json.dumps(conjunto.memoria(), indent=2, ensure_ascii=False))
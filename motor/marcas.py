@@ -0,0 +1,254 @@
+"""
+Marcas numéricas de results/*.csv para las disciplinas sin W/L/T.
+
+Atletismo, natación, tiro... no rellenan `result_WLT`: compiten por `rank` y
+por `result`, un texto cuyo formato depende de `result_type` ("3:10.61" en
+TIME, "8.03" en DISTANCE, "85" en POINTS, "FLT (2)" en FAULT). Aquí esas
+columnas se convierten con operaciones de `np.char` sobre la columna entera
+y las métricas por participante (posición relativa en cada prueba, victorias,
+podios y margen frente al mejor de la prueba) salen con `np.bincount` y
+`ufunc.at`, sin bucles de Python por fila.
+"""
+import threading
+
+import numpy as np
+
+from motor.archivo import fuente_resultados
+from motor.catalogo import CacheVistas
+from motor.estadisticas import vista_de_disciplina
+
+# +1: más es mejor; -1: menos es mejor. El resto de tipos (IRM, FAULT,
+# NO_SCORE...) no son marcas comparables y quedan como NaN. Es solo el valor
+# por defecto: el sentido de cada prueba sale de su propio `rank` cuando lo
+# hay (vela y concurso completo puntúan penalizaciones en POINTS).
+SENTIDO = {
+    "TIME": -1, "STROKES": -1, "IRM_POINTS": -1,
+    "POINTS": 1, "DISTANCE": 1, "SCORE": 1, "SETS": 1, "WEIGHT": 1, "PERCENT": 1,
+    "": 1,
+}
+
+COLUMNAS_MARCAS = ["participant_name", "stage_code", "rank", "result", "result_type"]
+
+METRICAS = ("pruebas", "percentil", "victorias", "podios", "margen")
+
+
+def _decimal(textos: np.ndarray) -> np.ndarray:
+    """'12.5' -> 12.5; vacío o no numérico -> NaN."""
+    valido = np.char.isdigit(np.char.replace(textos, ".", "", count=1))
+    return np.where(valido, textos, "nan").astype(float)
+
+
+def a_numero(textos) -> np.ndarray:
+    """
+    Convierte una columna de textos a float: enteros, decimales con signo y
+    tiempos h:mm:ss.ff / m:ss.ff (en segundos). Lo demás queda como NaN.
+    """
+    t = np.char.strip(np.asarray(textos, dtype=str))
+    if not t.size:
+        return np.empty(t.shape)
+    signo = np.where(np.char.startswith(t, "-"), -1.0, 1.0)
+    t = np.char.lstrip(t, "+-")
+    partes = np.char.rpartition(t, ":")
+    horas_min, segundos = partes[..., 0], partes[..., 2]
+    partes = np.char.rpartition(horas_min, ":")
+    horas, minutos = partes[..., 0], partes[..., 2]
+    # Horas y minutos vacíos cuentan como 0; los segundos vacíos son NaN
+    horas, minutos = (_decimal(np.where(x == "", "0", x)) for x in (horas, minutos))
+    return signo * (horas * 3600 + minutos * 60 + _decimal(segundos))
+
+
+def convertir_resultados(resultados, tipos) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (valores, sentido) por fila: el `result` como número según su
+    `result_type` y +1/-1/0 según si más es mejor, menos es mejor o el tipo
+    no es comparable (en cuyo caso el valor es NaN).
+    """
+    tipos = np.asarray(tipos, dtype=str)
+    valores = a_numero(resultados)
+    sentido = np.zeros(len(tipos), dtype=np.int8)
+    for tipo, s in SENTIDO.items():
+        sentido[tipos == tipo] = s
+    valores[sentido == 0] = np.nan
+    return valores, sentido
+
+
+def por_tipo(resultados, tipos) -> dict[str, np.ndarray]:
+    """{result_type: valores numéricos} de las filas de cada tipo comparable."""
+    tipos = np.asarray(tipos, dtype=str)
+    valores, sentido = convertir_resultados(resultados, tipos)
+    return {tipo: valores[tipos == tipo] for tipo in np.unique(tipos[sentido != 0]).tolist()}
+
+
+def _signo_por_rank(grupos: np.ndarray, puestos: np.ndarray, valores: np.ndarray,
+                    n_grupos: int) -> np.ndarray:
+    """
+    +1/-1 por grupo según si el resultado del mejor `rank` supera o no a la
+    media del resto de filas con rank; 0 si el grupo no tiene rank suficiente.
+    """
+    validas = np.flatnonzero(~np.isnan(puestos) & ~np.isnan(valores))
+    signo = np.zeros(n_grupos, dtype=np.int8)
+    if not len(validas):
+        return signo
+    orden = validas[np.lexsort((puestos[validas], grupos[validas]))]
+    g = grupos[orden]
+    primera = orden[np.r_[True, g[1:] != g[:-1]]]
+    cuenta = np.bincount(g, minlength=n_grupos)
+    suma = np.bincount(g, weights=valores[orden], minlength=n_grupos)
+    mejor = np.full(n_grupos, np.nan)
+    mejor[grupos[primera]] = valores[primera]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resto = (suma - np.nan_to_num(mejor)) / (cuenta - 1)
+    con_rank = cuenta > 1
+    signo[con_rank] = np.sign(mejor[con_rank] - resto[con_rank])
+    return signo
+
+
+def orientar(grupos: np.ndarray, tipos: np.ndarray, puestos: np.ndarray,
+             valores: np.ndarray, sentido: np.ndarray) -> np.ndarray:
+    """
+    Sentido por fila decidido por prueba (`grupos`): el que marca el `rank`
+    del CSV; si la prueba no lo tiene, el mayoritario de las pruebas con rank
+    del mismo `result_type` en la disciplina; y solo si tampoco hay de esas,
+    el `sentido` de `SENTIDO`. Los tipos no comparables (sentido 0) no cambian.
+    """
+    if not len(grupos):
+        return sentido
+    n_grupos = int(grupos.max()) + 1
+    por_rank = _signo_por_rank(grupos, puestos, valores, n_grupos)
+    nombres_tipo, tipo_fila = np.unique(tipos, return_inverse=True)
+    tipo_grupo = np.zeros(n_grupos, dtype=np.intp)
+    tipo_grupo[grupos] = tipo_fila
+    por_tipo_rank = np.sign(np.bincount(tipo_grupo, weights=por_rank, minlength=len(nombres_tipo)))
+    por_grupo = np.where(por_rank != 0, por_rank, por_tipo_rank[tipo_grupo])
+    fila = por_grupo[grupos].astype(np.int8)
+    return np.where((sentido != 0) & (fila != 0), fila, sentido).astype(np.int8)
+
+
+def _puestos_por_marca(grupo: np.ndarray, marca: np.ndarray) -> np.ndarray:
+    """Puesto 1..n dentro de cada grupo ordenando por `marca` (mayor = mejor)."""
+    puestos = np.full(len(grupo), np.nan)
+    validas = np.flatnonzero(~np.isnan(marca))
+    if not len(validas):
+        return puestos
+    orden = validas[np.lexsort((-marca[validas], grupo[validas]))]
+    g = grupo[orden]
+    inicio = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    tam = np.diff(np.r_[inicio, len(g)])
+    puestos[orden] = np.arange(len(g)) - np.repeat(inicio, tam) + 1
+    return puestos
+
+
+class TablaMarcas:
+    """Filas de una disciplina con `rank` y `result` ya numéricos."""
+
+    def __init__(self, disciplina: str, nombres: list[str], ids: np.ndarray,
+                 grupos: np.ndarray, puestos: np.ndarray, valores: np.ndarray,
+                 sentido: np.ndarray):
+        self.disciplina = disciplina
+        self.vista   = vista_de_disciplina(disciplina)
+        self.nombres = nombres
+        self.ids     = ids
+        self.grupos  = grupos
+        self.valores = valores
+        self.sentido = sentido
+        # Marca orientada (mayor = mejor) y puesto: el `rank` del CSV si
+        # lo hay y, si no, el que sale de ordenar la prueba por su marca
+        self.marca   = valores * sentido
+        self.puestos = np.where(np.isnan(puestos), _puestos_por_marca(grupos, self.marca), puestos)
+
+    @classmethod
+    def desde_fuente(cls, fuente, disciplina: str) -> "TablaMarcas":
+        filas = list(fuente.filas(disciplina, COLUMNAS_MARCAS))
+        columnas = (np.array([f[i] or "" for f in filas], dtype=str).reshape(-1)
+                    for i in range(len(COLUMNAS_MARCAS)))
+        nombre, prueba, rank, resultado, tipo = columnas
+        nombres, ids = np.unique(nombre, return_inverse=True)
+        # Una prueba es una fase (stage_code) con un mismo tipo de resultado;
+        # los IRM_POINTS (retirados en vela) compiten en la prueba de POINTS
+        tipo_prueba = np.where(tipo == "IRM_POINTS", "POINTS", tipo)
+        _, grupos = np.unique(np.char.add(np.char.add(prueba, "|"), tipo_prueba), return_inverse=True)
+        valores, sentido = convertir_resultados(resultado, tipo)
+        puestos = _decimal(rank)
+        sentido = orientar(grupos, tipo_prueba, puestos, valores, sentido)
+        return cls(disciplina, nombres.tolist(), ids.astype(np.int32), grupos.astype(np.int32),
+                   puestos, valores, sentido)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.ids, self.grupos, self.valores, self.sentido, self.marca, self.puestos)
+        return sum(a.nbytes for a in arrays) + 60 * len(self.nombres)
+
+    def metricas(self) -> dict[str, np.ndarray]:
+        """
+        Por participante (índice de `nombres`):
+        - pruebas: filas con puesto en una prueba de al menos dos
+        - percentil: media de 1 - (puesto-1)/(n-1); 1 = siempre primero
+        - victorias / podios: pruebas terminadas en puesto 1 / <= 3
+        - margen: déficit relativo medio frente al mejor de la prueba (0 = lo ganó)
+        """
+        n_nombres, n_grupos = len(self.nombres), int(self.grupos.max(initial=-1)) + 1
+        con_puesto = ~np.isnan(self.puestos)
+        tam = np.bincount(self.grupos[con_puesto], minlength=n_grupos)[self.grupos]
+        cuenta = con_puesto & (tam > 1)
+        # El rank del CSV puede pasar de n si hubo descalificados sin puesto
+        percentil = np.clip(1 - (self.puestos - 1) / np.maximum(tam - 1, 1), 0, 1)
+
+        mejor = np.full(n_grupos, -np.inf)
+        np.fmax.at(mejor, self.grupos, self.marca)
+        mejor = mejor[self.grupos]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margen = (mejor - self.marca) / np.abs(mejor)
+        con_margen = cuenta & np.isfinite(margen)
+
+        def suma(pesos, filtro):
+            return np.bincount(self.ids[filtro], weights=pesos[filtro], minlength=n_nombres)
+
+        pruebas = np.bincount(self.ids[cuenta], minlength=n_nombres).astype(float)
+        n_margen = np.bincount(self.ids[con_margen], minlength=n_nombres)
+        return {
+            "pruebas": pruebas,
+            "percentil": suma(percentil, cuenta) / np.maximum(pruebas, 1),
+            "victorias": suma((self.puestos == 1).astype(float), cuenta),
+            "podios": suma((self.puestos <= 3).astype(float), cuenta),
+            "margen": np.where(n_margen > 0, suma(margen, con_margen) / np.maximum(n_margen, 1), np.nan),
+        }
+
+
+class MarcasVistas:
+    """`TablaMarcas` por vista, cargadas bajo demanda en una `CacheVistas`."""
+
+    def __init__(self, fuente=None, presupuesto_bytes: int | None = None):
+        self.fuente = fuente or fuente_resultados()
+        self._disciplinas = {vista_de_disciplina(d): d for d in self.fuente.disciplinas()}
+        kwargs = {} if presupuesto_bytes is None else {"presupuesto_bytes": presupuesto_bytes}
+        self.cache = CacheVistas(self._cargar, lambda tabla: tabla.nbytes, **kwargs)
+
+    def _cargar(self, vista: str) -> TablaMarcas:
+        return TablaMarcas.desde_fuente(self.fuente, self._disciplinas[vista])
+
+    def tiene_vista(self, vista: str) -> bool:
+        return vista.lower() in self._disciplinas
+
+    def tabla(self, vista: str) -> TablaMarcas | None:
+        return self.cache.obtener(vista) if self.tiene_vista(vista) else None
+
+    def invalidar(self, vista: str):
+        """El CSV de la vista cambió: se vuelve a leer al pedirla."""
+        self._disciplinas = {vista_de_disciplina(d): d for d in self.fuente.disciplinas()}
+        self.cache.invalidar(vista)
+
+
+_marcas: MarcasVistas | None = None
+_lock_marcas = threading.Lock()
+
+
+def obtener_marcas() -> MarcasVistas:
+    """Instancia compartida del proceso."""
+    global _marcas
+    with _lock_marcas:
+        if _marcas is None:
+            _marcas = MarcasVistas()
+        return _marcas
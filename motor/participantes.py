@@ -0,0 +1,125 @@
+"""
+Índice de valores distintos de participant_name por vista.
+
+Se construye a partir del índice de agregados (columnas participant_name /
+participant_code de results/*.csv) y devuelve la lista completa y ordenada
+de una vez, sin pasar por el LLM ni por el límite de 50 valores. Incluye
+búsqueda por prefijo (de nombre o de cualquier palabra) y difusa, para que
+los selectores sigan siendo ágiles en disciplinas con miles de atletas.
+
+El índice de búsqueda de cada vista se construye la primera vez que se pide
+y vive en una `CacheVistas` (LRU con presupuesto en memoria).
+"""
+import difflib
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from motor.catalogo import CacheVistas
+from motor.estadisticas import vista_de_disciplina
+from motor.indice import IndiceAgregados, obtener_indice
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes: 'Côte d'Ivoire' -> 'cote d'ivoire'."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold().strip()
+
+
+class _VistaParticipantes:
+    """Nombres de una vista + índice ordenado de prefijos de palabras."""
+
+    def __init__(self, nombres: dict[str, set[str]]):
+        self.nombres = sorted(nombres, key=lambda n: (normalizar(n), n))
+        self.codigos = {n: sorted(c) for n, c in nombres.items()}
+        self.normalizados = [normalizar(n) for n in self.nombres]
+        # Cada nombre aparece una vez por palabra y otra por el nombre completo,
+        # así 'bolt' encuentra 'BOLT Usain' y 'usain' también.
+        entradas = set()
+        for i, norm in enumerate(self.normalizados):
+            entradas.add((norm, i))
+            entradas.update((palabra, i) for palabra in norm.split())
+        entradas = sorted(entradas)
+        self.claves = [k for k, _ in entradas]
+        self.ids    = [i for _, i in entradas]
+        self.palabras   = sorted({k for k in self.claves if " " not in k})
+        self.posiciones = {norm: i for i, norm in enumerate(self.normalizados)}
+
+    def peso(self) -> int:
+        """Bytes aproximados: texto de claves y nombres más ~100 B por entrada."""
+        texto = sum(map(len, self.claves)) + 2 * sum(map(len, self.nombres))
+        return texto + 100 * (len(self.claves) + len(self.nombres))
+
+    def por_prefijo(self, prefijo: str, limite: int) -> list[str]:
+        vistos: dict[int, None] = {}
+        pos = bisect_left(self.claves, prefijo)
+        while pos < len(self.claves) and self.claves[pos].startswith(prefijo):
+            vistos[self.ids[pos]] = None
+            pos += 1
+        return [self.nombres[i] for i in sorted(vistos)][:limite]
+
+    def difusa(self, consulta: str, limite: int, corte: float) -> list[str]:
+        candidatos = difflib.get_close_matches(consulta, self.normalizados, n=limite, cutoff=corte)
+        resultado = dict.fromkeys(self.nombres[self.posiciones[c]] for c in candidatos)
+        # Además de la similitud global, cuenta la de cada palabra por separado
+        for palabra in difflib.get_close_matches(consulta, self.palabras, n=limite, cutoff=corte):
+            resultado.update(dict.fromkeys(self.por_prefijo(palabra, limite)))
+        return list(resultado)[:limite]
+
+
+class IndiceParticipantes:
+    """Listas de participantes por vista con búsqueda por prefijo y difusa."""
+
+    def __init__(self, indice: IndiceAgregados, presupuesto_bytes: int | None = None):
+        self.indice = indice
+        self._disciplinas = {vista_de_disciplina(d): i for i, d in enumerate(indice.disciplinas)}
+        kwargs = {} if presupuesto_bytes is None else {"presupuesto_bytes": presupuesto_bytes}
+        self.cache = CacheVistas(self._construir, _VistaParticipantes.peso, **kwargs)
+
+    def _construir(self, vista: str) -> _VistaParticipantes:
+        return _VistaParticipantes(self.indice.codigos_por_nombre(vista))
+
+    def _vista(self, vista: str) -> _VistaParticipantes | None:
+        return self.cache.obtener(vista) if self.tiene_vista(vista) else None
+
+    def tiene_vista(self, vista: str) -> bool:
+        return vista.lower() in self._disciplinas
+
+    def invalidar(self, vista: str):
+        """Tras una actualización del índice: la vista (quizá nueva) se reconstruye al pedirla."""
+        self._disciplinas = {vista_de_disciplina(d): i for i, d in enumerate(self.indice.disciplinas)}
+        self.cache.invalidar(vista)
+
+    def nombres(self, vista: str) -> list[str]:
+        """Todos los participant_name distintos de la vista, ordenados."""
+        v = self._vista(vista)
+        return list(v.nombres) if v else []
+
+    def codigos(self, vista: str, nombre: str) -> list[str]:
+        v = self._vista(vista)
+        return list(v.codigos.get(nombre, [])) if v else []
+
+    def buscar(self, vista: str, consulta: str, limite: int = 200,
+               corte: float = 0.6) -> list[str]:
+        """Coincidencias por prefijo y, si no bastan, por similitud."""
+        v = self._vista(vista)
+        consulta = normalizar(consulta)
+        if not v or not consulta:
+            return self.nombres(vista)[:limite]
+        resultado = dict.fromkeys(v.por_prefijo(consulta, limite))
+        if len(resultado) < limite:
+            resultado.update(dict.fromkeys(v.difusa(consulta, limite - len(resultado), corte)))
+        return list(resultado)[:limite]
+
+
+_indice: IndiceParticipantes | None = None
+_lock_indice = threading.Lock()
+
+
+def obtener_indice_participantes() -> IndiceParticipantes:
+    """Instancia compartida del proceso, construida sobre el índice de agregados."""
+    global _indice
+    with _lock_indice:
+        if _indice is None:
+            _indice = IndiceParticipantes(obtener_indice())
+        return _indice
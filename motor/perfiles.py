@@ -0,0 +1,283 @@
+"""
+Perfiles de inversor: detección por palabras clave y scoring.
+
+Cada perfil define `puntuacion(w, l, t, r)` sobre arrays de NumPy (r es el
+rating Elo precalculado en el índice), de modo que el mismo código puntúa una
+pareja A-vs-B o todos los participantes de una vista en una sola pasada
+vectorizada (modo cartera). `logica` es la versión por parejas que usa la
+comparación clásica.
+
+Para las disciplinas sin W/L/T (atletismo, natación...) cada perfil define
+además `puntuacion_marcas(m)` sobre las métricas de puesto y margen de
+`motor.marcas.TablaMarcas.metricas()`, también vectorizada.
+"""
+import numpy as np
+
+from motor.ratings import ELO_BASE
+
+
+def _por_parejas(puntuacion):
+    """
+    Adapta `puntuacion(w, l, t, r)` vectorizada a la firma
+    (wa, la, ta, wb, lb, tb, ra, rb); sin rating se asume el Elo inicial.
+    """
+    def logica(wa, la, ta, wb, lb, tb, ra=ELO_BASE, rb=ELO_BASE):
+        a, b = puntuacion(np.array([wa, wb], dtype=float),
+                          np.array([la, lb], dtype=float),
+                          np.array([ta, tb], dtype=float),
+                          np.array([ra, rb], dtype=float))
+        return float(a), float(b)
+    return logica
+
+
+# Palabras clave por perfil
+PERFILES = {
+    "riesgo": {
+        "keywords": ["riesgo", "risk", "segur", "conservador", "publicitari",
+                     "brand", "imagen", "reputaci", "asimétric", "protec",
+                     "derrota", "perd", "evit"],
+        "nombre":    "Inversor Conservador — Minimización de Riesgo",
+        "emoji":     "🛡️",
+        "metrica_principal": "tasa_derrota",
+        "descripcion_metrica": "menor tasa de derrotas",
+        "pesos": {"win_rate": 0.3, "loss_rate_inv": 0.5, "volumen": 0.2},
+        # Gana quien tiene MENOS derrotas (invertido: más alto = mejor)
+        "puntuacion": lambda w, l, t, r: 1 - l / np.maximum(t, 1),
+        # Sin W/L: quien queda más cerca del ganador de cada prueba
+        "descripcion_marcas": "menor margen frente al ganador",
+        "puntuacion_marcas": lambda m: 1 - np.clip(np.nan_to_num(m["margen"], nan=1.0), 0, 1),
+        "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
+            f"INVERTIR EN {g.upper()} — PERFIL DE BAJO RIESGO. "
+            f"Con solo una tasa de derrota del {round((1 - rate_g/100)*100, 1):.1f}% "
+            f"frente al {round((1 - rate_p/100)*100, 1):.1f}% de {p}, {g} representa "
+            f"la opción con menor exposición a resultados adversos. "
+            f"Para una inversión publicitaria o de imagen de marca, "
+            f"la probabilidad de asociación con derrotas es {dif:.1f}pp inferior. "
+            f"Riesgo reducido = protección del capital reputacional."
+        ),
+        "analisis_ganador": lambda e, w, l, t, r: (
+            f"Tasa de derrota del {round(l/t*100, 1):.1f}% — el activo más seguro del mercado. "
+            f"Solo {l} derrotas en {t} encuentros. Bajo riesgo de exposición negativa de marca. "
+            f"Perfil ideal para inversores con aversión al riesgo reputacional."
+        ),
+        "analisis_perdedor": lambda e, w, l, t, r: (
+            f"Tasa de derrota del {round(l/t*100, 1):.1f}% — riesgo elevado para patrocinio. "
+            f"{l} derrotas en {t} encuentros conllevan mayor probabilidad de exposición negativa. "
+            f"Requiere prima de riesgo adicional para justificar la inversión."
+        ),
+    },
+    "volumen": {
+        "keywords": ["audiencia", "exposici", "visibilidad", "mercado", "fans",
+                     "seguidor", "volume", "partidos", "presencia", "alcance",
+                     "impacto", "mediatico", "mediatica"],
+        "nombre":    "Inversor de Audiencia — Maximización de Exposición",
+        "emoji":     "📡",
+        "metrica_principal": "partidos_jugados",
+        "descripcion_metrica": "mayor presencia competitiva",
+        "pesos": {"win_rate": 0.3, "volumen": 0.5, "loss_rate_inv": 0.2},
+        # Gana quien juega MÁS partidos (más exposición mediática), relativo
+        # al máximo del conjunto comparado
+        "puntuacion": lambda w, l, t, r: (
+            t / max(t.max(initial=0), 1) * 0.5 + w / np.maximum(t, 1) * 0.5
+        ),
+        "descripcion_marcas": "más pruebas disputadas",
+        "puntuacion_marcas": lambda m: (
+            m["pruebas"] / max(m["pruebas"].max(initial=0), 1) * 0.5 + m["percentil"] * 0.5
+        ),
+        "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
+            f"INVERTIR EN {g.upper()} — MÁXIMA EXPOSICIÓN MEDIÁTICA. "
+            f"Con {total_g} encuentros disputados frente a {total_p} de {p}, "
+            f"{g} ofrece {total_g - total_p} apariciones adicionales en medios. "
+            f"Mayor volumen de partidos = mayor retorno en impresiones publicitarias "
+            f"y cobertura mediática. Retorno por exposición superior en {round(total_g/max(total_p,1)*100-100, 1):.1f}%."
+        ),
+        "analisis_ganador": lambda e, w, l, t, r: (
+            f"Con {t} partidos disputados, ofrece la mayor cobertura mediática disponible. "
+            f"{w} victorias ({r}%) garantizan además un contexto ganador para las marcas patrocinadoras. "
+            f"Activo de alta visibilidad con rendimiento sólido."
+        ),
+        "analisis_perdedor": lambda e, w, l, t, r: (
+            f"Con {t} partidos, la presencia mediática es más limitada que su rival. "
+            f"Menor volumen de apariciones reduce el potencial de retorno en exposición. "
+            f"Válido para presupuestos de menor escala con objetivos locales."
+        ),
+    },
+    "dominancia": {
+        "keywords": ["dominan", "aplast", "superiorid", "top", "mejor",
+                     "elite", "premier", "excelenci", "campe", "champion",
+                     "maximo", "máximo", "potenci"],
+        "nombre":    "Inversor Premium — Activo de Élite",
+        "emoji":     "👑",
+        "metrica_principal": "ratio_wl",
+        "descripcion_metrica": "mayor ratio victorias/derrotas",
+        "pesos": {"win_rate": 0.6, "loss_rate_inv": 0.3, "volumen": 0.1},
+        "puntuacion": lambda w, l, t, r: w / np.maximum(l, 0.5),  # ratio W/L, evita div/0
+        # Pruebas ganadas frente a no ganadas, como el ratio W/L
+        "descripcion_marcas": "mayor ratio de pruebas ganadas",
+        "puntuacion_marcas": lambda m: m["victorias"] / np.maximum(m["pruebas"] - m["victorias"], 0.5),
+        "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
+            f"INVERTIR EN {g.upper()} — ACTIVO DE ÉLITE VERIFICADO. "
+            f"Ratio victorias/derrotas de {round(wins_g/max(total_g-wins_g, 0.5), 2):.2f}x "
+            f"frente a {round(wins_p/max(total_p-wins_p, 0.5), 2):.2f}x de {p}. "
+            f"{g} representa el activo premium: máximo rendimiento, "
+            f"máxima asociación con el éxito deportivo. "
+            f"Para posicionamiento de marca en el segmento élite, es la única opción viable."
+        ),
+        "analisis_ganador": lambda e, w, l, t, r: (
+            f"Ratio W/L de {round(w/max(l, 0.5), 2):.2f}x — rendimiento de élite certificado. "
+            f"{w} victorias vs {l} derrotas: el activo dominante de esta comparativa. "
+            f"Asociación con este competidor proyecta excelencia y liderazgo de marca."
+        ),
+        "analisis_perdedor": lambda e, w, l, t, r: (
+            f"Ratio W/L de {round(w/max(l, 0.5), 2):.2f}x — por debajo del estándar élite. "
+            f"No alcanza el umbral de dominancia necesario para un posicionamiento premium. "
+            f"Apto para estrategias de nicho o mercados secundarios."
+        ),
+    },
+    "fuerza": {
+        "keywords": ["rival", "oponente", "nivel", "calidad", "elo", "rating",
+                     "fuerza", "exigen", "dificil", "difícil", "ajustad"],
+        "nombre":    "Inversor Analítico — Rendimiento Ajustado por Rival",
+        "emoji":     "♟️",
+        "metrica_principal": "rating_elo",
+        "descripcion_metrica": "mayor rating Elo (ajustado por la fuerza de los rivales)",
+        "pesos": {"elo": 0.8, "win_rate": 0.2},
+        # Elo reproducido en orden de fecha: ganar a un rival fuerte suma más
+        "puntuacion": lambda w, l, t, r: r,
+        # Sin enfrentamientos directos no hay Elo: mejor puesto relativo
+        "descripcion_marcas": "mejor puesto relativo medio (sin W/L no hay Elo)",
+        "puntuacion_marcas": lambda m: m["percentil"],
+        "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
+            f"INVERTIR EN {g.upper()} — RENDIMIENTO AJUSTADO POR RIVAL. "
+            f"Rating Elo de {sg:.0f} frente a {sp:.0f} de {p}: "
+            f"{round(100 / (1 + 10 ** ((sp - sg) / 400)), 1):.1f}% de probabilidad esperada "
+            f"de victoria en un enfrentamiento directo. "
+            f"A diferencia del win-rate ({rate_g}% vs {rate_p}%), el Elo pondera cada resultado "
+            f"por el nivel del rival: el retorno no depende de un calendario favorable."
+        ),
+        "analisis_ganador": lambda e, w, l, t, r: (
+            f"{w} victorias en {t} encuentros, ponderadas por el nivel de cada rival. "
+            f"Su rating Elo refleja victorias ante competidores exigentes, no solo volumen. "
+            f"Activo con rendimiento contrastado frente a la élite."
+        ),
+        "analisis_perdedor": lambda e, w, l, t, r: (
+            f"{w} victorias en {t} encuentros, pero frente a rivales de menor nivel o con "
+            f"derrotas ante competidores más débiles. El Elo ajustado lo sitúa por detrás. "
+            f"Su tasa de victoria del {r}% sobrestima su fortaleza real."
+        ),
+    },
+}
+
+# Default: rendimiento general (win rate puro)
+PERFIL_RENDIMIENTO = {
+    "nombre":    "Inversor de Rendimiento — Tasa de Victoria",
+    "emoji":     "📊",
+    "metrica_principal": "tasa_victoria",
+    "descripcion_metrica": "mayor tasa de victorias",
+    "puntuacion": lambda w, l, t, r: w / np.maximum(t, 1),
+    "descripcion_marcas": "mejor puesto relativo medio",
+    "puntuacion_marcas": lambda m: m["percentil"],
+    "template_rec": lambda g, p, sg, sp, dif, wins_g, total_g, rate_g, wins_p, total_p, rate_p, criterio: (
+        f"INVERTIR EN {g.upper()}. "
+        f"Con {wins_g} victorias en {total_g} partidos ({rate_g}% de efectividad), "
+        f"supera a {p} ({rate_p}%) en {dif:.1f} puntos porcentuales. "
+        f"Mayor tasa de victoria = menor riesgo = mayor retorno esperado sobre la inversión."
+    ),
+    "analisis_ganador": lambda e, w, l, t, r: (
+        f"Tasa de victoria del {r}% sobre {t} encuentros — rendimiento superior al rival. "
+        f"Perfil consistente con {w} victorias que justifica la inversión. "
+        f"Activo con retorno esperado positivo según métricas objetivas."
+    ),
+    "analisis_perdedor": lambda e, w, l, t, r: (
+        f"Tasa de victoria del {r}% sobre {t} encuentros — por debajo del competidor. "
+        f"Las {l} derrotas representan mayor volatilidad en el retorno esperado. "
+        f"Se recomienda como activo secundario o complementario en cartera."
+    ),
+}
+
+for _perfil in (*PERFILES.values(), PERFIL_RENDIMIENTO):
+    _perfil["logica"] = _por_parejas(_perfil["puntuacion"])
+
+
+def detectar_perfil(texto: str) -> dict:
+    """
+    Analiza el texto del criterio y devuelve el perfil de inversión
+    con su lógica de scoring y terminología específica.
+    """
+    t = texto.lower()
+
+    # Detectar perfil por keywords
+    perfil_detectado = None
+    max_matches = 0
+    for nombre_perfil, cfg in PERFILES.items():
+        matches = sum(1 for kw in cfg["keywords"] if kw in t)
+        if matches > max_matches:
+            max_matches = matches
+            perfil_detectado = nombre_perfil
+
+    if perfil_detectado is None or max_matches == 0:
+        return PERFIL_RENDIMIENTO
+
+    return PERFILES[perfil_detectado]
+
+
+def clasificar(nombres: list[str], w: np.ndarray, l: np.ndarray, t: np.ndarray,
+               perfil: dict, k: int = 10, min_partidos: int = 1,
+               r: np.ndarray | None = None) -> list[dict]:
+    """
+    Modo cartera: puntúa a todos los candidatos con cada perfil en una pasada
+    vectorizada y devuelve el top-K ordenado según `perfil`. `r` es el Elo de
+    cada candidato (`IndiceAgregados.ratings_vista`).
+    """
+    w, l, t = (np.asarray(x, dtype=float) for x in (w, l, t))
+    r = np.full(len(w), ELO_BASE) if r is None else np.asarray(r, dtype=float)
+    validos = np.flatnonzero(t >= min_partidos)
+    w, l, t, r = w[validos], l[validos], t[validos], r[validos]
+
+    perfiles = {**PERFILES, "rendimiento": PERFIL_RENDIMIENTO}
+    puntuaciones = {clave: cfg["puntuacion"](w, l, t, r) for clave, cfg in perfiles.items()}
+    orden_clave = next(c for c, cfg in perfiles.items() if cfg is perfil)
+
+    # Orden descendente por el perfil elegido; desempate por partidos jugados
+    orden = np.lexsort((-t, -puntuaciones[orden_clave]))[:k]
+    return [
+        {
+            "participante": nombres[validos[i]],
+            "victorias": int(w[i]),
+            "derrotas": int(l[i]),
+            "partidos": int(t[i]),
+            "tasa_victoria": round(float(w[i] / max(t[i], 1)) * 100, 1),
+            "elo": round(float(r[i])),
+            **{f"score_{c}": round(float(p[i]), 3) for c, p in puntuaciones.items()},
+        }
+        for i in orden.tolist()
+    ]
+
+
+def clasificar_marcas(nombres: list[str], metricas: dict[str, np.ndarray], perfil: dict,
+                      k: int = 10, min_pruebas: int = 1) -> list[dict]:
+    """
+    Modo cartera para disciplinas sin W/L/T: como `clasificar`, pero sobre
+    las métricas de puesto y margen de `TablaMarcas.metricas()`.
+    """
+    validos = np.flatnonzero(metricas["pruebas"] >= min_pruebas)
+    m = {c: np.asarray(v, dtype=float)[validos] for c, v in metricas.items()}
+
+    perfiles = {**PERFILES, "rendimiento": PERFIL_RENDIMIENTO}
+    puntuaciones = {clave: cfg["puntuacion_marcas"](m) for clave, cfg in perfiles.items()}
+    orden_clave = next(c for c, cfg in perfiles.items() if cfg is perfil)
+
+    # Orden descendente por el perfil elegido; desempate por pruebas disputadas
+    orden = np.lexsort((-m["pruebas"], -puntuaciones[orden_clave]))[:k]
+    return [
+        {
+            "participante": nombres[validos[i]],
+            "pruebas": int(m["pruebas"][i]),
+            "victorias": int(m["victorias"][i]),
+            "podios": int(m["podios"][i]),
+            "percentil_medio": round(float(m["percentil"][i]) * 100, 1),
+            "margen_medio_%": None if np.isnan(m["margen"][i]) else round(float(m["margen"][i]) * 100, 2),
+            **{f"score_{c}": round(float(p[i]), 3) for c, p in puntuaciones.items()},
+        }
+        for i in orden.tolist()
+    ]
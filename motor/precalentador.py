@@ -0,0 +1,200 @@
+"""
+Precalentado de la caché del SDK para todas las vistas de deporte.
+
+Un hilo de fondo recorre cada `intervalo_s` las vistas admin.<disciplina>
+(una por results/<Disciplina>.csv, más las que se indiquen) y vuelve a
+preguntar al SDK lo que falta en la caché o caduca en menos de `margen_s`.
+Solo se precalienta lo que piden los caminos interactivos:
+
+- el esquema de la vista (`llamada_metadatos`, en cada análisis);
+- las estadísticas de los `stats_por_vista` participantes con más partidos
+  (`llamada_stats`, al contrastar con el SDK);
+- la lista de participantes solo en las vistas que no están en el índice
+  local: para las de results/ la app nunca se la pregunta al SDK.
+
+Junto con stale-while-revalidate en `ClienteSDK`, ninguna petición
+interactiva espera a una caché fría. El hilo es del proceso y pregunta con
+las credenciales configuradas (DENODO_SDK_URL, DENODO_SDK_USUARIO,
+DENODO_SDK_PASSWORD), no con las de cada sesión; se arranca al crearlo si
+DENODO_PRECALENTAR está definida.
+
+    python -m motor.precalentador --una-vez --stats 10
+"""
+import os
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from motor.analisis import pregunta_metadatos, pregunta_participantes, pregunta_stats
+from motor.archivo import fuente_resultados
+from motor.cache import obtener_cache
+from motor.estadisticas import vista_de_disciplina
+from motor.indice import obtener_indice
+from motor.participantes import obtener_indice_participantes
+from motor.sdk import ClienteSDK
+
+INTERVALO_POR_DEFECTO = 300
+# Se refresca lo que caduque antes de esto (la quinta parte del TTL por defecto)
+MARGEN_POR_DEFECTO = 720
+STATS_POR_DEFECTO = int(os.environ.get("DENODO_PRECALENTAR_STATS", "5"))
+
+# Credenciales del precalentador del proceso
+SDK_URL      = os.environ.get("DENODO_SDK_URL", "http://localhost:8008")
+SDK_USUARIO  = os.environ.get("DENODO_SDK_USUARIO", "admin")
+SDK_PASSWORD = os.environ.get("DENODO_SDK_PASSWORD", "admin")
+
+
+def vistas_de_resultados() -> list[str]:
+    return [vista_de_disciplina(d) for d in fuente_resultados().disciplinas()]
+
+
+class Precalentador:
+    """Ciclos periódicos de refresco de la caché del SDK en un hilo daemon."""
+
+    def __init__(self, cliente, vistas: list[str] | None = None,
+                 intervalo_s: float = INTERVALO_POR_DEFECTO, margen_s: float = MARGEN_POR_DEFECTO,
+                 stats_por_vista: int = STATS_POR_DEFECTO, concurrencia: int = 2):
+        if cliente.cache is None:
+            raise ValueError("El precalentador necesita un cliente con caché")
+        self.cliente = cliente
+        self.vistas = vistas or vistas_de_resultados()
+        self.intervalo_s = intervalo_s
+        self.margen_s = margen_s
+        self.stats_por_vista = stats_por_vista
+        self.concurrencia = concurrencia
+        self.ciclos = 0
+        self.refrescadas = 0
+        self.errores = 0
+        self.ultimo_ciclo: float | None = None
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo: threading.Thread | None = None
+
+    def tareas(self, vista: str) -> list[tuple[str, str]]:
+        """(endpoint, pregunta) que se mantienen calientes para la vista."""
+        tareas = [("answerMetadataQuestion", pregunta_metadatos(vista))]
+        if not obtener_indice_participantes().tiene_vista(vista):
+            tareas.append(("answerDataQuestion", pregunta_participantes(vista)))
+        if self.stats_por_vista:
+            nombres, _, _, partidos = obtener_indice().tabla_vista(vista)
+            for i in np.argsort(-partidos, kind="stable")[:self.stats_por_vista]:
+                tareas.append(("answerDataQuestion", pregunta_stats(vista, nombres[i])))
+        return tareas
+
+    def _pendiente(self, endpoint: str, pregunta: str, vista: str) -> bool:
+        restante = self.cliente.cache.restante(endpoint, pregunta, vista,
+                                               ambito=self.cliente.ambito)
+        return restante is None or restante < self.margen_s
+
+    def _refrescar(self, endpoint: str, pregunta: str, vista: str):
+        if self._parar.is_set():
+            return
+        preguntar = (self.cliente.answer_metadata_question if endpoint == "answerMetadataQuestion"
+                     else self.cliente.answer_data_question)
+        try:
+            # usar_cache=False: siempre sale al SDK, y la respuesta se guarda
+            preguntar(pregunta, vista=vista, usar_cache=False)
+            exito = True
+        except Exception:
+            exito = False
+        with self._lock:
+            if exito:
+                self.refrescadas += 1
+            else:
+                self.errores += 1
+
+    def ciclo(self) -> int:
+        """Un recorrido por todas las vistas; devuelve cuántas entradas refrescó."""
+        pendientes = [(e, p, v) for v in self.vistas for e, p in self.tareas(v)
+                      if self._pendiente(e, p, v)]
+        antes = self.refrescadas
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as pool:
+            for endpoint, pregunta, vista in pendientes:
+                pool.submit(self._refrescar, endpoint, pregunta, vista)
+        self.ciclos += 1
+        self.ultimo_ciclo = time.time()
+        return self.refrescadas - antes
+
+    def _bucle(self):
+        while not self._parar.is_set():
+            self.ciclo()
+            self._parar.wait(self.intervalo_s)
+
+    def arrancar(self) -> "Precalentador":
+        if self._hilo is None or not self._hilo.is_alive():
+            self._parar.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="precalentador", daemon=True)
+            self._hilo.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def estadisticas(self) -> dict:
+        return {
+            "activo": self.activo,
+            "vistas": len(self.vistas),
+            "ciclos": self.ciclos,
+            "refrescadas": self.refrescadas,
+            "errores": self.errores,
+            "ultimo_ciclo": time.strftime("%H:%M:%S", time.localtime(self.ultimo_ciclo))
+                            if self.ultimo_ciclo else None,
+        }
+
+
+_precalentador: Precalentador | None = None
+_lock_precalentador = threading.Lock()
+
+
+def obtener_precalentador(**kwargs) -> Precalentador:
+    """
+    El precalentador único del proceso. Tiene su propio cliente con las
+    credenciales configuradas: las que cada sesión escribe en la barra
+    lateral no crean hilos nuevos, y el registro LRU de `obtener_cliente`
+    no puede cerrarle la sesión HTTP. Con DENODO_PRECALENTAR arranca al crearse.
+    """
+    global _precalentador
+    with _lock_precalentador:
+        if _precalentador is None:
+            cliente = ClienteSDK(SDK_URL, SDK_USUARIO, SDK_PASSWORD, cache=obtener_cache())
+            _precalentador = Precalentador(cliente, **kwargs)
+            if os.environ.get("DENODO_PRECALENTAR"):
+                _precalentador.arrancar()
+        return _precalentador
+
+
+if __name__ == "__main__":
+    from bot import BASE_URL, CREDENCIALES
+    from motor.sdk import obtener_cliente
+
+    parser = argparse.ArgumentParser(description="Precalienta la caché del SDK para todas las vistas")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_POR_DEFECTO)
+    parser.add_argument("--margen", type=float, default=MARGEN_POR_DEFECTO)
+    parser.add_argument("--stats", type=int, default=STATS_POR_DEFECTO, metavar="N",
+                        help="Estadísticas de los N participantes con más partidos de cada vista")
+    parser.add_argument("--vista", action="append", default=[],
+                        help="Vista adicional fuera de results/ (repetible)")
+    parser.add_argument("--concurrencia", type=int, default=2)
+    parser.add_argument("--una-vez", action="store_true", help="Un solo ciclo y salir")
+    args = parser.parse_args()
+
+    precalentador = Precalentador(obtener_cliente(args.url, *CREDENCIALES),
+                                  vistas=vistas_de_resultados() + args.vista, intervalo_s=args.intervalo,
+                                  margen_s=args.margen, stats_por_vista=args.stats,
+                                  concurrencia=args.concurrencia)
+    while True:
+        inicio = time.perf_counter()
+        n = precalentador.ciclo()
+        print(f"Ciclo {precalentador.ciclos}: {n} entradas refrescadas en "
+              f"{time.perf_counter() - inicio:.1f}s ({precalentador.errores} errores acumulados)")
+        if args.una_vez:
+            break
+        time.sleep(args.intervalo)
@@ -0,0 +1,144 @@
+"""
+Ratings Elo reproducidos sobre la línea temporal de results/.
+
+Cada partido W/L/T (dos filas con el mismo stage_code y event_code) se aplica
+en orden de `date` sobre las filas del índice de agregados: el ganador se
+lleva K·(1 - esperado) puntos del perdedor, así que vencer a un rival fuerte
+vale más que ganar a uno débil. Cada actualización queda en un historial
+append-only (fila, fecha, rating tras el partido), de modo que el rating de
+cualquier participante se puede consultar en cualquier instante, y los
+partidos nuevos se aplican sobre el estado actual sin repetir los anteriores.
+Si se corrige o elimina un partido ya aplicado, `Elo.rehacer` reproduce
+solo los participantes que juegan entre sí (una vista).
+
+El historial y los ratings se guardan junto con el índice (`motor.indice`),
+así que en una petición no se calcula nada.
+"""
+import numpy as np
+
+ELO_BASE = 1500.0
+K_ELO = 32.0
+
+# Puntuación de la primera fila de la pareja según su result_WLT
+PUNTOS_WLT = {"W": 1.0, "L": 0.0, "T": 0.5}
+
+
+def emparejar(filas) -> list[tuple]:
+    """
+    Partidos a partir de filas (clave_partido, participante, result_WLT, fecha):
+    las claves con exactamente dos filas W/L/T de participantes distintos.
+    Devuelve (clave_partido, participante_a, participante_b, puntos_a, fecha)
+    en el orden de las filas.
+    """
+    grupos: dict = {}
+    for clave, participante, resultado, fecha in filas:
+        if resultado in PUNTOS_WLT:
+            grupos.setdefault(clave, []).append((participante, resultado, fecha))
+    partidos = []
+    for clave, pareja in grupos.items():
+        if len(pareja) == 2 and pareja[0][0] != pareja[1][0]:
+            (a, resultado, fecha_a), (b, _, fecha_b) = pareja
+            partidos.append((clave, a, b, PUNTOS_WLT[resultado], max(fecha_a, fecha_b)))
+    return partidos
+
+
+class Elo:
+    """Ratings por fila del índice y su historial en el tiempo."""
+
+    def __init__(self, n: int, ratings: np.ndarray | None = None,
+                 filas: np.ndarray | None = None, fechas: np.ndarray | None = None,
+                 valores: np.ndarray | None = None, k: float = K_ELO):
+        self.k = k
+        self.ratings = np.full(n, ELO_BASE) if ratings is None else np.asarray(ratings, dtype=float)
+        # Historial ordenado por fecha: la fila `filas[i]` pasó a `valores[i]` en `fechas[i]`
+        self.filas   = np.empty(0, dtype=np.int32) if filas is None else filas
+        self.fechas  = np.empty(0, dtype=np.int64) if fechas is None else fechas
+        self.valores = np.empty(0, dtype=np.float32) if valores is None else valores
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    @property
+    def ultima_fecha(self) -> int:
+        return int(self.fechas[-1]) if len(self.fechas) else -1
+
+    def ampliar(self, n: int):
+        """Filas nuevas del índice (participantes que aún no habían jugado)."""
+        if n > len(self.ratings):
+            self.ratings = np.r_[self.ratings, np.full(n - len(self.ratings), ELO_BASE)]
+
+    def aplicar(self, a, b, puntos_a, fechas) -> int:
+        """
+        Aplica partidos (fila a, fila b, puntos de a: 1/0.5/0, fecha epoch)
+        sobre los ratings actuales, en orden de fecha. Un partido anterior al
+        último aplicado cuenta desde ahora: el historial no se reescribe.
+        """
+        a, b = np.asarray(a, dtype=np.int32), np.asarray(b, dtype=np.int32)
+        if not len(a):
+            return 0
+        self.ampliar(int(max(a.max(), b.max())) + 1)
+        fechas = np.maximum(np.asarray(fechas, dtype=np.int64), self.ultima_fecha)
+        filas, fechas, valores = self._jugar(a, b, puntos_a, fechas)
+        self.filas = np.r_[self.filas, filas].astype(np.int32)
+        self.fechas = np.r_[self.fechas, fechas]
+        self.valores = np.r_[self.valores, valores]
+        return len(a)
+
+    def rehacer(self, filas, a, b, puntos_a, fechas) -> int:
+        """
+        Reproduce desde ELO_BASE el rating de `filas` con todos sus partidos
+        (`a` y `b` deben estar en `filas`), con sus fechas reales: deshace un
+        resultado corregido o un partido eliminado. El historial del resto
+        de filas no cambia; devuelve cuántos partidos se aplicaron.
+        """
+        filas = np.asarray(filas, dtype=np.int64)
+        a, b = np.asarray(a, dtype=np.int32), np.asarray(b, dtype=np.int32)
+        self.ampliar(int(max(filas.max(initial=-1), a.max(initial=-1), b.max(initial=-1))) + 1)
+        resto = ~np.isin(self.filas, filas)
+        self.ratings = self.ratings.copy()
+        self.ratings[filas] = ELO_BASE
+        nuevas, fechas, valores = self._jugar(a, b, puntos_a, np.asarray(fechas, dtype=np.int64))
+        # Se intercala con el resto manteniendo el historial ordenado por fecha
+        todas = np.r_[self.fechas[resto], fechas]
+        orden = np.argsort(todas, kind="stable")
+        self.filas = np.r_[self.filas[resto], nuevas].astype(np.int32)[orden]
+        self.fechas = todas[orden]
+        self.valores = np.r_[self.valores[resto], valores][orden]
+        return len(a)
+
+    def _jugar(self, a, b, puntos_a, fechas) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aplica los partidos en orden de fecha; devuelve sus entradas de historial."""
+        orden = np.argsort(fechas, kind="stable")
+        a, b, fechas = a[orden], b[orden], fechas[orden]
+        puntos_a = np.asarray(puntos_a, dtype=float)[orden]
+
+        # Cada partido depende del anterior: bucle secuencial sobre listas
+        r = self.ratings.tolist()
+        nuevos = []
+        for ia, ib, s in zip(a.tolist(), b.tolist(), puntos_a.tolist()):
+            esperado = 1 / (1 + 10 ** ((r[ib] - r[ia]) / 400))
+            delta = self.k * (s - esperado)
+            r[ia] += delta
+            r[ib] -= delta
+            nuevos.append((r[ia], r[ib]))
+        self.ratings = np.asarray(r)
+        return (np.column_stack([a, b]).ravel(), np.repeat(fechas, 2),
+                np.asarray(nuevos, dtype=np.float32).ravel())
+
+    def en_fecha(self, fecha: int | None = None, filas=None) -> np.ndarray:
+        """Rating de cada fila (o de `filas`) tras los partidos con fecha <= `fecha`."""
+        corte = len(self.fechas) if fecha is None else int(np.searchsorted(self.fechas, fecha, side="right"))
+        if corte == len(self.fechas):
+            r = self.ratings
+        elif corte == 0:
+            r = np.full(len(self.ratings), ELO_BASE)
+        else:
+            ultimo = np.full(len(self.ratings), -1, dtype=np.int64)
+            np.maximum.at(ultimo, self.filas[:corte], np.arange(corte))
+            r = np.where(ultimo >= 0, self.valores[np.maximum(ultimo, 0)], ELO_BASE)
+        return r if filas is None else r[np.asarray(filas, dtype=np.int64)]
+
+    def trayectoria(self, fila: int) -> tuple[np.ndarray, np.ndarray]:
+        """(fechas, ratings) de una fila, partido a partido."""
+        posiciones = np.flatnonzero(self.filas == fila)
+        return self.fechas[posiciones], self.valores[posiciones].astype(float)
@@ -0,0 +1,298 @@
+"""
+Refresco incremental cuando cambian los datos de origen.
+
+Un hilo de fondo (`Vigilante`) mira cada `intervalo_s` la huella rápida de
+cada results/<Disciplina>.csv (mtime y tamaño; CRC en archive.zip). Si
+cambia, relee solo ese fichero y lo compara con la foto anterior por
+(stage_code, participant_code): filas nuevas, modificadas y eliminadas. Con
+esas diferencias se actualiza únicamente lo que depende de ellas:
+
+- índice de agregados: se recalculan los participantes afectados
+  (`IndiceAgregados.actualizar`) y los partidos nuevos se aplican al Elo sin
+  reproducir los anteriores; si cambió o desapareció un partido ya aplicado,
+  se reproduce el Elo de esa vista. El .npz se reescribe con la huella nueva.
+- conjunto internado: si está cargado, se sustituyen las filas de esa
+  disciplina.
+- cachés por vista (participantes, marcas, grafo de enfrentamientos, vistas
+  SQLite) y respuestas del SDK de esa vista: se invalidan y se reconstruyen
+  al pedirlas.
+
+Con un conector VDP también se vigilan las vistas de Denodo: cada ciclo se
+pide `consulta_firma` (filas y fecha más reciente) y, si cambia, se
+invalidan las respuestas del SDK de la vista. La app se lo pasa con
+`configurar_origen` cuando la barra lateral tiene un canal VDP.
+
+El índice y el conjunto internado se actualizan desde este hilo mientras las
+sesiones los consultan; cada uno publica sus cambios de forma atómica (ver
+`IndiceAgregados` y `ConjuntoParis.reemplazar_disciplina`).
+
+    python -m motor.refresco --intervalo 5
+"""
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from motor.archivo import fuente_resultados
+from motor.cache import obtener_cache
+from motor.conectores import invalidar_vista
+from motor.consultas import consulta_firma
+from motor.enfrentamientos import obtener_grafos
+from motor.estadisticas import vista_de_disciplina
+from motor.indice import COLUMNAS_ORIGEN, epoch, obtener_indice
+from motor.internado import (COLUMNAS_RESULTADOS, NUMERICAS_RESULTADOS, conjunto_cargado,
+                             obtener_conjunto)
+from motor.marcas import obtener_marcas
+from motor.participantes import obtener_indice_participantes
+from motor.ratings import emparejar
+
+INTERVALO_POR_DEFECTO = 10
+
+# Una lectura por fichero sirve al índice y al conjunto internado
+COLUMNAS_LECTURA = list(dict.fromkeys(COLUMNAS_ORIGEN + COLUMNAS_RESULTADOS + NUMERICAS_RESULTADOS))
+_POS = {c: i for i, c in enumerate(COLUMNAS_LECTURA)}
+_ORIGEN = [_POS[c] for c in COLUMNAS_ORIGEN]
+_RESULTADOS = [_POS[c] for c in COLUMNAS_RESULTADOS + NUMERICAS_RESULTADOS]
+
+
+@dataclass
+class Foto:
+    """Estado de un fichero la última vez que se leyó."""
+    rapida: list
+    # (stage_code, participant_code) -> (gender, hash de la fila)
+    filas: dict[tuple[str, str], tuple[str, int]] = field(default_factory=dict)
+    # (stage_code, event_code) -> (a, b, puntos de a, fecha) de los partidos ya aplicados al Elo
+    partidos: dict[tuple[str, str], tuple] = field(default_factory=dict)
+
+
+@dataclass
+class Cambio:
+    disciplina: str
+    nuevas: int
+    modificadas: int
+    eliminadas: int
+    participantes: int
+    partidos_elo: int
+    ms: float
+
+
+def _proyectar(filas: list[tuple], posiciones: list[int]) -> list[tuple]:
+    return [tuple(fila[i] for i in posiciones) for fila in filas]
+
+
+def _foto(rapida: list, filas: list[tuple], vista: str) -> Foto:
+    """Foto de `filas`, con los partidos W/L/T que contienen (claves del índice)."""
+    fase, codigo, genero = _POS["stage_code"], _POS["participant_code"], _POS["gender"]
+    foto = Foto(rapida, {(f[fase] or "", f[codigo] or ""): (f[genero] or "", hash(f)) for f in filas})
+    jugadas = [((f[fase] or "", f[_POS["event_code"]] or ""),
+                (vista, f[genero] or "", f[codigo] or ""),
+                f[_POS["result_WLT"]], epoch(f[_POS["date"]] or "")) for f in filas]
+    foto.partidos = {clave: tuple(partido) for clave, *partido in emparejar(jugadas)}
+    return foto
+
+
+class Vigilante:
+    """Ciclos periódicos de detección de cambios en un hilo daemon."""
+
+    def __init__(self, fuente=None, intervalo_s: float = INTERVALO_POR_DEFECTO,
+                 conector=None, vistas_origen: list[str] | None = None):
+        self.fuente = fuente or fuente_resultados()
+        self.intervalo_s = intervalo_s
+        self.conector = conector
+        self.vistas_origen = vistas_origen or []
+        self.ciclos = 0
+        self.errores = 0
+        self.cambios: list[Cambio] = []
+        self.vistas_invalidadas = 0
+        self.ultimo_ciclo: float | None = None
+        self._fotos: dict[str, Foto] = {}
+        self._firmas: dict[str, tuple] = {}
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo: threading.Thread | None = None
+
+    def _leer(self, disciplina: str) -> list[tuple]:
+        return list(self.fuente.filas(disciplina, COLUMNAS_LECTURA))
+
+    def fotografiar(self):
+        """Foto de partida de todos los ficheros (sin tocar índices ni cachés)."""
+        for disciplina in self.fuente.disciplinas():
+            rapida = self.fuente.huella_rapida(disciplina)
+            self._fotos[disciplina] = _foto(rapida, self._leer(disciplina),
+                                            vista_de_disciplina(disciplina))
+
+    # ── results/ ──────────────────────────────────────────
+    def refrescar(self, disciplina: str) -> Cambio | None:
+        """Aplica los cambios de un fichero; None si su contenido no cambió."""
+        inicio = time.perf_counter()
+        vista = vista_de_disciplina(disciplina)
+        rapida = self.fuente.huella_rapida(disciplina)
+        filas = self._leer(disciplina)
+        anterior = self._fotos.get(disciplina, Foto(rapida))
+        foto = _foto(rapida, filas, vista)
+
+        antes, ahora = anterior.filas, foto.filas
+        nuevas = ahora.keys() - antes.keys()
+        eliminadas = antes.keys() - ahora.keys()
+        modificadas = {k for k in ahora.keys() & antes.keys() if ahora[k][1] != antes[k][1]}
+        if not (nuevas or eliminadas or modificadas):
+            self._fotos[disciplina] = foto
+            return None
+        # Un participante puede cambiar de género en una corrección: cuentan los dos
+        afectados = {(ahora[k][0], k[1]) for k in nuevas | modificadas}
+        afectados |= {(antes[k][0], k[1]) for k in eliminadas | modificadas}
+
+        huella = {"rapida": rapida, "contenido": self.fuente.huella_contenido(disciplina)}
+        indice = obtener_indice()
+        n_participantes = indice.actualizar(disciplina, _proyectar(filas, _ORIGEN), afectados, huella)
+        # El historial Elo es append-only: solo entran los partidos que no
+        # estaban, salvo que uno ya aplicado haya cambiado o desaparecido
+        if any(foto.partidos.get(clave) != partido for clave, partido in anterior.partidos.items()):
+            n_partidos = indice.rehacer_elo(vista, foto.partidos.values())
+        else:
+            n_partidos = indice.registrar_partidos(
+                [partido for clave, partido in foto.partidos.items()
+                 if clave not in anterior.partidos])
+        indice.guardar()
+        if conjunto_cargado():
+            obtener_conjunto().reemplazar_disciplina(disciplina, _proyectar(filas, _RESULTADOS), huella)
+
+        self._invalidar(vista)
+        self._fotos[disciplina] = foto
+        cambio = Cambio(disciplina, len(nuevas), len(modificadas), len(eliminadas),
+                        n_participantes, n_partidos, round((time.perf_counter() - inicio) * 1000, 1))
+        with self._lock:
+            self.cambios.append(cambio)
+        return cambio
+
+    def _invalidar(self, vista: str):
+        obtener_indice_participantes().invalidar(vista)
+        obtener_marcas().invalidar(vista)
+        obtener_grafos().invalidar(vista)
+        invalidar_vista(vista)
+        obtener_cache().invalidar(vista)
+
+    # ── vistas de origen ──────────────────────────────────
+    def configurar_origen(self, conector, vistas_origen: list[str]):
+        """Cambia el conector VDP y las vistas vigiladas; las firmas de otro conector no valen."""
+        with self._lock:
+            if conector is not self.conector:
+                self._firmas = {}
+            self.conector, self.vistas_origen = conector, list(vistas_origen)
+
+    def _vigilar_origen(self):
+        with self._lock:
+            conector, vistas = self.conector, list(self.vistas_origen)
+        if conector is None:
+            return
+        for vista in vistas:
+            consulta = consulta_firma(vista, conector.dialecto)
+            firma = tuple(conector.ejecutar(consulta.sql, consulta.parametros, vista=vista).filas[0])
+            if vista in self._firmas and self._firmas[vista] != firma:
+                obtener_cache().invalidar(vista)
+                with self._lock:
+                    self.vistas_invalidadas += 1
+            self._firmas[vista] = firma
+
+    def ciclo(self) -> list[Cambio]:
+        """Un recorrido por results/ (y las vistas de origen); devuelve los cambios aplicados."""
+        if not self._fotos:
+            self.fotografiar()
+        cambios = []
+        for disciplina in self.fuente.disciplinas():
+            foto = self._fotos.get(disciplina)
+            try:
+                if foto is None or self.fuente.huella_rapida(disciplina) != foto.rapida:
+                    cambio = self.refrescar(disciplina)
+                    if cambio:
+                        cambios.append(cambio)
+            except Exception:
+                # Fichero a medio escribir: la foto no cambia y se reintenta
+                self.errores += 1
+        if self.conector is not None:
+            try:
+                self._vigilar_origen()
+            except Exception:
+                self.errores += 1
+        self.ciclos += 1
+        self.ultimo_ciclo = time.time()
+        return cambios
+
+    def _bucle(self):
+        while not self._parar.is_set():
+            self.ciclo()
+            self._parar.wait(self.intervalo_s)
+
+    def arrancar(self) -> "Vigilante":
+        if self._hilo is None or not self._hilo.is_alive():
+            self._parar.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="vigilante", daemon=True)
+            self._hilo.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            cambios = list(self.cambios)
+        ultimo = cambios[-1] if cambios else None
+        return {
+            "activo": self.activo,
+            "ficheros": len(self._fotos),
+            "ciclos": self.ciclos,
+            "cambios": len(cambios),
+            "filas_nuevas": sum(c.nuevas for c in cambios),
+            "filas_modificadas": sum(c.modificadas for c in cambios),
+            "filas_eliminadas": sum(c.eliminadas for c in cambios),
+            "participantes_actualizados": sum(c.participantes for c in cambios),
+            "partidos_elo": sum(c.partidos_elo for c in cambios),
+            "vistas_origen_invalidadas": self.vistas_invalidadas,
+            "errores": self.errores,
+            "ultimo_cambio": f"{ultimo.disciplina} ({ultimo.ms} ms)" if ultimo else None,
+            "ultimo_ciclo": time.strftime("%H:%M:%S", time.localtime(self.ultimo_ciclo))
+                            if self.ultimo_ciclo else None,
+        }
+
+
+_vigilante: Vigilante | None = None
+_lock_vigilante = threading.Lock()
+
+
+def obtener_vigilante(**kwargs) -> Vigilante:
+    """
+    Instancia compartida del proceso (no se duplica en cada rerun de
+    Streamlit). Con DENODO_REFRESCO arranca al crearse, una vez por proceso.
+    """
+    global _vigilante
+    with _lock_vigilante:
+        if _vigilante is None:
+            _vigilante = Vigilante(**kwargs)
+            if os.environ.get("DENODO_REFRESCO"):
+                _vigilante.arrancar()
+        return _vigilante
+
+
+if __name__ == "__main__":
+    from motor.conectores import obtener_conector
+
+    parser = argparse.ArgumentParser(description="Aplica de forma incremental los cambios de results/")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_POR_DEFECTO)
+    parser.add_argument("--vdp", nargs="*", metavar="VISTA", default=None,
+                        help="Vigilar también estas vistas de Denodo (canal VDP)")
+    args = parser.parse_args()
+
+    conector = obtener_conector("vdp") if args.vdp else None
+    vigilante = Vigilante(intervalo_s=args.intervalo, conector=conector, vistas_origen=args.vdp)
+    vigilante.fotografiar()
+    print(f"Vigilando {vigilante.estadisticas()['ficheros']} ficheros cada {args.intervalo:g}s")
+    while True:
+        time.sleep(args.intervalo)
+        for c in vigilante.ciclo():
+            print(f"{c.disciplina}: +{c.nuevas} ~{c.modificadas} -{c.eliminadas} filas, "
+                  f"{c.participantes} participantes, {c.partidos_elo} partidos Elo ({c.ms} ms)")
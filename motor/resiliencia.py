@@ -0,0 +1,200 @@
+"""
+Reintentos con backoff, peticiones de cobertura (hedging) y cortacircuitos
+para las llamadas al Denodo AI SDK.
+
+- Los 5xx, 429, timeouts y errores de conexión se reintentan con espera
+  exponencial con jitter, sin pasarse nunca del plazo total de la llamada.
+- Si una petición tarda más que el percentil `percentil_cobertura` de las
+  latencias recientes de su endpoint, se lanza un duplicado y gana la
+  primera respuesta: la cola de latencia queda acotada por el LLM más rápido.
+- Tras `umbral_fallos` fallos seguidos el circuito se abre y las llamadas
+  fallan al instante con `CircuitoAbierto` durante `enfriamiento_s`, para
+  que el llamador use los datos locales en vez de esperar al plazo.
+
+`Intentos` y `LatenciasRecientes.umbral_cobertura` toman esas decisiones sin
+hacer E/S, así que el cliente síncrono (`motor.sdk`) y el asíncrono
+(`motor.sdk_async`) solo ejecutan la petición y la espera que se les indica.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import requests
+
+
+class CircuitoAbierto(Exception):
+    """El SDK se considera caído: la llamada no se ha enviado."""
+
+
+def _status_http(error: BaseException) -> int | None:
+    """Código de la respuesta del SDK que causó `error` (requests o httpx); None si no la hubo."""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def es_reintentable(error: BaseException) -> bool:
+    """Timeouts, errores de conexión, 429 y 5xx; nunca otros 4xx."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    # httpx (cliente asíncrono) sin importarlo aquí
+    status = _status_http(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in {"TimeoutException", "ConnectTimeout", "ReadTimeout",
+                                    "WriteTimeout", "PoolTimeout", "ConnectError",
+                                    "ReadError", "RemoteProtocolError"}
+
+
+@dataclass
+class PoliticaReintentos:
+    max_intentos: int = int(os.environ.get("DENODO_SDK_REINTENTOS", "3"))
+    espera_base_s: float = 0.5
+    factor: float = 2.0
+    espera_max_s: float = 8.0
+
+    def espera(self, intento: int) -> float:
+        """Espera antes del reintento número `intento` (1, 2, ...): full jitter."""
+        tope = min(self.espera_max_s, self.espera_base_s * self.factor ** (intento - 1))
+        return random.uniform(0, tope)
+
+
+# Una respuesta en streaming ya entregada a medias no se puede repetir
+SIN_REINTENTOS = PoliticaReintentos(max_intentos=1)
+
+
+class LatenciasRecientes:
+    """Ventana de latencias correctas por endpoint para decidir cuándo cubrir."""
+
+    def __init__(self, ventana: int = 200, minimo_muestras: int = 20):
+        self.minimo_muestras = minimo_muestras
+        self._ventanas: dict[str, deque] = {}
+        self._ventana = ventana
+        self._lock = threading.Lock()
+
+    def anotar(self, endpoint: str, segundos: float):
+        with self._lock:
+            self._ventanas.setdefault(endpoint, deque(maxlen=self._ventana)).append(segundos)
+
+    def percentil(self, endpoint: str, p: float) -> float | None:
+        """Percentil `p` de la ventana; None hasta tener `minimo_muestras`."""
+        with self._lock:
+            muestras = list(self._ventanas.get(endpoint, ()))
+        if len(muestras) < self.minimo_muestras:
+            return None
+        return float(np.percentile(muestras, p))
+
+    def umbral_cobertura(self, endpoint: str, p: float, timeout: float) -> float | None:
+        """Segundos tras los que lanzar el duplicado; None si no se cubre (p = 0 o sin margen)."""
+        umbral = self.percentil(endpoint, p) if p else None
+        return umbral if umbral is not None and umbral < timeout else None
+
+
+class Cortacircuitos:
+    """cerrado → abierto tras N fallos seguidos → semiabierto (una sonda) → cerrado."""
+
+    CERRADO, ABIERTO, SEMIABIERTO = "cerrado", "abierto", "semiabierto"
+
+    def __init__(self, umbral_fallos: int = int(os.environ.get("DENODO_CIRCUITO_FALLOS", "5")),
+                 enfriamiento_s: float = float(os.environ.get("DENODO_CIRCUITO_ENFRIAMIENTO", "30"))):
+        self.umbral_fallos  = umbral_fallos
+        self.enfriamiento_s = enfriamiento_s
+        self._estado = self.CERRADO
+        self._fallos = 0
+        self._abierto_desde = 0.0
+        self._sonda_desde = None    # inicio de la sonda en vuelo (semiabierto)
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._estado == self.ABIERTO and self._enfriado():
+                return self.SEMIABIERTO
+            return self._estado
+
+    def _enfriado(self) -> bool:
+        return time.monotonic() - self._abierto_desde >= self.enfriamiento_s
+
+    def permitir(self):
+        """Lanza `CircuitoAbierto` si la llamada no debe salir."""
+        with self._lock:
+            if self._estado == self.CERRADO:
+                return
+            if self._estado == self.ABIERTO and self._enfriado():
+                self._estado = self.SEMIABIERTO
+            # Una sola sonda a la vez; si se perdió (cancelada), otra tras el enfriamiento
+            if self._estado == self.SEMIABIERTO and (
+                    self._sonda_desde is None
+                    or time.monotonic() - self._sonda_desde >= self.enfriamiento_s):
+                self._sonda_desde = time.monotonic()
+                return
+            restante = max(0.0, self.enfriamiento_s - (time.monotonic() - self._abierto_desde))
+            raise CircuitoAbierto(f"SDK no disponible: circuito abierto (reintento en {restante:.0f}s)")
+
+    def exito(self):
+        with self._lock:
+            self._estado = self.CERRADO
+            self._fallos = 0
+            self._sonda_desde = None
+
+    def fallo(self):
+        with self._lock:
+            self._fallos += 1
+            self._sonda_desde = None
+            if self._estado == self.SEMIABIERTO or self._fallos >= self.umbral_fallos:
+                self._estado = self.ABIERTO
+                self._abierto_desde = time.monotonic()
+
+    def reiniciar(self):
+        self.exito()
+
+
+def respuesta_definitiva(status_code: int) -> bool:
+    """Una respuesta de la carrera de cobertura que ya no merece esperar a la otra."""
+    return status_code < 500
+
+
+class Intentos:
+    """
+    Reintentos de una llamada dentro de su plazo total y su efecto en el
+    cortacircuitos. Crearla ya consulta el circuito (`CircuitoAbierto`).
+    """
+
+    def __init__(self, politica: PoliticaReintentos, cortacircuitos: Cortacircuitos,
+                 timeout: float):
+        cortacircuitos.permitir()
+        self.politica = politica
+        self.cortacircuitos = cortacircuitos
+        self.plazo = time.monotonic() + timeout
+        self.numero = 0
+
+    def restante(self) -> float:
+        """Timeout del siguiente intento: lo que queda del plazo total."""
+        return max(self.plazo - time.monotonic(), 0.1)
+
+    def tras_fallo(self, error: BaseException) -> float | None:
+        """
+        Segundos a esperar antes de reintentar, o None si hay que propagar
+        `error` (no reintentable, intentos agotados o sin plazo para otro).
+        """
+        if not es_reintentable(error):
+            # Un 4xx es una respuesta del SDK: está vivo. Los demás errores
+            # (plazo propio agotado, pool cerrado, JSON inválido...) no dicen
+            # nada de él y el circuito no se toca
+            status = _status_http(error)
+            if status is not None and 400 <= status < 500:
+                self.cortacircuitos.exito()
+            return None
+        self.numero += 1
+        espera = self.politica.espera(self.numero)
+        if self.numero >= self.politica.max_intentos or time.monotonic() + espera >= self.plazo:
+            self.cortacircuitos.fallo()
+            return None
+        return espera
+
+    def exito(self):
+        self.cortacircuitos.exito()
@@ -0,0 +1,436 @@
+"""
+Cliente HTTP compartido para el Denodo AI SDK.
+
+Mantiene una única `requests.Session` keep-alive por (URL, usuario), con un
+pool de conexiones configurable y timeouts por endpoint, de modo que el CLI
+y todas las sesiones de Streamlit reutilizan las mismas conexiones TCP.
+Las respuestas se guardan en la caché persistente de `motor.cache` y cada
+llamada deja un span en `motor.trazas` (duración, bytes, código HTTP, caché).
+Los reintentos, el hedging y el cortacircuitos vienen de `motor.resiliencia`.
+
+`stream_question` consume el endpoint SSE del SDK (streamAnswerQuestion) y
+entrega la respuesta por fragmentos según llegan, para pintarla antes de que
+el LLM termine; cancelar o abandonar el iterador cierra la conexión.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from motor.cache import CacheRespuestas, ambito_de, clave_cache, obtener_cache
+from motor.coalescencia import VueloUnico
+from motor.resiliencia import (SIN_REINTENTOS, Cortacircuitos, Intentos, LatenciasRecientes,
+                               PoliticaReintentos, respuesta_definitiva)
+from motor.trazas import Trazador, obtener_trazador
+
+# Timeouts (segundos) por endpoint del SDK
+TIMEOUTS_POR_DEFECTO = {
+    "answerMetadataQuestion": 30,
+    "answerDataQuestion":     90,
+    "docs":                   4,
+}
+
+TAMANO_POOL_POR_DEFECTO = int(os.environ.get("DENODO_SDK_POOL", "10"))
+# Clientes compartidos vivos a la vez (uno por credenciales); el menos usado se cierra
+MAX_CLIENTES = int(os.environ.get("DENODO_SDK_CLIENTES", "8"))
+
+# Endpoint SSE con la respuesta token a token (GET ?question=&mode=data|metadata)
+ENDPOINT_STREAMING = os.environ.get("DENODO_SDK_STREAMING", "streamAnswerQuestion")
+ENDPOINT_DE_MODO   = {"data": "answerDataQuestion", "metadata": "answerMetadataQuestion"}
+
+# Percentil de latencia a partir del cual se lanza una petición duplicada (0 = sin hedging)
+PERCENTIL_COBERTURA = float(os.environ.get("DENODO_SDK_COBERTURA", "95"))
+
+
+@dataclass
+class RespuestaSDK:
+    """Respuesta tipada de /answerMetadataQuestion y /answerDataQuestion."""
+    answer: str
+    sql_query: str | None = None
+    tables_used: list[str] = field(default_factory=list)
+    raw: dict = field(default_factory=dict)
+    desde_cache: bool = False
+
+    @classmethod
+    def desde_json(cls, datos: dict, desde_cache: bool = False) -> "RespuestaSDK":
+        return cls(
+            answer=datos.get("answer", "") or "",
+            sql_query=datos.get("sql_query"),
+            tables_used=list(datos.get("tables_used") or []),
+            raw=datos,
+            desde_cache=desde_cache,
+        )
+
+
+def leer_sse(lineas) -> Iterator[tuple[str, object]]:
+    """
+    (evento, datos) de un flujo text/event-stream. `datos` es el JSON del
+    evento si lo es y, si no, el texto tal cual; "[DONE]" termina el flujo.
+    """
+    evento, datos = "message", []
+    for linea in lineas:
+        if isinstance(linea, bytes):
+            linea = linea.decode("utf-8")
+        if not linea:
+            if datos:
+                texto = "\n".join(datos)
+                if texto.strip() == "[DONE]":
+                    return
+                try:
+                    yield evento, json.loads(texto)
+                except json.JSONDecodeError:
+                    yield evento, texto
+            evento, datos = "message", []
+            continue
+        campo, _, valor = linea.partition(":")
+        valor = valor[1:] if valor.startswith(" ") else valor
+        if campo == "event":
+            evento = valor
+        elif campo == "data":
+            datos.append(valor)
+    if datos and "\n".join(datos).strip() != "[DONE]":
+        yield evento, "\n".join(datos)
+
+
+class RespuestaStreaming:
+    """
+    Respuesta del SDK que se itera por fragmentos de texto según llegan.
+    Al agotarla, `respuesta` tiene la `RespuestaSDK` completa (y se guarda en
+    caché); `cancelar()`, desde cualquier hilo, o cerrar el iterador cortan la
+    conexión y la respuesta parcial no se cachea.
+    """
+
+    def __init__(self):
+        self.respuesta: RespuestaSDK | None = None
+        self.texto = ""
+        self.cancelada = False
+        self.primer_fragmento_s: float | None = None
+        self._http: requests.Response | None = None
+        self._fragmentos: Iterator[str] | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        return self._fragmentos
+
+    def cancelar(self):
+        self.cancelada = True
+        if self._http is not None:
+            self._http.close()
+
+    def cerrar(self):
+        """Cancela si no ha terminado (p. ej. el usuario abandonó la página)."""
+        if self.respuesta is None:
+            self.cancelar()
+        self._fragmentos.close()
+
+
+class ClienteSDK:
+    """Cliente reutilizable con sesión persistente y pool de conexiones."""
+
+    def __init__(self, base_url: str, usuario: str, password: str,
+                 tamano_pool: int = TAMANO_POOL_POR_DEFECTO,
+                 timeouts: dict | None = None,
+                 cache: CacheRespuestas | None = None,
+                 trazador: Trazador | None = None,
+                 reintentos: PoliticaReintentos | None = None,
+                 percentil_cobertura: float = PERCENTIL_COBERTURA,
+                 cortacircuitos: Cortacircuitos | None = None):
+        self.base_url = base_url.rstrip("/")
+        # Las respuestas cacheadas son de esta instancia del SDK y este usuario
+        self.ambito   = ambito_de(self.base_url, usuario)
+        self.timeouts = {**TIMEOUTS_POR_DEFECTO, **(timeouts or {})}
+        self.cache    = cache
+        self.trazador = trazador or obtener_trazador()
+        self.reintentos     = reintentos or PoliticaReintentos()
+        self.cortacircuitos = cortacircuitos or Cortacircuitos()
+        self.percentil_cobertura = percentil_cobertura
+        self.latencias = LatenciasRecientes()
+        self.vuelos    = VueloUnico()
+
+        self.sesion = requests.Session()
+        self.sesion.auth = (usuario, password)
+        adaptador = HTTPAdapter(pool_connections=tamano_pool, pool_maxsize=tamano_pool)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        # Hilos para las peticiones de cobertura, que no esperan detrás de las
+        # revalidaciones en segundo plano (estas tienen su propio pool)
+        self._pool_cobertura = ThreadPoolExecutor(max_workers=2 * tamano_pool,
+                                                  thread_name_prefix="sdk-cobertura")
+        self._pool_revalidacion = ThreadPoolExecutor(max_workers=max(1, tamano_pool // 2),
+                                                     thread_name_prefix="sdk-revalidacion")
+
+    def _peticion(self, endpoint: str, pregunta: str, timeout: float) -> requests.Response:
+        return self.sesion.post(f"{self.base_url}/{endpoint}",
+                                json={"question": pregunta}, timeout=timeout)
+
+    def _cubierta(self, endpoint: str, pregunta: str, timeout: float, umbral: float,
+                  span) -> requests.Response:
+        """
+        Lanza la petición y, si no ha respondido en `umbral` segundos, un
+        duplicado; devuelve la primera respuesta que no sea un 5xx.
+        """
+        principal = self._pool_cobertura.submit(self._peticion, endpoint, pregunta, timeout)
+        if wait([principal], timeout=umbral).done:
+            return principal.result()
+
+        self.trazador.contar("sdk_coberturas_total", endpoint=endpoint)
+        duplicado = self._pool_cobertura.submit(self._peticion, endpoint, pregunta,
+                                                max(timeout - umbral, 0.1))
+        origen = {principal: "principal", duplicado: "duplicado"}
+        pendientes, respuesta, error = {principal, duplicado}, None, None
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                try:
+                    respuesta = fut.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if respuesta_definitiva(respuesta.status_code):
+                    span.anotar(cobertura=origen[fut])
+                    return respuesta
+        if respuesta is not None:
+            return respuesta
+        raise error
+
+    def _intento(self, endpoint: str, pregunta: str, timeout: float, span) -> requests.Response:
+        umbral = self.latencias.umbral_cobertura(endpoint, self.percentil_cobertura, timeout)
+        inicio = time.perf_counter()
+        if umbral is not None:
+            r = self._cubierta(endpoint, pregunta, timeout, umbral, span)
+        else:
+            r = self._peticion(endpoint, pregunta, timeout)
+        if respuesta_definitiva(r.status_code):
+            self.latencias.anotar(endpoint, time.perf_counter() - inicio)
+
+        span.anotar(http_status=r.status_code, bytes_peticion=len(r.request.body or b""),
+                    bytes_respuesta=len(r.content))
+        self.trazador.contar("sdk_peticiones_total", endpoint=endpoint, status=r.status_code)
+        self.trazador.contar("sdk_bytes_total", span.atributos["bytes_peticion"],
+                             endpoint=endpoint, direccion="peticion")
+        self.trazador.contar("sdk_bytes_total", len(r.content), endpoint=endpoint,
+                             direccion="respuesta")
+        r.raise_for_status()
+        return r
+
+    def _llamar(self, endpoint: str, pregunta: str, timeout: float,
+                vista: str | None, span) -> dict:
+        """Llamada real al SDK (reintentos + cortacircuitos); guarda la respuesta en caché."""
+        # El timeout es el plazo total de la llamada, reintentos incluidos
+        intentos = Intentos(self.reintentos, self.cortacircuitos, timeout)
+        while True:
+            try:
+                r = self._intento(endpoint, pregunta, intentos.restante(), span)
+                break
+            except Exception as e:
+                espera = intentos.tras_fallo(e)
+                if espera is None:
+                    raise
+                span.anotar(reintentos=intentos.numero)
+                self.trazador.contar("sdk_reintentos_total", endpoint=endpoint)
+                time.sleep(espera)
+        intentos.exito()
+        datos = r.json()
+        if self.cache is not None:
+            self.cache.guardar(endpoint, pregunta, datos, vista, ambito=self.ambito)
+        return datos
+
+    def _revalidar(self, endpoint: str, pregunta: str, timeout: float, vista: str | None):
+        """Refresca en segundo plano una entrada obsoleta (un solo vuelo por clave)."""
+        clave = clave_cache(endpoint, pregunta, vista, self.ambito)
+
+        def refrescar():
+            try:
+                with self.trazador.span(f"sdk.{endpoint}", nueva_traza=True, endpoint=endpoint,
+                                        vista=vista, reintentos=0, revalidacion=True) as span:
+                    self.vuelos.ejecutar(
+                        clave, lambda: self._llamar(endpoint, pregunta, timeout, vista, span), timeout)
+            except Exception:
+                pass  # se sigue sirviendo la entrada obsoleta; el error queda en el span
+
+        self._pool_revalidacion.submit(refrescar)
+
+    def _post(self, endpoint: str, pregunta: str, timeout: float | None,
+              vista: str | None, usar_cache: bool) -> RespuestaSDK:
+        with self.trazador.span(f"sdk.{endpoint}", endpoint=endpoint, vista=vista,
+                                reintentos=0) as span:
+            if self.cache is not None and usar_cache:
+                entrada = self.cache.obtener_entrada(endpoint, pregunta, vista, ambito=self.ambito)
+                resultado = "miss" if entrada is None else ("stale" if entrada[1] else "hit")
+                span.anotar(cache=resultado)
+                self.trazador.contar("sdk_cache_total", endpoint=endpoint, resultado=resultado)
+                if entrada is not None:
+                    guardada, obsoleta = entrada
+                    if obsoleta:
+                        # stale-while-revalidate: se sirve ya y se refresca detrás
+                        self._revalidar(endpoint, pregunta, timeout or self.timeouts[endpoint], vista)
+                    return RespuestaSDK.desde_json(guardada, desde_cache=True)
+
+            timeout = timeout or self.timeouts[endpoint]
+            clave = clave_cache(endpoint, pregunta, vista, self.ambito)
+            datos, compartido = self.vuelos.ejecutar(
+                clave, lambda: self._llamar(endpoint, pregunta, timeout, vista, span), timeout)
+            if compartido:
+                span.anotar(coalescida=True)
+                self.trazador.contar("sdk_coalescidas_total", endpoint=endpoint)
+            return RespuestaSDK.desde_json(datos)
+
+    def answer_metadata_question(self, pregunta: str, timeout: float | None = None,
+                                 vista: str | None = None,
+                                 usar_cache: bool = True) -> RespuestaSDK:
+        """Fase de descubrimiento: pregunta sobre el catálogo de metadatos."""
+        return self._post("answerMetadataQuestion", pregunta, timeout, vista, usar_cache)
+
+    def answer_data_question(self, pregunta: str, timeout: float | None = None,
+                             vista: str | None = None,
+                             usar_cache: bool = True) -> RespuestaSDK:
+        """Fase de ejecución: el SDK genera y ejecuta la consulta SQL."""
+        return self._post("answerDataQuestion", pregunta, timeout, vista, usar_cache)
+
+    def stream_question(self, pregunta: str, modo: str = "data", timeout: float | None = None,
+                        vista: str | None = None, usar_cache: bool = True) -> RespuestaStreaming:
+        """
+        Como answer_data_question / answer_metadata_question, pero por
+        fragmentos. Comparte caché con ellas: una respuesta ya cacheada se
+        entrega como un único fragmento. `timeout` es el plazo total.
+        """
+        flujo = RespuestaStreaming()
+        flujo._fragmentos = self._fragmentos(flujo, pregunta, modo, timeout, vista, usar_cache)
+        return flujo
+
+    def _fragmentos(self, flujo: RespuestaStreaming, pregunta: str, modo: str,
+                    timeout: float | None, vista: str | None, usar_cache: bool) -> Iterator[str]:
+        endpoint = ENDPOINT_DE_MODO[modo]
+        timeout = timeout or self.timeouts[endpoint]
+        span = self.trazador.abrir("sdk.stream", endpoint=ENDPOINT_STREAMING, modo=modo, vista=vista)
+        error = None
+        try:
+            if self.cache is not None and usar_cache:
+                entrada = self.cache.obtener_entrada(endpoint, pregunta, vista, ambito=self.ambito)
+                resultado = "miss" if entrada is None else ("stale" if entrada[1] else "hit")
+                span.anotar(cache=resultado)
+                self.trazador.contar("sdk_cache_total", endpoint=endpoint, resultado=resultado)
+                if entrada is not None:
+                    guardada, obsoleta = entrada
+                    if obsoleta:
+                        self._revalidar(endpoint, pregunta, timeout, vista)
+                    flujo.respuesta = RespuestaSDK.desde_json(guardada, desde_cache=True)
+                    flujo.texto = flujo.respuesta.answer
+                    flujo.primer_fragmento_s = 0.0
+                    yield flujo.texto
+                    return
+
+            intentos = Intentos(SIN_REINTENTOS, self.cortacircuitos, timeout)
+            inicio, plazo = time.perf_counter(), intentos.plazo
+            try:
+                flujo._http = self.sesion.get(f"{self.base_url}/{ENDPOINT_STREAMING}",
+                                              params={"question": pregunta, "mode": modo},
+                                              headers={"Accept": "text/event-stream"},
+                                              stream=True, timeout=timeout)
+                span.anotar(http_status=flujo._http.status_code)
+                flujo._http.raise_for_status()
+            except Exception as e:
+                intentos.tras_fallo(e)
+                raise
+
+            partes, final = [], {}
+            try:
+                for evento, datos in leer_sse(flujo._http.iter_lines(chunk_size=None,
+                                                                      decode_unicode=True)):
+                    if flujo.cancelada:
+                        break
+                    if isinstance(datos, dict) and ("answer" in datos or evento in ("fin", "done")):
+                        final = datos
+                        continue
+                    texto = (datos if isinstance(datos, str)
+                             else datos.get("chunk") or datos.get("token") or datos.get("text") or "")
+                    if not texto:
+                        continue
+                    if flujo.primer_fragmento_s is None:
+                        flujo.primer_fragmento_s = time.perf_counter() - inicio
+                        span.anotar(primer_fragmento_ms=round(flujo.primer_fragmento_s * 1000, 1))
+                    partes.append(texto)
+                    flujo.texto += texto
+                    yield texto
+                    if time.monotonic() > plazo:
+                        raise TimeoutError(f"La respuesta en streaming superó el plazo de {timeout}s")
+            except Exception:
+                # Cortar la conexión desde otro hilo hace fallar la lectura en curso
+                if not flujo.cancelada:
+                    raise
+            finally:
+                flujo._http.close()
+
+            span.anotar(fragmentos=len(partes), bytes_respuesta=len(flujo.texto.encode("utf-8")))
+            if flujo.cancelada:
+                self._cancelado(flujo, span, modo)
+                return
+            intentos.exito()
+            datos = {**final, "answer": final.get("answer") or "".join(partes)}
+            if self.cache is not None:
+                self.cache.guardar(endpoint, pregunta, datos, vista, ambito=self.ambito)
+            flujo.respuesta = RespuestaSDK.desde_json(datos)
+        except GeneratorExit:
+            # El consumidor dejó de iterar (la sesión de Streamlit se fue)
+            self._cancelado(flujo, span, modo)
+        except KeyboardInterrupt:
+            # Ctrl+C con la lectura en curso: es una cancelación, no un error del SDK
+            self._cancelado(flujo, span, modo)
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.trazador.cerrar(span, error=error)
+
+    def _cancelado(self, flujo: RespuestaStreaming, span, modo: str):
+        flujo.cancelada = True
+        span.anotar(cancelada=True)
+        self.trazador.contar("sdk_streams_cancelados_total", modo=modo)
+        if flujo._http is not None:
+            flujo._http.close()
+
+    def probar_conexion(self) -> bool:
+        """True si el SDK responde (cualquier código < 500 en /docs)."""
+        r = self.sesion.get(f"{self.base_url}/docs", timeout=self.timeouts["docs"])
+        if r.status_code < 500:
+            self.cortacircuitos.reiniciar()
+        return r.status_code < 500
+
+    def cerrar(self):
+        self._pool_cobertura.shutdown(wait=False)
+        self._pool_revalidacion.shutdown(wait=False)
+        self.sesion.close()
+
+
+_clientes: OrderedDict[tuple, ClienteSDK] = OrderedDict()
+_lock_clientes = threading.Lock()
+
+
+def obtener_cliente(base_url: str, usuario: str, password: str, **kwargs) -> ClienteSDK:
+    """
+    Devuelve el cliente compartido del proceso para estas credenciales. Se
+    guardan los MAX_CLIENTES usados más recientemente: cada credencial
+    distinta (también las mal escritas en la barra lateral) abre una sesión
+    HTTP y dos pools, y el que sale del registro se cierra.
+    """
+    clave = (base_url.rstrip("/"), usuario, password)
+    with _lock_clientes:
+        cliente = _clientes.get(clave)
+        if cliente is not None:
+            _clientes.move_to_end(clave)
+            return cliente
+        kwargs.setdefault("cache", obtener_cache())
+        cliente = _clientes[clave] = ClienteSDK(base_url, usuario, password, **kwargs)
+        expulsados = []
+        while len(_clientes) > max(1, MAX_CLIENTES):
+            expulsados.append(_clientes.popitem(last=False)[1])
+    for viejo in expulsados:
+        viejo.cerrar()
+    return cliente
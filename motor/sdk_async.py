@@ -0,0 +1,193 @@
+"""
+Cliente asíncrono (httpx) para el Denodo AI SDK.
+
+Mismo contrato que `motor.sdk.ClienteSDK` pero con corrutinas sobre un único
+`httpx.AsyncClient` con pool acotado, para que un solo proceso pueda llevar
+decenas de sesiones concurrentes sin un hilo por sesión. Los spans de
+`motor.trazas` se anidan por tarea asyncio igual que por hilo, y los
+reintentos, el hedging y el cortacircuitos siguen `motor.resiliencia`.
+"""
+import asyncio
+import time
+
+import httpx
+
+from motor.cache import CacheRespuestas, ambito_de, clave_cache
+from motor.coalescencia import VueloUnicoAsync
+from motor.resiliencia import (Cortacircuitos, Intentos, LatenciasRecientes, PoliticaReintentos,
+                               respuesta_definitiva)
+from motor.sdk import PERCENTIL_COBERTURA, TAMANO_POOL_POR_DEFECTO, TIMEOUTS_POR_DEFECTO, RespuestaSDK
+from motor.trazas import Trazador, obtener_trazador
+
+
+class ClienteSDKAsync:
+    """Cliente asíncrono con conexiones keep-alive compartidas."""
+
+    def __init__(self, base_url: str, usuario: str, password: str,
+                 tamano_pool: int = TAMANO_POOL_POR_DEFECTO,
+                 timeouts: dict | None = None,
+                 cache: CacheRespuestas | None = None,
+                 trazador: Trazador | None = None,
+                 reintentos: PoliticaReintentos | None = None,
+                 percentil_cobertura: float = PERCENTIL_COBERTURA,
+                 cortacircuitos: Cortacircuitos | None = None):
+        self.base_url = base_url.rstrip("/")
+        # Las respuestas cacheadas son de esta instancia del SDK y este usuario
+        self.ambito   = ambito_de(self.base_url, usuario)
+        self.timeouts = {**TIMEOUTS_POR_DEFECTO, **(timeouts or {})}
+        self.cache    = cache
+        self.trazador = trazador or obtener_trazador()
+        self.reintentos     = reintentos or PoliticaReintentos()
+        self.cortacircuitos = cortacircuitos or Cortacircuitos()
+        self.percentil_cobertura = percentil_cobertura
+        self.latencias = LatenciasRecientes()
+        self.vuelos    = VueloUnicoAsync()
+        self._revalidaciones: set[asyncio.Task] = set()
+        self.http = httpx.AsyncClient(
+            auth=(usuario, password),
+            limits=httpx.Limits(max_connections=tamano_pool,
+                                max_keepalive_connections=tamano_pool),
+        )
+
+    async def __aenter__(self) -> "ClienteSDKAsync":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def _peticion(self, endpoint: str, pregunta: str, timeout: float) -> httpx.Response:
+        return await self.http.post(f"{self.base_url}/{endpoint}",
+                                    json={"question": pregunta}, timeout=timeout)
+
+    async def _cubierta(self, endpoint: str, pregunta: str, timeout: float, umbral: float,
+                        span) -> httpx.Response:
+        """Igual que `ClienteSDK._cubierta`; la petición perdedora se cancela."""
+        principal = asyncio.ensure_future(self._peticion(endpoint, pregunta, timeout))
+        hechos, _ = await asyncio.wait({principal}, timeout=umbral)
+        if hechos:
+            return principal.result()
+
+        self.trazador.contar("sdk_coberturas_total", endpoint=endpoint)
+        duplicado = asyncio.ensure_future(
+            self._peticion(endpoint, pregunta, max(timeout - umbral, 0.1)))
+        origen = {principal: "principal", duplicado: "duplicado"}
+        pendientes, respuesta, error = {principal, duplicado}, None, None
+        try:
+            while pendientes:
+                hechos, pendientes = await asyncio.wait(pendientes,
+                                                        return_when=asyncio.FIRST_COMPLETED)
+                for tarea in hechos:
+                    try:
+                        respuesta = tarea.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if respuesta_definitiva(respuesta.status_code):
+                        span.anotar(cobertura=origen[tarea])
+                        return respuesta
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+        if respuesta is not None:
+            return respuesta
+        raise error
+
+    async def _intento(self, endpoint: str, pregunta: str, timeout: float,
+                       span) -> httpx.Response:
+        umbral = self.latencias.umbral_cobertura(endpoint, self.percentil_cobertura, timeout)
+        inicio = time.perf_counter()
+        if umbral is not None:
+            r = await self._cubierta(endpoint, pregunta, timeout, umbral, span)
+        else:
+            r = await self._peticion(endpoint, pregunta, timeout)
+        if respuesta_definitiva(r.status_code):
+            self.latencias.anotar(endpoint, time.perf_counter() - inicio)
+
+        span.anotar(http_status=r.status_code, bytes_peticion=len(r.request.content),
+                    bytes_respuesta=len(r.content))
+        self.trazador.contar("sdk_peticiones_total", endpoint=endpoint, status=r.status_code)
+        self.trazador.contar("sdk_bytes_total", span.atributos["bytes_peticion"],
+                             endpoint=endpoint, direccion="peticion")
+        self.trazador.contar("sdk_bytes_total", len(r.content), endpoint=endpoint,
+                             direccion="respuesta")
+        r.raise_for_status()
+        return r
+
+    async def _llamar(self, endpoint: str, pregunta: str, timeout: float,
+                      vista: str | None, span) -> dict:
+        """Llamada real al SDK (reintentos + cortacircuitos); guarda la respuesta en caché."""
+        intentos = Intentos(self.reintentos, self.cortacircuitos, timeout)
+        while True:
+            try:
+                r = await self._intento(endpoint, pregunta, intentos.restante(), span)
+                break
+            except Exception as e:
+                espera = intentos.tras_fallo(e)
+                if espera is None:
+                    raise
+                span.anotar(reintentos=intentos.numero)
+                self.trazador.contar("sdk_reintentos_total", endpoint=endpoint)
+                await asyncio.sleep(espera)
+        intentos.exito()
+        datos = r.json()
+        if self.cache is not None:
+            # La caché es SQLite bloqueante con un threading.Lock: fuera del bucle
+            await asyncio.to_thread(self.cache.guardar, endpoint, pregunta, datos, vista,
+                                    ambito=self.ambito)
+        return datos
+
+    def _revalidar(self, endpoint: str, pregunta: str, timeout: float, vista: str | None):
+        """Igual que `ClienteSDK._revalidar`, como tarea asyncio de fondo."""
+        clave = clave_cache(endpoint, pregunta, vista, self.ambito)
+
+        async def refrescar():
+            try:
+                with self.trazador.span(f"sdk.{endpoint}", nueva_traza=True, endpoint=endpoint,
+                                        vista=vista, reintentos=0, revalidacion=True) as span:
+                    await self.vuelos.ejecutar(
+                        clave, lambda: self._llamar(endpoint, pregunta, timeout, vista, span))
+            except Exception:
+                pass
+
+        tarea = asyncio.ensure_future(refrescar())
+        self._revalidaciones.add(tarea)
+        tarea.add_done_callback(self._revalidaciones.discard)
+
+    async def _post(self, endpoint: str, pregunta: str, timeout: float | None,
+                    vista: str | None, usar_cache: bool) -> RespuestaSDK:
+        with self.trazador.span(f"sdk.{endpoint}", endpoint=endpoint, vista=vista,
+                                reintentos=0) as span:
+            if self.cache is not None and usar_cache:
+                entrada = await asyncio.to_thread(self.cache.obtener_entrada, endpoint, pregunta,
+                                                  vista, ambito=self.ambito)
+                resultado = "miss" if entrada is None else ("stale" if entrada[1] else "hit")
+                span.anotar(cache=resultado)
+                self.trazador.contar("sdk_cache_total", endpoint=endpoint, resultado=resultado)
+                if entrada is not None:
+                    guardada, obsoleta = entrada
+                    if obsoleta:
+                        # stale-while-revalidate: se sirve ya y se refresca detrás
+                        self._revalidar(endpoint, pregunta, timeout or self.timeouts[endpoint], vista)
+                    return RespuestaSDK.desde_json(guardada, desde_cache=True)
+
+            timeout = timeout or self.timeouts[endpoint]
+            clave = clave_cache(endpoint, pregunta, vista, self.ambito)
+            datos, compartido = await self.vuelos.ejecutar(
+                clave, lambda: self._llamar(endpoint, pregunta, timeout, vista, span))
+            if compartido:
+                span.anotar(coalescida=True)
+                self.trazador.contar("sdk_coalescidas_total", endpoint=endpoint)
+            return RespuestaSDK.desde_json(datos)
+
+    async def answer_metadata_question(self, pregunta: str, timeout: float | None = None,
+                                       vista: str | None = None,
+                                       usar_cache: bool = True) -> RespuestaSDK:
+        return await self._post("answerMetadataQuestion", pregunta, timeout, vista, usar_cache)
+
+    async def answer_data_question(self, pregunta: str, timeout: float | None = None,
+                                   vista: str | None = None,
+                                   usar_cache: bool = True) -> RespuestaSDK:
+        return await self._post("answerDataQuestion", pregunta, timeout, vista, usar_cache)
+
+    async def cerrar(self):
+        await self.http.aclose()
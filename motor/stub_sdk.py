@@ -0,0 +1,195 @@
+"""
+Servidor local que imita los endpoints del Denodo AI SDK.
+
+Responde a /answerMetadataQuestion, /answerDataQuestion y /docs con la misma
+forma de JSON que el SDK real, tras una latencia configurable (con jitter
+opcional) y con una tasa de errores 500 simulados. /streamAnswerQuestion
+devuelve la misma respuesta como text/event-stream, palabra a palabra cada
+`latencia_token` segundos. Sirve para probar el CLI, el motor asíncrono y el
+frontend sin Docker ni LLM, y para el benchmark.
+
+    python -m motor.stub_sdk --puerto 8008 --latencia 0.5 --jitter 0.2 --tasa-error 0.05
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _respuesta_metadatos(pregunta: str) -> dict:
+    vistas = re.findall(r"admin\.\w+", pregunta) or ["admin.basketball"]
+    return {
+        "answer": f"La vista {vistas[0]} contiene las columnas participant_name, result_wlt, stage_code.",
+        "tables_used": vistas,
+    }
+
+
+def _respuesta_datos(pregunta: str) -> dict:
+    vistas = re.findall(r"admin\.\w+", pregunta) or ["admin.basketball"]
+    if "participant_name de la vista" in pregunta:
+        respuesta = "\n".join(f"Equipo {i}" for i in range(1, 51))
+    elif "recomendacion" in pregunta.lower():
+        respuesta = (
+            "Tras ejecutar la consulta, la mejor opción es el Equipo 1: encabeza el ranking "
+            "con la mayor tasa de victorias y la menor variabilidad entre fases. El Equipo 2 "
+            "queda segundo por volumen de partidos, y el Equipo 3 completa el top 3 con un "
+            "rendimiento sólido pero menos consistente. Recomendación: priorizar al Equipo 1."
+        )
+    else:
+        respuesta = "4,3,7"
+    return {
+        "answer": respuesta,
+        "sql_query": f"SELECT COUNT(*) FROM {vistas[0]}",
+        "tables_used": vistas,
+    }
+
+
+class ServidorStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion=("127.0.0.1", 0), latencia: float = 0.0,
+                 jitter: float = 0.0, tasa_error: float = 0.0, semilla: int | None = None,
+                 latencia_token: float = 0.0, fallos_iniciales: int = 0):
+        super().__init__(direccion, _ManejadorStub)
+        self.latencia   = latencia
+        self.latencia_token = latencia_token
+        self.jitter     = jitter
+        self.tasa_error = tasa_error
+        # Las primeras `fallos_iniciales` peticiones fallan siempre (reintentos deterministas)
+        self.fallos_iniciales = fallos_iniciales
+        self.peticiones = 0
+        self.errores    = 0
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def _sortear(self) -> tuple[float, bool]:
+        """(espera, falla) de la siguiente petición: latencia ± jitter uniforme."""
+        with self._lock:
+            self.peticiones += 1
+            espera = max(0.0, self.latencia + self._azar.uniform(-self.jitter, self.jitter))
+            falla = self.peticiones <= self.fallos_iniciales or self._azar.random() < self.tasa_error
+            if falla:
+                self.errores += 1
+        return espera, falla
+
+    def arrancar(self) -> "ServidorStub":
+        """Sirve en un hilo de fondo y devuelve el propio servidor."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # El cliente abandonó la petición (plazo agotado, cancelación): no es un fallo del stub
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def parar(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _ManejadorStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo van en escrituras separadas: sin esto, Nagle + ACK
+    # retardado añaden ~40 ms a cada respuesta keep-alive
+    disable_nagle_algorithm = True
+    server: ServidorStub
+
+    def _responder(self, codigo: int, cuerpo: dict | None = None):
+        datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _trozo(self, datos: bytes):
+        """Un trozo de Transfer-Encoding: chunked (vacío = fin del cuerpo)."""
+        self.wfile.write(f"{len(datos):x}\r\n".encode("ascii") + datos + b"\r\n")
+        self.wfile.flush()
+
+    def _evento(self, datos: dict, evento: str | None = None):
+        linea = (f"event: {evento}\n" if evento else "") + f"data: {json.dumps(datos)}\n\n"
+        self._trozo(linea.encode("utf-8"))
+
+    def _stream(self, pregunta: str, modo: str):
+        espera, falla = self.server._sortear()
+        if espera:
+            time.sleep(espera)
+        if falla:
+            self._responder(500, {"detail": "Error simulado por el stub"})
+            return
+        cuerpo = _respuesta_metadatos(pregunta) if modo == "metadata" else _respuesta_datos(pregunta)
+        # Un trozo chunked por evento, como un servidor SSE real
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, palabra in enumerate(re.findall(r"\S+\s*", cuerpo["answer"])):
+            if i and self.server.latencia_token:
+                time.sleep(self.server.latencia_token)
+            self._evento({"chunk": palabra})
+        self._evento(cuerpo, "fin")
+        self._trozo(b"data: [DONE]\n\n")
+        self._trozo(b"")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/docs"):
+            self._responder(200, {})
+        elif url.path.startswith("/streamAnswerQuestion"):
+            consulta = parse_qs(url.query)
+            self._stream(consulta.get("question", [""])[0], consulta.get("mode", ["data"])[0])
+        else:
+            self._responder(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        longitud = int(self.headers.get("Content-Length") or 0)
+        try:
+            pregunta = json.loads(self.rfile.read(longitud) or b"{}").get("question", "")
+        except json.JSONDecodeError:
+            self._responder(422, {"detail": "JSON inválido"})
+            return
+
+        espera, falla = self.server._sortear()
+        if espera:
+            time.sleep(espera)
+
+        if falla:
+            self._responder(500, {"detail": "Error simulado por el stub"})
+        elif self.path.startswith("/answerMetadataQuestion"):
+            self._responder(200, _respuesta_metadatos(pregunta))
+        elif self.path.startswith("/answerDataQuestion"):
+            self._responder(200, _respuesta_datos(pregunta))
+        else:
+            self._responder(404, {"detail": "Not Found"})
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local del Denodo AI SDK")
+    parser.add_argument("--puerto", type=int, default=8008)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por respuesta")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± segundos aleatorios sobre la latencia")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Fracción de respuestas 500 (0-1)")
+    parser.add_argument("--latencia-token", type=float, default=0.0,
+                        help="Segundos entre palabras en /streamAnswerQuestion")
+    args = parser.parse_args()
+    servidor = ServidorStub(("127.0.0.1", args.puerto), latencia=args.latencia,
+                            jitter=args.jitter, tasa_error=args.tasa_error,
+                            latencia_token=args.latencia_token)
+    print(f"Stub del SDK escuchando en {servidor.url}")
+    servidor.serve_forever()
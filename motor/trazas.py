@@ -0,0 +1,310 @@
+"""
+Trazas y métricas por fase (estilo OpenTelemetry / Prometheus, sin dependencias).
+
+Cada llamada al SDK y cada etapa local (esquema, estadísticas, scoring,
+render) abre un `Span` con su duración y atributos: tamaño de la petición y
+de la respuesta, código HTTP, reintentos, acierto o fallo de caché. Los spans
+se anidan solos dentro del mismo hilo o tarea asyncio (contextvars); para
+seguir la traza en un pool de hilos se envuelve la función con `en_hilo`.
+
+Los spans terminados se guardan en memoria (acotados) y además alimentan
+histogramas y contadores que se exportan en formato texto de Prometheus,
+opcionalmente servidos en http://<host>:<puerto>/metrics.
+"""
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites superiores (segundos) de los buckets del histograma de duración
+BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+MAX_SPANS = int(os.environ.get("DENODO_TRAZAS_MAX_SPANS", "5000"))
+
+_span_actual: contextvars.ContextVar = contextvars.ContextVar("span_actual", default=None)
+
+
+@dataclass
+class Span:
+    nombre: str
+    traza_id: str
+    span_id: str
+    padre_id: str | None
+    inicio: float                       # epoch (s)
+    duracion_s: float | None = None     # None mientras está abierto
+    atributos: dict = field(default_factory=dict)
+    error: str | None = None
+    _t0: float = field(default=0.0, repr=False)
+    _token: object = field(default=None, repr=False)
+
+    def anotar(self, **atributos):
+        self.atributos.update(atributos)
+
+    def como_dict(self) -> dict:
+        return {
+            "nombre": self.nombre, "traza_id": self.traza_id, "span_id": self.span_id,
+            "padre_id": self.padre_id, "inicio": self.inicio,
+            "duracion_ms": None if self.duracion_s is None else round(self.duracion_s * 1000, 3),
+            "atributos": dict(self.atributos), "error": self.error,
+        }
+
+    def como_otel(self) -> dict:
+        """Span en el formato JSON de OTLP (resourceSpans → scopeSpans → spans)."""
+        def valor(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        fin = self.inicio + (self.duracion_s or 0.0)
+        return {
+            "traceId": self.traza_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.padre_id or "",
+            "name": self.nombre,
+            "startTimeUnixNano": str(int(self.inicio * 1e9)),
+            "endTimeUnixNano": str(int(fin * 1e9)),
+            "attributes": [{"key": k, "value": valor(v)}
+                           for k, v in self.atributos.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _etiquetas(pares) -> str:
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}" if pares else ""
+
+
+class Trazador:
+    """Registro de spans y métricas agregadas del proceso."""
+
+    def __init__(self, max_spans: int = MAX_SPANS, servicio: str = "denodo-olympic-investor"):
+        self.servicio = servicio
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        # nombre del span -> [conteos por bucket..., +Inf], suma, errores
+        self._histogramas: dict[str, dict] = {}
+        # (métrica, ((etiqueta, valor), ...)) -> total
+        self._contadores: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    # ── Spans ────────────────────────────────────────────
+    def abrir(self, nombre: str, nueva_traza: bool = False, **atributos) -> Span:
+        """
+        Abre un span hijo del actual (o raíz de una traza nueva) y lo deja
+        como actual hasta `cerrar`.
+        """
+        padre = None if nueva_traza else _span_actual.get()
+        span = Span(
+            nombre=nombre,
+            traza_id=padre.traza_id if padre else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            padre_id=padre.span_id if padre else None,
+            inicio=time.time(),
+            atributos=atributos,
+            _t0=time.perf_counter(),
+        )
+        span._token = _span_actual.set(span)
+        return span
+
+    def cerrar(self, span: Span, error: BaseException | str | None = None):
+        if span.duracion_s is not None:
+            return
+        span.duracion_s = time.perf_counter() - span._t0
+        if error is not None:
+            span.error = str(error) or type(error).__name__
+        try:
+            _span_actual.reset(span._token)
+        except ValueError:
+            # Cerrado desde otro contexto (otro hilo): ese contexto ya no lo usa
+            pass
+        self._registrar(span)
+
+    @contextmanager
+    def span(self, nombre: str, nueva_traza: bool = False, **atributos):
+        span = self.abrir(nombre, nueva_traza, **atributos)
+        try:
+            yield span
+        except BaseException as e:
+            self.cerrar(span, error=e)
+            raise
+        self.cerrar(span)
+
+    def en_hilo(self, nombre: str, funcion, **atributos):
+        """
+        `funcion` lista para enviarse a un pool: se ejecuta en un span hijo
+        del span actual del hilo que la envuelve.
+        """
+        contexto = contextvars.copy_context()
+
+        def envuelta(*args, **kwargs):
+            def dentro():
+                with self.span(nombre, **atributos):
+                    return funcion(*args, **kwargs)
+            return contexto.run(dentro)
+        return envuelta
+
+    def actual(self) -> Span | None:
+        return _span_actual.get()
+
+    def traza(self, traza_id: str) -> list[Span]:
+        with self._lock:
+            return sorted((s for s in self.spans if s.traza_id == traza_id), key=lambda s: s.inicio)
+
+    def ultima_traza(self, nombre_raiz: str | None = None) -> list[Span]:
+        """Spans de la última traza terminada (opcionalmente con esa raíz)."""
+        with self._lock:
+            raiz = next((s for s in reversed(self.spans)
+                         if s.padre_id is None and nombre_raiz in (None, s.nombre)), None)
+        return self.traza(raiz.traza_id) if raiz else []
+
+    # ── Métricas ─────────────────────────────────────────
+    def contar(self, metrica: str, valor: float = 1, **etiquetas):
+        clave = (metrica, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def _registrar(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            h = self._histogramas.get(span.nombre)
+            if h is None:
+                h = self._histogramas[span.nombre] = {
+                    "buckets": [0] * (len(BUCKETS_S) + 1), "suma": 0.0, "errores": 0}
+            for i, limite in enumerate(BUCKETS_S):
+                if span.duracion_s <= limite:
+                    h["buckets"][i] += 1
+                    break
+            else:
+                h["buckets"][-1] += 1
+            h["suma"] += span.duracion_s
+            h["errores"] += span.error is not None
+
+    def reiniciar(self):
+        with self._lock:
+            self.spans.clear()
+            self._histogramas.clear()
+            self._contadores.clear()
+
+    # ── Exportación ──────────────────────────────────────
+    def exportar_otel(self, spans: list[Span] | None = None) -> dict:
+        """Documento OTLP/JSON (el que acepta un collector en /v1/traces)."""
+        if spans is None:
+            with self._lock:
+                spans = list(self.spans)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.servicio}}]},
+            "scopeSpans": [{"scope": {"name": "motor.trazas"},
+                            "spans": [s.como_otel() for s in spans]}],
+        }]}
+
+    def prometheus(self) -> str:
+        """Histogramas de duración por span y contadores en formato texto 0.0.4."""
+        with self._lock:
+            histogramas = {n: {**h, "buckets": list(h["buckets"])}
+                           for n, h in self._histogramas.items()}
+            contadores = dict(self._contadores)
+
+        lineas = [
+            "# HELP denodo_span_duracion_segundos Duración de cada fase/llamada instrumentada.",
+            "# TYPE denodo_span_duracion_segundos histogram",
+        ]
+        for nombre, h in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, n in zip(BUCKETS_S + ("+Inf",), h["buckets"]):
+                acumulado += n
+                lineas.append(f"denodo_span_duracion_segundos_bucket"
+                              f"{_etiquetas([('span', nombre), ('le', limite)])} {acumulado}")
+            lineas.append(f"denodo_span_duracion_segundos_sum{_etiquetas([('span', nombre)])} "
+                          f"{h['suma']:.6f}")
+            lineas.append(f"denodo_span_duracion_segundos_count{_etiquetas([('span', nombre)])} "
+                          f"{acumulado}")
+        lineas += ["# HELP denodo_span_errores_total Spans terminados con error.",
+                   "# TYPE denodo_span_errores_total counter"]
+        for nombre, h in sorted(histogramas.items()):
+            lineas.append(f"denodo_span_errores_total{_etiquetas([('span', nombre)])} {h['errores']}")
+
+        for metrica in sorted({m for m, _ in contadores}):
+            lineas.append(f"# TYPE denodo_{metrica} counter")
+            for (m, etiquetas), total in sorted(contadores.items(), key=lambda kv: str(kv[0])):
+                if m == metrica:
+                    lineas.append(f"denodo_{m}{_etiquetas(etiquetas)} {total:g}")
+        return "\n".join(lineas) + "\n"
+
+
+def desglose(spans: list[Span]) -> list[dict]:
+    """Filas (nivel, span, ms, % de la raíz, atributos) de una traza, en orden de inicio."""
+    if not spans:
+        return []
+    por_id = {s.span_id: s for s in spans}
+    raiz = next((s for s in spans if s.padre_id not in por_id), spans[0])
+    total = raiz.duracion_s or 0.0
+
+    def nivel(s):
+        n = 0
+        while s.padre_id in por_id:
+            s, n = por_id[s.padre_id], n + 1
+        return n
+
+    return [{
+        "span": "  " * nivel(s) + s.nombre,
+        "ms": round((s.duracion_s or 0.0) * 1000, 1),
+        "% total": round(100 * (s.duracion_s or 0.0) / total, 1) if total else None,
+        "atributos": ", ".join(f"{k}={v}" for k, v in s.atributos.items() if v is not None),
+        "error": s.error,
+    } for s in spans]
+
+
+# ─────────────────────────────────────────
+# ENDPOINT /metrics
+# ─────────────────────────────────────────
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        datos = obtener_trazador().prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+_trazador: Trazador | None = None
+_servidores: dict[int, ThreadingHTTPServer] = {}
+_lock_trazador = threading.Lock()
+
+
+def obtener_trazador() -> Trazador:
+    """Trazador compartido del proceso."""
+    global _trazador
+    with _lock_trazador:
+        if _trazador is None:
+            _trazador = Trazador()
+        return _trazador
+
+
+def servir_metricas(puerto: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Sirve /metrics en un hilo de fondo (una vez por puerto, idempotente)."""
+    with _lock_trazador:
+        servidor = _servidores.get(puerto)
+        if servidor is None:
+            servidor = _servidores[puerto] = ThreadingHTTPServer((host, puerto), _ManejadorMetricas)
+            servidor.daemon_threads = True
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
@@ -0,0 +1,104 @@
+"""
+Caché SQLite de respuestas (motor.cache): caducidad por TTL, expulsión LRU
+por entradas y por bytes, y la ventana obsoleta de la que depende el
+stale-while-revalidate de `ClienteSDK._post`.
+"""
+import time
+
+import pytest
+
+from motor.cache import CacheRespuestas
+from motor.sdk import ClienteSDK
+from motor.stub_sdk import ServidorStub
+from motor.trazas import Trazador
+
+ENDPOINT = "answerDataQuestion"
+
+
+def _cache(tmp_path, **kwargs) -> CacheRespuestas:
+    return CacheRespuestas(tmp_path / "cache.sqlite3", **kwargs)
+
+
+def test_ttl(tmp_path):
+    cache = _cache(tmp_path, ttl=0.2, ventana_obsoleta=0)
+    cache.guardar(ENDPOINT, "¿Cuántos partidos?", {"answer": "5"}, vista="admin.tennis")
+    assert cache.obtener(ENDPOINT, "¿cuántos   partidos?", vista="admin.tennis") == {"answer": "5"}
+    time.sleep(0.3)
+    assert cache.obtener(ENDPOINT, "¿Cuántos partidos?", vista="admin.tennis") is None
+    assert cache.obtener_entrada(ENDPOINT, "¿Cuántos partidos?", vista="admin.tennis") is None
+
+
+def test_ventana_obsoleta(tmp_path):
+    cache = _cache(tmp_path, ventana_obsoleta=60)
+    cache.guardar(ENDPOINT, "p", {"answer": "viejo"}, ttl=-1)
+    # `obtener` no sirve obsoletas; `obtener_entrada` sí, marcadas
+    assert cache.obtener(ENDPOINT, "p") is None
+    assert cache.obtener_entrada(ENDPOINT, "p") == ({"answer": "viejo"}, True)
+    assert cache.restante(ENDPOINT, "p") < 0
+
+    fuera = _cache(tmp_path / "fuera", ventana_obsoleta=0.1)
+    fuera.guardar(ENDPOINT, "p", {"answer": "viejo"}, ttl=-1)
+    time.sleep(0.2)
+    assert fuera.obtener_entrada(ENDPOINT, "p") is None
+
+
+def test_lru_por_entradas(tmp_path):
+    cache = _cache(tmp_path, max_entradas=2)
+    cache.guardar(ENDPOINT, "a", {"answer": "a"})
+    time.sleep(0.01)
+    cache.guardar(ENDPOINT, "b", {"answer": "b"})
+    time.sleep(0.01)
+    cache.obtener(ENDPOINT, "a")  # "b" pasa a ser la menos usada
+    time.sleep(0.01)
+    cache.guardar(ENDPOINT, "c", {"answer": "c"})
+    assert cache.obtener(ENDPOINT, "b") is None
+    assert cache.obtener(ENDPOINT, "a") and cache.obtener(ENDPOINT, "c")
+    assert cache.estadisticas()["expulsiones"] == 1
+
+
+def test_lru_por_bytes(tmp_path):
+    valor = {"answer": "x" * 1000}
+    cache = _cache(tmp_path, max_bytes=2500)
+    for pregunta in ("a", "b", "c"):
+        cache.guardar(ENDPOINT, pregunta, valor)
+        time.sleep(0.01)
+    estadisticas = cache.estadisticas()
+    assert estadisticas["entradas"] == 2 and estadisticas["bytes"] <= 2500
+    assert cache.obtener(ENDPOINT, "a") is None
+
+
+def test_ambito_y_vista_separan_entradas(tmp_path):
+    cache = _cache(tmp_path)
+    cache.guardar(ENDPOINT, "p", {"answer": "uno"}, vista="admin.tennis", ambito="http://sdk|admin")
+    assert cache.obtener(ENDPOINT, "p", vista="admin.tennis", ambito="http://sdk|otro") is None
+    assert cache.obtener(ENDPOINT, "p", vista="admin.judo", ambito="http://sdk|admin") is None
+    cache.invalidar("admin.tennis")
+    assert cache.obtener(ENDPOINT, "p", vista="admin.tennis", ambito="http://sdk|admin") is None
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorStub().arrancar()
+    yield servidor
+    servidor.parar()
+
+
+def test_post_sirve_obsoleta_y_revalida(stub, tmp_path):
+    cache = _cache(tmp_path, ventana_obsoleta=60)
+    cliente = ClienteSDK(stub.url, "admin", "admin", cache=cache, trazador=Trazador())
+    try:
+        cache.guardar(ENDPOINT, "p", {"answer": "viejo"}, vista="admin.tennis",
+                      ttl=-1, ambito=cliente.ambito)
+        respuesta = cliente.answer_data_question("p", vista="admin.tennis")
+        assert respuesta.desde_cache and respuesta.answer == "viejo"
+
+        # La revalidación corre detrás y deja la entrada fresca
+        limite = time.monotonic() + 5
+        while cache.restante(ENDPOINT, "p", "admin.tennis", cliente.ambito) < 0:
+            assert time.monotonic() < limite
+            time.sleep(0.05)
+        assert stub.peticiones == 1
+        assert cliente.answer_data_question("p", vista="admin.tennis").answer != "viejo"
+        assert stub.peticiones == 1
+    finally:
+        cliente.cerrar()
@@ -0,0 +1,96 @@
+"""
+Coalescencia de preguntas idénticas en vuelo (motor.coalescencia) a través
+de `ClienteSDK` y `ClienteSDKAsync` contra el stub local del SDK: N
+preguntas iguales a la vez son una sola petición.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from motor.coalescencia import VueloUnico, VueloUnicoAsync
+from motor.sdk import ClienteSDK
+from motor.sdk_async import ClienteSDKAsync
+from motor.stub_sdk import ServidorStub
+from motor.trazas import Trazador
+
+N = 8
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorStub(latencia=0.3).arrancar()
+    yield servidor
+    servidor.parar()
+
+
+def test_hilos_comparten_una_peticion(stub):
+    # Sin caché ni hedging: solo la coalescencia evita peticiones repetidas
+    cliente = ClienteSDK(stub.url, "admin", "admin", percentil_cobertura=0, trazador=Trazador())
+    respuestas = [None] * N
+    barrera = threading.Barrier(N)
+
+    def preguntar(i):
+        barrera.wait()
+        # Mismo texto salvo espacios y mayúsculas: misma clave
+        pregunta = "¿Cuántos partidos?" if i % 2 else "¿cuántos   partidos?"
+        respuestas[i] = cliente.answer_data_question(pregunta, vista="admin.tennis")
+
+    try:
+        hilos = [threading.Thread(target=preguntar, args=(i,)) for i in range(N)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        cliente.cerrar()
+
+    assert stub.peticiones == 1
+    assert len({r.answer for r in respuestas}) == 1
+    assert cliente.vuelos.en_vuelo() == 0
+
+
+def test_tareas_comparten_una_peticion(stub):
+    async def lote():
+        async with ClienteSDKAsync(stub.url, "admin", "admin", percentil_cobertura=0,
+                                   trazador=Trazador()) as cliente:
+            respuestas = await asyncio.gather(*(
+                cliente.answer_data_question("¿Cuántos partidos?", vista="admin.tennis")
+                for _ in range(N)))
+            return respuestas, cliente.vuelos.en_vuelo()
+
+    respuestas, en_vuelo = asyncio.run(lote())
+    assert stub.peticiones == 1
+    assert len({r.answer for r in respuestas}) == 1
+    assert en_vuelo == 0
+
+
+def test_seguidor_con_plazo_no_corta_la_llamada():
+    vuelos = VueloUnico()
+    lider = threading.Thread(target=vuelos.ejecutar, args=("k", lambda: time.sleep(0.3) or 42))
+    lider.start()
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError):
+        vuelos.ejecutar("k", lambda: 0, timeout=0.05)
+    # La llamada original sigue y un seguidor paciente recibe su resultado
+    assert vuelos.ejecutar("k", lambda: 0, timeout=1) == (42, True)
+    lider.join()
+    assert vuelos.en_vuelo() == 0
+
+
+def test_cancelar_un_seguidor_no_cancela_la_llamada():
+    async def escenario():
+        vuelos = VueloUnicoAsync()
+
+        async def llamada():
+            await asyncio.sleep(0.2)
+            return 42
+
+        primero = asyncio.create_task(vuelos.ejecutar("k", llamada))
+        segundo = asyncio.create_task(vuelos.ejecutar("k", llamada))
+        await asyncio.sleep(0.05)
+        primero.cancel()
+        return await segundo
+
+    assert asyncio.run(escenario()) == (42, True)
@@ -0,0 +1,62 @@
+"""
+Canal SQL directo (motor.conectores + motor.consultas): el COUNT agrupado
+por (participant_name, result_wlt) sobre el sustituto SQLite cuenta lo mismo
+que el índice de agregados, y un conector que no abre no se reintenta en
+cada llamada.
+"""
+import pytest
+
+from motor import conectores
+from motor.conectores import ConectorSQLite, obtener_conector
+from motor.consultas import consulta_wlt, estadisticas_vista
+from motor.indice import obtener_indice
+
+VISTA = "admin.basketball"
+
+
+@pytest.fixture(scope="module")
+def conector():
+    conector = ConectorSQLite()
+    yield conector
+    conector.cerrar()
+
+
+def _suma_generos(indice, vista: str, nombre: str) -> tuple[int, int, int, int]:
+    # El GROUP BY es por participant_name: suma los equipos de todos los géneros
+    agregados = [a for g in indice.generos if (a := indice.por_nombre(vista, nombre, g))]
+    return tuple(sum(getattr(a, c) for a in agregados) for c in ("wins", "losses", "ties", "total"))
+
+
+def test_count_agrupado_coincide_con_el_indice(conector):
+    consulta = consulta_wlt(VISTA, conector.dialecto)
+    assert "GROUP BY participant_name, result_wlt" in consulta.sql
+
+    indice = obtener_indice()
+    por_sql = estadisticas_vista(conector, VISTA)
+    assert set(por_sql) == set(indice.codigos_por_nombre(VISTA))
+    for nombre, e in por_sql.items():
+        assert (e.wins, e.losses, e.ties, e.total) == _suma_generos(indice, VISTA, nombre), nombre
+
+
+def test_count_filtrado_por_participantes(conector):
+    todos = estadisticas_vista(conector, VISTA)
+    pareja = estadisticas_vista(conector, VISTA, ["Australia", "France"])
+    assert pareja == {n: todos[n] for n in ("Australia", "France")}
+
+
+def test_fallo_al_abrir_se_recuerda(monkeypatch):
+    class FuenteCaida:
+        llamadas = 0
+
+        def disciplinas(self):
+            FuenteCaida.llamadas += 1
+            raise OSError("sin datos")
+
+    monkeypatch.setattr(conectores, "_fallos", {})
+    fuente = FuenteCaida()
+    with pytest.raises(OSError):
+        obtener_conector("sqlite", fuente=fuente)
+    # Dentro de la espera se relanza sin volver a intentarlo
+    with pytest.raises(RuntimeError, match="sin datos"):
+        obtener_conector("sqlite", fuente=fuente)
+    assert FuenteCaida.llamadas == 1
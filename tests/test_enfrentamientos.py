@@ -0,0 +1,38 @@
+"""
+Grafo de enfrentamientos (motor.enfrentamientos): los nodos son
+(gender, participant_code), así que dos selecciones con el mismo nombre no se
+mezclan y cada consulta por nombre se resuelve dentro de un mismo género.
+"""
+import numpy as np
+
+from motor.enfrentamientos import GrafoEnfrentamientos
+
+
+def _grafo() -> GrafoEnfrentamientos:
+    # 0 France (M), 1 France (W), 2 Germany (M), 3 Germany (W)
+    # Masculino: Germany ganó a France 35-34; femenino: France ganó dos veces 29-21
+    nombres = ["France", "France", "Germany", "Germany"]
+    generos = ["M", "W", "M", "W"]
+    inicio = np.array([0, 1, 2, 3, 4], dtype=np.int64)
+    rivales = np.array([2, 3, 0, 1], dtype=np.int32)
+    resultados = np.array([[0, 1, 0], [2, 0, 0], [1, 0, 0], [0, 2, 0]], dtype=np.int32)
+    puntos = np.array([[34, 35], [58, 42], [35, 34], [42, 58]], dtype=float)
+    return GrafoEnfrentamientos("admin.handball", nombres, generos, inicio, rivales, resultados, puntos)
+
+
+def test_nombres_iguales_no_se_mezclan():
+    grafo = _grafo()
+    assert len(grafo) == 4
+    assert grafo.nodos_nombre["France"] == [0, 1]
+    # Sin género en la consulta se elige la pareja con más enfrentamientos directos
+    cara = grafo.cara_a_cara("France", "Germany")
+    assert (cara.victorias, cara.derrotas, cara.partidos) == (2, 0, 2)
+
+
+def test_comparar_usa_nodos_del_mismo_genero():
+    grafo = _grafo()
+    comparacion = grafo.comparar("France", "Germany")
+    assert comparacion["fuerza_a"] == float(grafo.ratings[1])
+    assert comparacion["fuerza_b"] == float(grafo.ratings[3])
+    assert comparacion["fuerza_a"] > comparacion["fuerza_b"]
+    assert str(comparacion["cara_a_cara"].invertido()) == "0V-2D-0E · 42-58"
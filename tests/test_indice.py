@@ -0,0 +1,38 @@
+"""
+Índice de agregados (motor.indice) sobre results/: un participant_name que
+existe en los dos géneros ("Australia" en baloncesto) no suma los dos equipos.
+"""
+import pytest
+
+from motor.indice import obtener_indice
+
+VISTA = "admin.basketball"
+
+
+@pytest.fixture(scope="module")
+def indice():
+    return obtener_indice()
+
+
+def test_por_nombre_elige_un_genero(indice):
+    australia = indice.por_nombre(VISTA, "Australia")
+    assert australia.genero in ("M", "W")
+    masculino = indice.por_nombre(VISTA, "Australia", "M")
+    femenino = indice.por_nombre(VISTA, "Australia", "W")
+    assert australia == max(masculino, femenino, key=lambda a: a.total)
+    assert masculino.codigo != femenino.codigo
+
+
+def test_tabla_vista_y_rating_coinciden_con_por_nombre(indice):
+    nombres, wins, losses, partidos = indice.tabla_vista(VISTA)
+    i = nombres.index("Australia")
+    australia = indice.por_nombre(VISTA, "Australia")
+    assert (wins[i], losses[i], partidos[i]) == (australia.wins, australia.losses, australia.total)
+    assert indice.ratings_vista(VISTA)[i] == indice.rating(VISTA, "Australia")
+
+
+def test_genero_comun(indice):
+    genero = indice.genero_comun(VISTA, "Australia", "France")
+    assert genero in ("M", "W")
+    assert indice.por_nombre(VISTA, "France", genero).genero == genero
+    assert indice.genero_comun(VISTA, "Australia", "No existe") is None
@@ -0,0 +1,78 @@
+"""
+Sentido de las marcas por prueba (motor.marcas): sale del `rank` del CSV y,
+sin rank, de las pruebas del mismo tipo; `SENTIDO` es el último recurso.
+"""
+import numpy as np
+
+from motor.marcas import TablaMarcas
+
+# Vela: POINTS son puntos de regata (menos es mejor); IRM_POINTS, la penalización
+VELA = [
+    {"participant_name": "ALDRIDGE Eleanor", "stage_code": "R1", "rank": "1.0", "result": "1", "result_type": "POINTS"},
+    {"participant_name": "KANTOR Sharon", "stage_code": "R1", "rank": "2.0", "result": "2", "result_type": "POINTS"},
+    {"participant_name": "RATULU Viliame", "stage_code": "R1", "rank": "3.0", "result": "3", "result_type": "POINTS"},
+    {"participant_name": "ALDRIDGE Eleanor", "stage_code": "R2", "rank": "1.0", "result": "1", "result_type": "POINTS"},
+    {"participant_name": "KANTOR Sharon", "stage_code": "R2", "rank": "2.0", "result": "2", "result_type": "POINTS"},
+    {"participant_name": "RATULU Viliame", "stage_code": "R2", "rank": "", "result": "44", "result_type": "IRM_POINTS"},
+    {"participant_name": "TAPPER Kaarle", "stage_code": "R2", "rank": "", "result": "44", "result_type": "IRM_POINTS"},
+]
+
+# Concurso completo: doma clásica con rank en PERCENT (más es mejor) y una
+# fase de penalizaciones en POINTS sin rank (menos es mejor)
+HIPICA = [
+    {"participant_name": "JUNG Michael", "stage_code": "DRES", "rank": "1.0", "result": "82.065", "result_type": "PERCENT"},
+    {"participant_name": "FOX-PITT William", "stage_code": "DRES", "rank": "2.0", "result": "78.028", "result_type": "PERCENT"},
+    {"participant_name": "JUNG Michael", "stage_code": "SALTO", "rank": "1.0", "result": "0.00", "result_type": "POINTS"},
+    {"participant_name": "FOX-PITT William", "stage_code": "SALTO", "rank": "2.0", "result": "4.00", "result_type": "POINTS"},
+    {"participant_name": "FOX-PITT William", "stage_code": "DRSS", "rank": "", "result": "17.50", "result_type": "POINTS"},
+    {"participant_name": "JUNG Michael", "stage_code": "DRSS", "rank": "", "result": "53.00", "result_type": "POINTS"},
+    {"participant_name": "TOWELL Ros", "stage_code": "DRSS", "rank": "", "result": "22.00", "result_type": "POINTS"},
+]
+
+
+class FuenteFija:
+    def __init__(self, filas: dict[str, list[dict]]):
+        self._filas = filas
+
+    def disciplinas(self) -> list[str]:
+        return list(self._filas)
+
+    def filas(self, disciplina: str, columnas: list[str]):
+        for fila in self._filas[disciplina]:
+            yield tuple(fila[c] for c in columnas)
+
+
+def _tabla(disciplina: str, filas: list[dict]) -> TablaMarcas:
+    return TablaMarcas.desde_fuente(FuenteFija({disciplina: filas}), disciplina)
+
+
+def _por_nombre(tabla: TablaMarcas) -> dict[str, dict[str, float]]:
+    metricas = tabla.metricas()
+    return {n: {c: float(v[i]) for c, v in metricas.items()} for i, n in enumerate(tabla.nombres)}
+
+
+def test_vela_menos_puntos_es_mejor():
+    tabla = _tabla("Sailing", VELA)
+    assert set(tabla.sentido.tolist()) == {-1}
+
+    m = _por_nombre(tabla)
+    assert m["ALDRIDGE Eleanor"]["victorias"] == 2
+    assert m["ALDRIDGE Eleanor"]["margen"] == 0
+    assert m["ALDRIDGE Eleanor"]["percentil"] == 1
+    assert m["RATULU Viliame"]["victorias"] == 0
+    assert m["RATULU Viliame"]["percentil"] < m["KANTOR Sharon"]["percentil"]
+
+    # Los retirados (IRM_POINTS) cierran la clasificación de su regata
+    irm = np.flatnonzero(tabla.valores == 44)
+    assert tabla.puestos[irm].tolist() == [3, 4]
+
+
+def test_concurso_completo_sin_rank_usa_las_pruebas_del_mismo_tipo():
+    tabla = _tabla("Equestrian", HIPICA)
+    doma = tabla.grupos == tabla.grupos[4]
+    puestos = dict(zip(tabla.valores[doma].tolist(), tabla.puestos[doma].tolist()))
+    assert puestos == {17.5: 1, 22.0: 2, 53.0: 3}
+
+    # PERCENT conserva su sentido: el rank 1 es el porcentaje más alto
+    percent = np.flatnonzero(tabla.valores == 82.065)
+    assert tabla.sentido[percent].tolist() == [1]
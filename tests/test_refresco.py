@@ -0,0 +1,62 @@
+"""
+Refresco incremental (motor.refresco) sobre una copia de results/: corregir
+el resultado de un partido ya aplicado reproduce el Elo de su vista y deja
+el mismo estado que reconstruir el índice; las demás vistas no cambian.
+"""
+import shutil
+
+import numpy as np
+import pytest
+
+from motor import refresco
+from motor.archivo import RUTA_RESULTADOS, FuenteDirectorio
+from motor.indice import IndiceAgregados
+from motor.refresco import Vigilante
+
+VISTA = "admin.basketball"
+
+
+@pytest.fixture
+def entorno(tmp_path, monkeypatch):
+    for nombre in ("Basketball.csv", "Handball.csv"):
+        shutil.copy(RUTA_RESULTADOS / nombre, tmp_path / nombre)
+    fuente = FuenteDirectorio(tmp_path)
+    indice = IndiceAgregados.construir(fuente)
+    # Ni el .npz ni las cachés del proceso son de esta copia
+    monkeypatch.setattr(indice, "guardar", lambda *args, **kwargs: None)
+    monkeypatch.setattr(refresco, "obtener_indice", lambda: indice)
+    monkeypatch.setattr(refresco, "conjunto_cargado", lambda: False)
+    monkeypatch.setattr(Vigilante, "_invalidar", lambda self, vista: None)
+    vigilante = Vigilante(fuente=fuente)
+    vigilante.fotografiar()
+    return fuente, indice, vigilante
+
+
+def _cambiar_resultado(ruta, nombre: str, de: str, a: str):
+    lineas = ruta.read_text(encoding="utf-8").splitlines()
+    wlt = lineas[0].split(",").index("result_WLT")
+    i = next(i for i, linea in enumerate(lineas[1:], start=1)
+             if f",{nombre}," in linea and linea.split(",")[wlt] == de)
+    campos = lineas[i].split(",")
+    campos[wlt] = a
+    lineas[i] = ",".join(campos)
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+
+
+def test_resultado_corregido_reproduce_el_elo(entorno):
+    fuente, indice, vigilante = entorno
+    balonmano = indice.ratings_vista("admin.handball").copy()
+    antes = indice.ratings_vista(VISTA).copy()
+
+    _cambiar_resultado(fuente.directorio / "Basketball.csv", "Australia", "W", "L")
+    cambio = vigilante.refrescar("Basketball")
+    assert cambio.modificadas == 1 and cambio.partidos_elo > 0
+
+    reconstruido = IndiceAgregados.construir(fuente)
+    assert not np.allclose(indice.ratings_vista(VISTA), antes)
+    assert np.allclose(indice.ratings_vista(VISTA), reconstruido.ratings_vista(VISTA))
+    # El historial sigue ordenado y vale también a mitad de torneo
+    assert np.all(np.diff(indice.elo.fechas) >= 0)
+    mitad = int(np.median(reconstruido.elo.fechas))
+    assert np.allclose(indice.ratings_vista(VISTA, mitad), reconstruido.ratings_vista(VISTA, mitad))
+    assert np.array_equal(indice.ratings_vista("admin.handball"), balonmano)
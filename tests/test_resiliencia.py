@@ -0,0 +1,111 @@
+"""
+Reintentos y cortacircuitos (motor.resiliencia) a través de `ClienteSDK`
+contra el stub local del SDK: reintento de un 500, apertura del circuito
+tras `umbral_fallos` y una única sonda en semiabierto.
+"""
+import threading
+import time
+
+import pytest
+import requests
+
+from motor.resiliencia import CircuitoAbierto, Cortacircuitos, Intentos, PoliticaReintentos
+from motor.sdk import ClienteSDK
+from motor.stub_sdk import ServidorStub
+from motor.trazas import Trazador
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorStub().arrancar()
+    yield servidor
+    servidor.parar()
+
+
+def _cliente(servidor, max_intentos: int = 1, umbral_fallos: int = 2,
+             enfriamiento_s: float = 0.3) -> ClienteSDK:
+    # Sin caché ni hedging: cada intento es exactamente una petición al stub
+    return ClienteSDK(servidor.url, "admin", "admin", percentil_cobertura=0,
+                      trazador=Trazador(),
+                      reintentos=PoliticaReintentos(max_intentos=max_intentos, espera_base_s=0.01),
+                      cortacircuitos=Cortacircuitos(umbral_fallos, enfriamiento_s))
+
+
+def test_reintenta_un_500(stub):
+    stub.fallos_iniciales = 2
+    cliente = _cliente(stub, max_intentos=3)
+    try:
+        assert cliente.answer_data_question("p", usar_cache=False).answer
+        assert (stub.peticiones, stub.errores) == (3, 2)
+        assert cliente.cortacircuitos.estado == Cortacircuitos.CERRADO
+    finally:
+        cliente.cerrar()
+
+
+def test_abre_tras_umbral_fallos(stub):
+    stub.tasa_error = 1.0
+    cliente = _cliente(stub)
+    try:
+        for pregunta in ("a", "b"):
+            with pytest.raises(requests.HTTPError):
+                cliente.answer_data_question(pregunta, usar_cache=False)
+        assert cliente.cortacircuitos.estado == Cortacircuitos.ABIERTO
+        # Abierto: falla al instante sin llegar al SDK
+        with pytest.raises(CircuitoAbierto):
+            cliente.answer_data_question("c", usar_cache=False)
+        assert stub.peticiones == 2
+    finally:
+        cliente.cerrar()
+
+
+def test_una_sola_sonda_en_semiabierto(stub):
+    stub.tasa_error = 1.0
+    cliente = _cliente(stub, umbral_fallos=1)
+    try:
+        with pytest.raises(requests.HTTPError):
+            cliente.answer_data_question("a", usar_cache=False)
+        time.sleep(0.35)
+        assert cliente.cortacircuitos.estado == Cortacircuitos.SEMIABIERTO
+
+        stub.tasa_error, stub.latencia = 0.0, 0.3
+        resultados = {}
+
+        def preguntar(i):
+            # Preguntas distintas: ninguna se coalesce con la sonda
+            try:
+                resultados[i] = cliente.answer_data_question(f"p{i}", usar_cache=False)
+            except CircuitoAbierto as e:
+                resultados[i] = e
+
+        hilos = [threading.Thread(target=preguntar, args=(i,)) for i in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        rechazadas = [r for r in resultados.values() if isinstance(r, CircuitoAbierto)]
+        assert len(rechazadas) == 3
+        assert stub.peticiones == 2
+        # La sonda correcta cierra el circuito
+        assert cliente.cortacircuitos.estado == Cortacircuitos.CERRADO
+    finally:
+        cliente.cerrar()
+
+
+def test_solo_un_4xx_cierra_el_circuito():
+    cortacircuitos = Cortacircuitos(umbral_fallos=2, enfriamiento_s=60)
+    cortacircuitos.fallo()
+
+    # Un plazo propio agotado no dice nada del SDK: el fallo anterior sigue contando
+    assert Intentos(PoliticaReintentos(), cortacircuitos, 5).tras_fallo(TimeoutError()) is None
+    cortacircuitos.fallo()
+    assert cortacircuitos.estado == Cortacircuitos.ABIERTO
+
+    cortacircuitos = Cortacircuitos(umbral_fallos=2, enfriamiento_s=60)
+    cortacircuitos.fallo()
+    respuesta = requests.Response()
+    respuesta.status_code = 404
+    error = requests.HTTPError(response=respuesta)
+    assert Intentos(PoliticaReintentos(), cortacircuitos, 5).tras_fallo(error) is None
+    cortacircuitos.fallo()
+    assert cortacircuitos.estado == Cortacircuitos.CERRADO
@@ -0,0 +1,112 @@
+"""
+Motor asíncrono (bot_async + motor.sdk_async) contra el stub local del SDK:
+reparto concurrente, cancelación, plazos por fase y caché fuera del bucle.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bot_async import decidir, decidir_muchos
+from motor.cache import CacheRespuestas
+from motor.sdk_async import ClienteSDKAsync
+from motor.stub_sdk import ServidorStub
+from motor.trazas import Trazador
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorStub(latencia=0.2).arrancar()
+    yield servidor
+    servidor.parar()
+
+
+def _cliente(servidor, **kwargs) -> ClienteSDKAsync:
+    # Sin hedging: cada fase es exactamente una petición al stub
+    return ClienteSDKAsync(servidor.url, "admin", "admin", percentil_cobertura=0,
+                           trazador=Trazador(), **kwargs)
+
+
+def test_reparto_concurrente(stub):
+    async def lote():
+        async with _cliente(stub, tamano_pool=10) as cliente:
+            return await decidir_muchos(cliente, [(i, f"problema {i}") for i in range(20)],
+                                        concurrencia=10)
+
+    inicio = time.perf_counter()
+    registros = asyncio.run(lote())
+    segundos = time.perf_counter() - inicio
+
+    assert [r["id"] for r in registros] == list(range(20))
+    assert all(r["error"] is None and r["answer"] for r in registros)
+    assert stub.peticiones == 40
+    # 20 sesiones × 2 fases × 0.2 s en serie serían 8 s; con 10 en vuelo, ~0.8 s
+    assert segundos < 3
+
+
+def test_cancelar_lote_cancela_las_sesiones(stub):
+    terminados = []
+
+    async def lote():
+        async with _cliente(stub, tamano_pool=5) as cliente:
+            tarea = asyncio.create_task(decidir_muchos(
+                cliente, [(i, f"problema {i}") for i in range(50)], concurrencia=5,
+                al_terminar=terminados.append))
+            await asyncio.sleep(0.3)
+            tarea.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tarea
+
+    asyncio.run(lote())
+    enviadas = stub.peticiones
+    time.sleep(0.5)
+    # Ninguna sesión sigue lanzando peticiones tras la cancelación
+    assert stub.peticiones == enviadas
+    assert enviadas < 100
+    assert len(terminados) < 50
+
+
+def test_plazo_por_fase(stub):
+    async def una():
+        async with _cliente(stub) as cliente:
+            return await decidir(cliente, "problema", "p1", plazo_fase1=0.05, plazo_fase2=5)
+
+    registro = asyncio.run(una())
+    assert registro["error"] == "Error en Fase 1: plazo de 0.05s agotado"
+    assert registro["answer"] is None
+    assert "fase2_s" not in registro["tiempos"]
+
+
+def test_plazo_fase2_tras_fase1_correcta(stub):
+    async def una():
+        async with _cliente(stub) as cliente:
+            return await decidir(cliente, "problema", "p1", plazo_fase1=5, plazo_fase2=0.05)
+
+    registro = asyncio.run(una())
+    assert registro["tabla"]
+    assert registro["error"] == "Error en Fase 2: plazo de 0.05s agotado"
+
+
+def test_cache_fuera_del_bucle(stub, tmp_path):
+    hilos = set()
+
+    class CacheVigilada(CacheRespuestas):
+        def obtener_entrada(self, *args, **kwargs):
+            hilos.add(threading.current_thread())
+            return super().obtener_entrada(*args, **kwargs)
+
+        def guardar(self, *args, **kwargs):
+            hilos.add(threading.current_thread())
+            return super().guardar(*args, **kwargs)
+
+    async def dos_veces():
+        async with _cliente(stub, cache=CacheVigilada(tmp_path / "cache.sqlite3")) as cliente:
+            primera = await cliente.answer_data_question("¿Cuántos partidos?", vista="admin.tennis")
+            segunda = await cliente.answer_data_question("¿cuántos  partidos?", vista="admin.tennis")
+            return primera, segunda
+
+    primera, segunda = asyncio.run(dos_veces())
+    assert not primera.desde_cache and segunda.desde_cache
+    assert stub.peticiones == 1
+    assert hilos and threading.main_thread() not in hilos
@@ -0,0 +1,76 @@
+"""
+Respuestas en streaming (`ClienteSDK.stream_question`) contra el stub local
+del SDK: el flujo completo es la respuesta JSON, comparte caché con ella y
+un flujo cancelado no se cachea.
+"""
+import pytest
+
+from motor.cache import CacheRespuestas
+from motor.sdk import ClienteSDK
+from motor.stub_sdk import ServidorStub
+from motor.trazas import Trazador
+
+ENDPOINT = "answerDataQuestion"
+VISTA = "admin.basketball"
+# El stub responde a esta pregunta con un párrafo: varios fragmentos
+PREGUNTA = "Dame una recomendacion sobre admin.basketball"
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorStub(latencia_token=0.01).arrancar()
+    yield servidor
+    servidor.parar()
+
+
+@pytest.fixture
+def cliente(stub, tmp_path):
+    cliente = ClienteSDK(stub.url, "admin", "admin", percentil_cobertura=0, trazador=Trazador(),
+                         cache=CacheRespuestas(tmp_path / "cache.sqlite3"))
+    yield cliente
+    cliente.cerrar()
+
+
+def test_flujo_completo_es_la_respuesta_json(stub, cliente):
+    flujo = cliente.stream_question(PREGUNTA, vista=VISTA)
+    fragmentos = list(flujo)
+    assert len(fragmentos) > 1
+    assert not flujo.cancelada and not flujo.respuesta.desde_cache
+
+    sin_cache = ClienteSDK(stub.url, "admin", "admin", percentil_cobertura=0, trazador=Trazador())
+    try:
+        respuesta = sin_cache.answer_data_question(PREGUNTA, vista=VISTA)
+    finally:
+        sin_cache.cerrar()
+    assert "".join(fragmentos) == flujo.respuesta.answer == respuesta.answer
+    assert flujo.respuesta.sql_query == respuesta.sql_query
+
+
+def test_segunda_llamada_sale_de_cache(stub, cliente):
+    primera = "".join(cliente.stream_question(PREGUNTA, vista=VISTA))
+    assert stub.peticiones == 1
+
+    flujo = cliente.stream_question(PREGUNTA, vista=VISTA)
+    assert list(flujo) == [primera]
+    assert flujo.respuesta.desde_cache
+    assert stub.peticiones == 1
+    # answer_data_question comparte la entrada
+    assert cliente.answer_data_question(PREGUNTA, vista=VISTA).answer == primera
+    assert stub.peticiones == 1
+
+
+@pytest.mark.parametrize("cortar", ["cerrar", "cancelar"])
+def test_flujo_cancelado_no_se_cachea(stub, cliente, cortar):
+    stub.latencia_token = 0.1
+    flujo = cliente.stream_question(PREGUNTA, vista=VISTA)
+    fragmentos = iter(flujo)
+    primero = next(fragmentos)
+    if cortar == "cerrar":
+        flujo.cerrar()
+    else:
+        flujo.cancelar()
+        assert list(fragmentos) == []
+
+    assert flujo.cancelada and flujo.respuesta is None
+    assert flujo.texto == primero
+    assert cliente.cache.obtener(ENDPOINT, PREGUNTA, VISTA, ambito=cliente.ambito) is None